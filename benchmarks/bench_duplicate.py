@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Subgraph duplication benchmark.
+
+Builds a robot template (a synthetic graph of the shipped node classes)
+and duplicates it for further robots the way NodeScene.duplicateNodes
+does: cloning every node, then adding the copies and their connections in
+one batch.
+For comparison it also builds the same copies from scratch: running each
+class's __init__ and adding the items one by one. The first frame after
+each copy (validation, connection paths, painting) is timed separately.
+
+Run with:  python -m benchmarks.bench_duplicate [--nodes 300] [--copies 5]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import ensure_app, build_graph
+from connection import Connection
+from scene import NodeScene
+from subgraph import Subgraph
+from view import NodeView
+
+app = ensure_app()
+
+# Vertical distance between the robots' copies of the template
+COPY_SPACING = 2000
+
+
+def construct(scene, nodes, dy):
+    """Copy nodes and their internal connections without cloning, one item at a time"""
+    copies = {}
+    for node in nodes:
+        copy = type(node)()
+        copy.title = node.title
+        copy.setPos(node.x(), node.y() + dy)
+        scene.addItem(copy)
+        copies[node] = copy
+    for node in nodes:
+        for port in node.output_ports.values():
+            for connection in port.connections:
+                target = copies.get(connection.end_port.node)
+                if target is not None:
+                    scene.addItem(Connection(copies[node].output_ports[port.name],
+                                             target.input_ports[connection.end_port.name]))
+
+
+def run(num_nodes=300, copies=5, width=1280, height=800):
+    """Return copy and first frame timings (ms) for each way of copying"""
+    results = []
+    for label in ("clone", "construct"):
+        scene = NodeScene()
+        nodes, connections = build_graph(scene, num_nodes)
+        view = NodeView(scene)
+        view.resize(width, height)
+        view.show()
+        app.processEvents()
+
+        copy_times = []
+        frame_times = []
+        for copy in range(copies):
+            start = time.perf_counter()
+            if label == "clone":
+                # What duplicateNodes does, with the copy placed below the others
+                scene.pasteSubgraph(Subgraph(nodes, detach=False), 0, COPY_SPACING * (copy + 1))
+            else:
+                construct(scene, nodes, COPY_SPACING * (copy + 1))
+            copy_times.append((time.perf_counter() - start) * 1000.0)
+            start = time.perf_counter()
+            app.processEvents()
+            frame_times.append((time.perf_counter() - start) * 1000.0)
+
+        results.append({
+            "mode": label,
+            "nodes": num_nodes,
+            "connections": len(connections),
+            "median_ms": statistics.median(copy_times),
+            "max_ms": max(copy_times),
+            "frame_ms": statistics.median(frame_times),
+        })
+        view.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=300)
+    parser.add_argument("--copies", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'nodes':>6} {'conns':>6} {'median ms':>10} {'max ms':>8} {'frame ms':>9}")
+    for result in run(args.nodes, args.copies):
+        print(f"{result['mode']:>10} {result['nodes']:>6} {result['connections']:>6} "
+              f"{result['median_ms']:>10.1f} {result['max_ms']:>8.1f} {result['frame_ms']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Node startup responsiveness benchmark.
+
+Repaints the view on a 60 fps timer and records the time between frames
+while a batch of nodes starts at once: first with idle nodes, then with
+startup work in async_on_start (awaiting between steps), then with the
+same work done synchronously in on_start, as every node did before.
+
+Startup is mostly waiting (for processes, services, devices), so by
+default each step only waits; --work-ms adds CPU work to every step, which
+then shows up in the async frame times in proportion to how much of it
+wakes up at once.
+
+Run with:  python -m benchmarks.bench_lifecycle [--nodes 50] [--steps 10] [--work-ms 0]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from PySide6.QtCore import QTimer
+
+import lifecycle
+from benchmarks.common import ensure_app, build_graph
+from packages.base.node import BaseNode
+from scene import NodeScene
+from view import NodeView
+
+app = ensure_app()
+
+# Target frame interval (ms)
+FRAME_INTERVAL = 16
+
+# Each startup step computes for `work` seconds, then waits STEP_WAIT seconds
+STEP_WAIT = 0.02
+
+
+def _work(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class AsyncStartNode(BaseNode):
+    """Node whose startup is a series of short steps with waits in between"""
+    steps = 10
+    work = 0.0
+
+    async def async_on_start(self):
+        for _ in range(self.steps):
+            _work(self.work)
+            await asyncio.sleep(STEP_WAIT)
+
+
+class BlockingStartNode(BaseNode):
+    """The same startup done synchronously, blocking the event loop"""
+    steps = 10
+    work = 0.0
+
+    def on_start(self):
+        for _ in range(self.steps):
+            _work(self.work)
+            time.sleep(STEP_WAIT)
+
+
+def measure(view, nodes, settle=0.25):
+    """Start every node, and return the frame intervals (ms) until all are ready plus settle seconds"""
+    intervals = []
+    last = [time.perf_counter()]
+
+    def frame():
+        now = time.perf_counter()
+        intervals.append((now - last[0]) * 1000.0)
+        last[0] = now
+        view.viewport().repaint()
+
+    timer = QTimer()
+    timer.setInterval(FRAME_INTERVAL)
+    timer.timeout.connect(frame)
+    timer.start()
+
+    async def start_all():
+        # Let a few frames go by, then start everything at once as "Run Graph" does
+        await asyncio.sleep(0.1)
+        for node in nodes:
+            node.start()
+        while not all(node.is_ready() for node in nodes):
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(settle)
+
+    # Hooks only run while the asyncio loop is running the Qt event loop
+    lifecycle.run_until_complete(start_all())
+    timer.stop()
+    return intervals[1:]
+
+
+def run(num_nodes=50, steps=10, work_ms=0.0, width=1280, height=800):
+    """Return frame interval statistics for each startup style"""
+    scene = NodeScene()
+    build_graph(scene, 200)
+    view = NodeView(scene)
+    view.resize(width, height)
+    view.show()
+    app.processEvents()
+
+    results = []
+    for label, node_class in (("idle", None), ("async", AsyncStartNode), ("blocking", BlockingStartNode)):
+        nodes = []
+        if node_class is not None:
+            node_class.steps = steps
+            node_class.work = work_ms / 1000.0
+            for i in range(num_nodes):
+                node = node_class(title=f"{label} {i}")
+                node.setPos((i % 10) * 200, 2000 + (i // 10) * 150)
+                scene.addItem(node)
+                nodes.append(node)
+
+        start = time.perf_counter()
+        intervals = measure(view, nodes)
+        intervals.sort()
+        results.append({
+            "mode": label,
+            "nodes": len(nodes),
+            "startup_s": time.perf_counter() - start,
+            "frames": len(intervals),
+            "median_ms": statistics.median(intervals),
+            "p95_ms": intervals[int(len(intervals) * 0.95)],
+            "max_ms": intervals[-1],
+        })
+
+        for node in nodes:
+            node.stop()
+            scene.removeItem(node)
+
+    view.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--work-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':>9} {'nodes':>6} {'total s':>8} {'frames':>7} {'median ms':>10} {'p95 ms':>8} {'max ms':>8}")
+    for result in run(args.nodes, args.steps, args.work_ms):
+        print(f"{result['mode']:>9} {result['nodes']:>6} {result['startup_s']:>8.2f} {result['frames']:>7} "
+              f"{result['median_ms']:>10.1f} {result['p95_ms']:>8.1f} {result['max_ms']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Overview rendering benchmark.
+
+Measures full-viewport frame time while panning a large graph at the
+view's minimum zoom, where level-of-detail rendering kicks in.
+
+Run with:  python -m benchmarks.bench_lod [--nodes 5000] [--frames 30]
+"""
+import argparse
+import time
+
+from benchmarks.common import ensure_app, build_graph
+from scene import NodeScene
+from view import NodeView
+
+app = ensure_app()
+
+
+def run(num_nodes=5000, frames=30, width=1280, height=800):
+    """Return mean frame time in ms and fps at each zoom level"""
+    scene = NodeScene()
+    nodes, connections = build_graph(scene, num_nodes)
+    view = NodeView(scene)
+    view.resize(width, height)
+    view.show()
+    app.processEvents()
+
+    results = []
+    for zoom in (view.minScale, 0.5, 1.0):
+        view.resetTransform()
+        view.scale(zoom, zoom)
+        view.centerOn(scene.itemsBoundingRect().center())
+        app.processEvents()
+
+        # Warm up caches before timing
+        view.viewport().repaint()
+
+        start = time.perf_counter()
+        for i in range(frames):
+            bar = view.horizontalScrollBar()
+            bar.setValue(bar.value() + (40 if i % 2 == 0 else -40))
+            view.viewport().repaint()
+        frame_ms = (time.perf_counter() - start) * 1000.0 / frames
+
+        results.append({
+            "nodes": len(nodes),
+            "connections": len(connections),
+            "zoom": zoom,
+            "frame_ms": frame_ms,
+            "fps": 1000.0 / frame_ms if frame_ms else float("inf"),
+        })
+
+    view.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--frames", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7} {'zoom':>6} {'frame ms':>9} {'fps':>7}")
+    for result in run(args.nodes, args.frames):
+        print(f"{result['nodes']:>7} {result['zoom']:>6.2f} {result['frame_ms']:>9.2f} {result['fps']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
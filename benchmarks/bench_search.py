@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Node palette search benchmark.
+
+Builds a search index of synthetic node types and times each keystroke
+while typing a set of queries one character at a time, the way the
+palette's search bar sees them.
+
+Run with:  python -m benchmarks.bench_search [--entries 5000]
+"""
+import argparse
+import gc
+import random
+import time
+
+from search_index import SearchIndex
+
+# Word pools for synthetic node types
+WORDS = [
+    "Nav", "Slam", "Map", "Path", "Planner", "Controller", "Teleop", "Joystick",
+    "Keyboard", "Twist", "Mux", "Lidar", "Camera", "Depth", "Imu", "Odometry",
+    "Filter", "Fusion", "Localizer", "Tracker", "Detector", "Segmenter", "Grid",
+    "Cost", "Voxel", "Point", "Cloud", "Arm", "Gripper", "Joint", "State",
+    "Publisher", "Relay", "Throttle", "Recorder", "Bag", "Diagnostics", "Battery",
+]
+CATEGORIES = [
+    "Packages/Teleoperation", "Packages/Navigation & Mapping", "Packages/Robot Control",
+    "Packages/Perception", "Packages/Manipulation", "Packages/Drivers", "Packages/Tools",
+]
+PORTS = [
+    "cmd_vel", "odom", "scan", "map", "tf", "path", "goal_pose", "joy", "image",
+    "camera_info", "points", "imu", "joint_states", "joint_commands", "diagnostics",
+]
+QUERIES = ["nav2", "slam toolbox", "twist mux", "cmdvel", "joint state", "lidar filter", "odom"]
+
+# Indexes the queries are typed into; each keystroke keeps its fastest time
+ROUNDS = 3
+
+
+def build_index(num_entries, seed=0):
+    """Return a SearchIndex filled with num_entries synthetic node types"""
+    rng = random.Random(seed)
+    index = SearchIndex()
+    for i in range(num_entries):
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        name = " ".join(words) + (f" {i}" if rng.random() < 0.5 else "")
+        ports = rng.sample(PORTS, rng.randint(1, 4))
+        description = f"{' '.join(words)} node publishing {' and '.join(ports)}."
+        index.add(i, name, rng.choice(CATEGORIES), ports, description)
+    return index
+
+
+def run(num_entries=5000, limit=50, rounds=ROUNDS):
+    """
+    Return per-keystroke search times in ms for each query. Every round
+    types the queries into a fresh index, so no keystroke finds its results
+    cached, and garbage collection is paused while timing like timeit does.
+    """
+    build_start = time.perf_counter()
+    indexes = [build_index(num_entries)]
+    build_ms = (time.perf_counter() - build_start) * 1000.0
+    indexes += [build_index(num_entries) for _ in range(rounds - 1)]
+
+    results = []
+    gc.collect()
+    gc.disable()
+    try:
+        for query in QUERIES:
+            times = [float('inf')] * len(query)
+            for index in indexes:
+                # Start each query from an empty search bar
+                index.search("")
+                for length in range(1, len(query) + 1):
+                    start = time.perf_counter()
+                    matches = index.search(query[:length], limit)
+                    times[length - 1] = min(times[length - 1], (time.perf_counter() - start) * 1000.0)
+            results.append({
+                "query": query,
+                "matches": len(matches),
+                "first_ms": times[0],
+                "mean_ms": sum(times) / len(times),
+                "max_ms": max(times),
+            })
+    finally:
+        gc.enable()
+    return build_ms, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    args = parser.parse_args()
+
+    build_ms, results = run(args.entries, args.limit, args.rounds)
+    print(f"built index of {args.entries} entries in {build_ms:.1f} ms")
+    print(f"{'query':>14} {'first ms':>9} {'mean ms':>8} {'max ms':>7}")
+    for result in results:
+        print(f"{result['query']:>14} {result['first_ms']:>9.3f} {result['mean_ms']:>8.3f} {result['max_ms']:>7.3f}")
+    print(f"worst keystroke {max(result['max_ms'] for result in results):.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Viewport repaint benchmark.
+
+Measures the repainted area and paint time of NodeView for hover, drag
+and pan steps, with and without performance mode, on synthetic graphs.
+
+Run with:  python -m benchmarks.bench_viewport [--items 1000 10000] [--steps 20]
+"""
+import argparse
+import time
+
+from benchmarks.common import ensure_app, build_graph
+from scene import NodeScene
+from view import NodeView
+
+app = ensure_app()
+
+
+class ProbeView(NodeView):
+    """NodeView that records the area and duration of every paint event"""
+    def __init__(self, scene):
+        self.samples = []
+        super().__init__(scene)
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        super().paintEvent(event)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        area = sum(rect.width() * rect.height() for rect in event.region())
+        self.samples.append((area, elapsed))
+
+
+def settle():
+    """Let pending timers and paint events run"""
+    for _ in range(3):
+        app.processEvents()
+
+
+def measure(view, step, steps):
+    """Run `step` repeatedly and return mean repainted pixels and paint ms per step"""
+    settle()
+    view.samples.clear()
+    for i in range(steps):
+        step(i)
+        settle()
+    total_area = sum(area for area, _ in view.samples)
+    total_time = sum(elapsed for _, elapsed in view.samples)
+    return total_area / steps, total_time / steps
+
+
+def run(item_counts=(1000, 10000), steps=20, width=1280, height=800):
+    """Run the benchmark and return a list of result dicts"""
+    results = []
+    for num_items in item_counts:
+        for performance_mode in (False, True):
+            scene = NodeScene()
+            # Roughly one connection per node, so half the items are nodes
+            nodes, connections = build_graph(scene, num_items // 2)
+            view = ProbeView(scene)
+            view.setPerformanceMode(performance_mode)
+            view.resize(width, height)
+            view.show()
+            view.centerOn(nodes[0])
+            settle()
+
+            # Pick a node in the middle of the viewport to interact with
+            center = view.mapToScene(view.viewport().rect().center())
+            node = min(nodes, key=lambda n: (n.pos() - center).manhattanLength())
+            ports = list(node.input_ports.values()) + list(node.output_ports.values())
+            origin = node.pos()
+
+            def hover(i):
+                node.port_under_mouse = ports[i % len(ports)] if i % 2 == 0 else None
+                node.update()
+
+            def drag(i):
+                node.setPos(origin.x() + (i % 2) * 5, origin.y() + (i % 2) * 5)
+
+            def pan(i):
+                bar = view.horizontalScrollBar()
+                bar.setValue(bar.value() + (20 if i % 2 == 0 else -20))
+
+            for name, step in (("hover", hover), ("drag", drag), ("pan", pan)):
+                area, elapsed = measure(view, step, steps)
+                results.append({
+                    "items": len(nodes) + len(connections),
+                    "mode": "performance" if performance_mode else "full",
+                    "step": name,
+                    "repaint_px": area,
+                    "paint_ms": elapsed,
+                })
+
+            view.close()
+            view.deleteLater()
+            settle()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'items':>7} {'mode':>12} {'step':>6} {'repaint px':>12} {'paint ms':>9}")
+    for result in run(args.items, args.steps):
+        print(f"{result['items']:>7} {result['mode']:>12} {result['step']:>6} "
+              f"{result['repaint_px']:>12.0f} {result['paint_ms']:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
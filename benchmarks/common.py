@@ -0,0 +1,76 @@
+# Shared helpers for the benchmark scripts
+import os
+import sys
+import time
+
+# Benchmarks run headless unless a platform was chosen explicitly
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+from connection import Connection
+from packages.teleoperation import KeyboardTeleopNode, JoystickTeleopNode
+from packages.navigation import Nav2Node, SlamToolboxNode
+from packages.robot_control import ROS2ControllersNode, TwistMuxNode
+
+# Every node class shipped in packages/
+NODE_CLASSES = [
+    KeyboardTeleopNode, JoystickTeleopNode,
+    Nav2Node, SlamToolboxNode,
+    ROS2ControllersNode, TwistMuxNode,
+]
+
+# Grid spacing for synthetic graphs
+COLUMN_SPACING = 260
+ROW_SPACING = 220
+
+
+def ensure_app():
+    """Get the running QApplication, creating one if needed"""
+    app = QApplication.instance()
+    if not app:
+        app = QApplication(sys.argv)
+    return app
+
+
+def build_graph(scene, num_nodes, columns=40):
+    """
+    Fill a scene with a synthetic graph laid out on a grid.
+
+    Node classes are cycled through NODE_CLASSES, and each node's first
+    output is wired to the first input of the next node that has one, so
+    the graph holds roughly as many connections as nodes.
+    Returns (nodes, connections).
+    """
+    nodes = []
+    for i in range(num_nodes):
+        node = NODE_CLASSES[i % len(NODE_CLASSES)]()
+        node.setPos((i % columns) * COLUMN_SPACING, (i // columns) * ROW_SPACING)
+        scene.addItem(node)
+        nodes.append(node)
+
+    connections = []
+    for i, node in enumerate(nodes):
+        if not node.output_ports:
+            continue
+        for target in nodes[i + 1:i + 3]:
+            if target.input_ports:
+                start_port = next(iter(node.output_ports.values()))
+                end_port = next(iter(target.input_ports.values()))
+                connection = Connection(start_port, end_port)
+                scene.addItem(connection)
+                connections.append(connection)
+                break
+
+    flush = getattr(scene, 'flushConnectionUpdates', None)
+    if flush:
+        flush()
+    return nodes, connections
+
+
+def time_call(func, repeat=1):
+    """Call func `repeat` times and return the mean wall time in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / repeat
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the editor's hot paths.
+
+Times node creation for every class in packages/, port lookup under the
+mouse (NodeScene.findPortAt), one step of dragging nodes (mouse move plus
+the connection path updates of the next frame), Connection.updatePath,
+node menu search per keystroke (NodeSearchMenu.filter_nodes), a
+full-viewport paint and loading the whole graph from a binary graph file
+(into a scene, and into a headless GraphModel), on synthetic graphs of
+each size. Every result is
+the fastest time of one operation in milliseconds.
+
+Results can be written as JSON and are compared against a stored
+baseline: any benchmark slower than its baseline by more than the
+tolerance is reported as a regression and the exit status is 1. Sizes
+with a suspected regression are measured again first, keeping the
+fastest result, since a busy machine slows whole stretches of a run.
+
+Timings only compare on the machine they were measured on, so the
+baseline is a local file (benchmarks/baseline.json, ignored by git) rather
+than part of the repository: store one with --save-baseline before making
+changes, e.g. from the main branch, and compare against it afterwards. CI
+does the same on its own runner. A baseline measured elsewhere (another
+platform, Python or PySide version) is reported but not compared.
+
+Run with:  python -m benchmarks.suite [--sizes 100 1000 10000 50000]
+           [--output results.json] [--baseline benchmarks/baseline.json]
+           [--save-baseline] [--tolerance 0.25] [--retries 2]
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import PySide6
+from PySide6.QtCore import QEvent, QPointF, Qt
+from PySide6.QtWidgets import QGraphicsSceneMouseEvent
+
+from benchmarks.common import ensure_app, build_graph, NODE_CLASSES
+from benchmarks.bench_search import WORDS, CATEGORIES, QUERIES
+import graph_io
+from node_menu import NodeSearchMenu
+from scene import NodeScene
+from view import NodeView
+
+app = ensure_app()
+
+# Default graph sizes, in nodes
+SIZES = (100, 1000, 10000, 50000)
+
+# Baseline compared against unless another one is given (a local file, not in the repository)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Allowed slowdown before a result counts as a regression (0.25 = 25% slower)
+TOLERANCE = 0.25
+
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_MS = 0.002
+
+# Operations timed per measurement, and measurements per benchmark (the fastest is kept)
+PORT_QUERIES = 1000
+DRAG_STEPS = 50
+PATH_UPDATES = 2000
+PAINTS = 5
+ROUNDS = 7
+# Loads of the whole graph per load benchmark (the fastest is kept)
+LOAD_ROUNDS = 3
+
+# Extra runs of the sizes with a suspected regression before reporting it
+RETRIES = 2
+
+# Nodes dragged together for the selection drag benchmark
+DRAG_SELECTION = 100
+
+
+def best_ms(func, count, rounds=ROUNDS):
+    """
+    Fastest over rounds of the time one call of func takes, when called
+    `count` times in a row. Like timeit, garbage collection is paused while
+    timing, so that a collection landing in one round doesn't skew it.
+    """
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for i in range(count):
+                func(i)
+            samples.append((time.perf_counter() - start) * 1000.0 / count)
+    finally:
+        gc.enable()
+    return min(samples)
+
+
+def mouse_event(kind, pos):
+    event = QGraphicsSceneMouseEvent(kind)
+    event.setPos(pos)
+    event.setButton(Qt.LeftButton)
+    event.setButtons(Qt.LeftButton)
+    return event
+
+
+def bench_create(num_nodes):
+    """Time creating nodes of each class the way the editor does, by cloning the class prototype"""
+    results = {}
+    for cls in NODE_CLASSES:
+        prototype = cls.prototype()
+        nodes = []
+        # num_nodes in all, spread over the rounds
+        results[f"create.{cls.__name__}"] = best_ms(
+            lambda i: nodes.append(prototype.clone()), max(1, num_nodes // ROUNDS))
+        del nodes
+    return results
+
+
+def bench_find_port(scene, nodes, rng):
+    """Time port lookups: half of them on a port, half on a random point of the graph"""
+    ports = [port for node in nodes for port in
+             list(node.input_ports.values()) + list(node.output_ports.values())]
+    rect = scene.itemsBoundingRect()
+    positions = []
+    for i in range(PORT_QUERIES):
+        if i % 2:
+            positions.append(rng.choice(ports).get_scene_pos())
+        else:
+            positions.append(QPointF(rng.uniform(rect.left(), rect.right()),
+                                     rng.uniform(rect.top(), rect.bottom())))
+    return {"find_port": best_ms(lambda i: scene.findPortAt(positions[i]), PORT_QUERIES)}
+
+
+def bench_drag(scene, nodes):
+    """Time drag steps of one node, and of a selection of nodes, each with the path updates of its frame"""
+    results = {}
+    middle = len(nodes) // 2
+    for name, dragged in (("drag_step", nodes[middle:middle + 1]),
+                          ("drag_step.selection", nodes[middle:middle + DRAG_SELECTION])):
+        scene.clearSelection()
+        for node in dragged:
+            node.setSelected(True)
+        node = dragged[0]
+        grab = QPointF(node.width / 2, node.header_height + 5)
+        start = node.mapToScene(grab)
+        node.mousePressEvent(mouse_event(QEvent.GraphicsSceneMousePress, grab))
+
+        def step(i):
+            # Back and forth, so the nodes end where they started
+            offset = QPointF(5, 5) if i % 2 == 0 else QPointF(0, 0)
+            node.mouseMoveEvent(mouse_event(QEvent.GraphicsSceneMouseMove,
+                                            node.mapFromScene(start + offset)))
+            scene.flushConnectionUpdates()
+
+        results[name] = best_ms(step, DRAG_STEPS)
+        node.mouseReleaseEvent(mouse_event(QEvent.GraphicsSceneMouseRelease, grab))
+    scene.clearSelection()
+    app.processEvents()
+    return results
+
+
+def bench_update_path(connections, rng):
+    """Time rebuilding connection paths"""
+    sample = [rng.choice(connections) for _ in range(PATH_UPDATES)]
+    return {"update_path": best_ms(lambda i: sample[i].updatePath(), PATH_UPDATES)}
+
+
+def bench_paint(scene, nodes, width=1280, height=800):
+    """Time painting the whole viewport at 100% zoom and zoomed out as far as the view allows"""
+    view = NodeView(scene)
+    view.resize(width, height)
+    view.show()
+    view.centerOn(nodes[len(nodes) // 2])
+    app.processEvents()
+
+    viewport = view.viewport()
+    results = {"paint": best_ms(lambda i: viewport.repaint(), PAINTS)}
+    view.scale(view.minScale, view.minScale)
+    app.processEvents()
+    results["paint.overview"] = best_ms(lambda i: viewport.repaint(), PAINTS)
+    view.close()
+    view.deleteLater()
+    app.processEvents()
+    return results
+
+
+def bench_load(scene):
+    """
+    Time loading the scene's graph from a binary graph file: into a new
+    scene, up to the end of the first event loop pass (validation and the
+    garbage collection deferred while loading run there), and into a
+    headless GraphModel (load_model), which is what a file's size alone
+    costs without the editor's items.
+    """
+    stream = io.BytesIO()
+    graph_io.write_binary(graph_io.iter_scene_records(scene), stream)
+    data = stream.getvalue()
+    samples = []
+    model_samples = []
+    for _ in range(LOAD_ROUNDS):
+        gc.collect()
+        start = time.perf_counter()
+        graph_io.build_model(graph_io.read_binary(io.BytesIO(data)))
+        model_samples.append((time.perf_counter() - start) * 1000.0)
+
+        loaded = NodeScene()
+        gc.collect()
+        start = time.perf_counter()
+        graph_io.build_scene(loaded, graph_io.read_binary(io.BytesIO(data)))
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000.0)
+        loaded.clear()
+        loaded.deleteLater()
+        app.processEvents()
+    return {"load": min(samples), "load_model": min(model_samples)}
+
+
+def bench_search(num_entries, rng):
+    """Time node menu search per keystroke, with one menu entry per node"""
+    menu = NodeSearchMenu()
+    for i in range(num_entries):
+        name = " ".join(rng.sample(WORDS, rng.randint(1, 3))) + f" {i}"
+        menu.add_node_action(rng.choice(CATEGORIES), name, None, submenu=True)
+    keystrokes = [query[:length] for query in QUERIES for length in range(1, len(query) + 1)]
+
+    def keystroke(i):
+        if i % len(keystrokes) == 0:
+            # Every query starts from an empty search bar
+            menu.filter_nodes("")
+        menu.filter_nodes(keystrokes[i % len(keystrokes)])
+
+    results = {"search_keystroke": best_ms(keystroke, len(keystrokes))}
+    menu.deleteLater()
+    app.processEvents()
+    return results
+
+
+def run(sizes=SIZES, seed=0):
+    """Run every benchmark at each graph size and return a list of result dicts"""
+    results = []
+    for num_nodes in sizes:
+        rng = random.Random(seed)
+        timings = bench_create(num_nodes)
+
+        scene = NodeScene()
+        nodes, connections = build_graph(scene, num_nodes)
+        # Let validation and the other once-per-frame work settle first
+        app.processEvents()
+        timings.update(bench_find_port(scene, nodes, rng))
+        timings.update(bench_drag(scene, nodes))
+        timings.update(bench_update_path(connections, rng))
+        timings.update(bench_paint(scene, nodes))
+        timings.update(bench_load(scene))
+        timings.update(bench_search(num_nodes, rng))
+
+        results.extend({"benchmark": name, "nodes": num_nodes, "ms": ms}
+                       for name, ms in timings.items())
+        scene.clear()
+        scene.deleteLater()
+        app.processEvents()
+    return results
+
+
+def environment():
+    """Describe where the results were measured"""
+    return {
+        "python": platform.python_version(),
+        "pyside": PySide6.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def load_results(path):
+    """Load results saved by this suite: their environment, and the timings keyed by (benchmark, nodes)"""
+    with open(path) as f:
+        data = json.load(f)
+    timings = {(result["benchmark"], result["nodes"]): result["ms"] for result in data["results"]}
+    return data.get("environment", {}), timings
+
+
+def save_results(path, results):
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """
+    Compare results with a baseline, adding each result's "baseline_ms",
+    "ratio" and "regression" (None where the baseline has no such result).
+    Returns the results that regressed.
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get((result["benchmark"], result["nodes"]))
+        if base is None:
+            result.update(baseline_ms=None, ratio=None, regression=None)
+            continue
+        ratio = result["ms"] / base if base > 0 else float("inf")
+        regression = (ratio > 1.0 + tolerance and result["ms"] - base > MIN_REGRESSION_MS)
+        result.update(baseline_ms=base, ratio=ratio, regression=regression)
+        if regression:
+            regressions.append(result)
+    return regressions
+
+
+def check(results, baseline, tolerance=TOLERANCE, retries=RETRIES):
+    """
+    Compare results with a baseline, running the sizes that regressed again
+    up to `retries` times and keeping each benchmark's fastest time.
+    Returns the results that still regressed.
+    """
+    regressions = compare(results, baseline, tolerance)
+    for _ in range(retries):
+        if not regressions:
+            break
+        sizes = sorted({result["nodes"] for result in regressions})
+        fastest = {(result["benchmark"], result["nodes"]): result["ms"] for result in run(sizes)}
+        for result in results:
+            ms = fastest.get((result["benchmark"], result["nodes"]))
+            if ms is not None and ms < result["ms"]:
+                result["ms"] = ms
+        regressions = compare(results, baseline, tolerance)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--output", help="write the results (with the comparison) as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the new baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--retries", type=int, default=RETRIES)
+    args = parser.parse_args()
+
+    results = run(args.sizes)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        regressions = []
+    elif os.path.exists(args.baseline):
+        baseline_environment, baseline = load_results(args.baseline)
+        if baseline_environment == environment():
+            regressions = check(results, baseline, args.tolerance, args.retries)
+        else:
+            print(f"baseline at {args.baseline} was measured elsewhere ({baseline_environment}), "
+                  f"not comparing; run with --save-baseline to store one for this machine")
+            regressions = []
+    else:
+        print(f"no baseline at {args.baseline}, run with --save-baseline to store one")
+        regressions = []
+
+    print(f"{'benchmark':>26} {'nodes':>6} {'ms':>10} {'baseline':>10} {'ratio':>6}")
+    for result in results:
+        base = result.get("baseline_ms")
+        line = f"{result['benchmark']:>26} {result['nodes']:>6} {result['ms']:>10.4f}"
+        if base is not None:
+            line += f" {base:>10.4f} {result['ratio']:>6.2f}"
+            if result["regression"]:
+                line += "  REGRESSION"
+        print(line)
+
+    if args.output:
+        save_results(args.output, results)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline by more than "
+              f"{args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
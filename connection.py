@@ -1,10 +1,27 @@
-from PySide6.QtWidgets import QGraphicsPathItem
-from PySide6.QtGui import QPainterPath, QPen, QColor
-from PySide6.QtCore import Qt, QPointF
+from PySide6.QtWidgets import QGraphicsPathItem, QGraphicsItem
+from PySide6.QtGui import QPainterPath, QPainterPathStroker, QPen, QColor
+from PySide6.QtCore import Qt, QPointF, QRectF, QLineF
+
+from packages.base.node import LOD_LOW_THRESHOLD
+
+# Item change values compared in Connection.itemChange, and values set on
+# every new connection, looked up once
+_SCENE_CHANGE = QGraphicsItem.ItemSceneChange
+_SCENE_HAS_CHANGED = QGraphicsItem.ItemSceneHasChanged
+_IS_SELECTABLE = QGraphicsItem.ItemIsSelectable
+_IS_MOVABLE = QGraphicsItem.ItemIsMovable
+_NO_BUTTON = Qt.NoButton
 
 class Connection(QGraphicsPathItem):
+    """
+    Graphics item for a connection between two ports.
+
+    Once complete and in a NodeScene, the connection is backed by an
+    EdgeModel in the scene's GraphModel (self.model).
+    """
     def __init__(self, start_port, end_port=None):
         super().__init__()
+        self.model = None
         self.start_port = start_port
         self.end_port = end_port
         self.end_point = start_port.get_scene_pos()
@@ -14,23 +31,29 @@ class Connection(QGraphicsPathItem):
         self.pending_color = QColor(200, 200, 50, 150)  # Yellow for pending connections
         self.complete_color = QColor(100, 180, 255)     # Blue for complete connections
         
-        # Set default pen
-        self.setPen(QPen(self.pending_color, self.pen_width))
+        # Geometry cached from the current path (see updatePath)
+        self._bounding_rect = QRectF()
+        self._shape = None
+        self._start_pos = QPointF()
+        self._end_pos = QPointF()
+        
+        # Set default pen (connections created between two ports are complete)
+        self.setPen(QPen(self.complete_color if end_port else self.pending_color, self.pen_width))
         
-        # Add to start port's connections list
-        if start_port and not self in start_port.connections:
-            start_port.connections.append(self)
+        # Add to start port's connections
+        if start_port:
+            start_port.connections.add(self)
         
-        # Add to end port's connections list if applicable
-        if end_port and not self in end_port.connections:
-            end_port.connections.append(self)
+        # Add to end port's connections if applicable
+        if end_port:
+            end_port.connections.add(self)
         
         # Make sure connections aren't selectable to avoid interfering with node selection
-        self.setFlag(QGraphicsPathItem.ItemIsSelectable, False)
-        self.setFlag(QGraphicsPathItem.ItemIsMovable, False)  # Connections shouldn't be movable
+        self.setFlag(_IS_SELECTABLE, False)
+        self.setFlag(_IS_MOVABLE, False)  # Connections shouldn't be movable
         
         # Prevent connections from accepting any mouse button events
-        self.setAcceptedMouseButtons(Qt.NoButton)
+        self.setAcceptedMouseButtons(_NO_BUTTON)
         
         # Update the path
         self.updatePath()
@@ -38,6 +61,27 @@ class Connection(QGraphicsPathItem):
         # Ensure connection stays below nodes
         self.setZValue(-1)
 
+    def itemChange(self, change, value):
+        # Let the old and new scenes record or drop the edge
+        if change == _SCENE_CHANGE:
+            self._notify_scene('connectionRemoved')
+        elif change == _SCENE_HAS_CHANGED:
+            self._notify_scene('connectionAdded')
+        # QGraphicsItem.itemChange just returns value; calling it would cost
+        # a round trip through PySide on every change of every item
+        return value
+
+    def _notify_scene(self, hook):
+        """Call an edge bookkeeping hook (connectionAdded, connectionRemoved) on scenes that have it"""
+        try:
+            scene = self.scene()
+        except RuntimeError:
+            # The underlying C++ item is already gone (e.g. during __del__)
+            return
+        callback = getattr(scene, hook, None)
+        if callback is not None:
+            callback(self)
+
     def mousePressEvent(self, event):
         """Override to prevent any mouse press interaction"""
         # Connections should not respond to mouse presses
@@ -70,9 +114,42 @@ class Connection(QGraphicsPathItem):
         ctrl2 = QPointF(end_pos.x() - ctrl_distance, end_pos.y())
         path.cubicTo(ctrl1, ctrl2, end_pos)
         
+        # Cache the geometry: a cubic never leaves the hull of its control points,
+        # so that plus half the pen width bounds everything we draw
+        self.prepareGeometryChange()
+        margin = self.pen_width / 2 + 1
+        self._bounding_rect = path.controlPointRect().adjusted(-margin, -margin, margin, margin)
+        self._shape = None
+        self._start_pos = start_pos
+        self._end_pos = end_pos
+        
         # Update the path
         self.setPath(path)
 
+    def boundingRect(self):
+        """Return the cached bounds of the path, including the pen width"""
+        return self._bounding_rect
+
+    def shape(self):
+        """Return the stroked outline of the path, built lazily and cached until it changes"""
+        if self._shape is None:
+            stroker = QPainterPathStroker()
+            stroker.setWidth(self.pen_width)
+            self._shape = stroker.createStroke(self.path())
+        return self._shape
+
+    def paint(self, painter, option, widget=None):
+        """Draw the curve, or just a straight line when zoomed far out"""
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < LOD_LOW_THRESHOLD:
+            painter.setPen(self.pen())
+            painter.drawLine(self.line())
+            return
+        super().paint(painter, option, widget)
+
+    def line(self):
+        """Get the straight line between the connection's endpoints"""
+        return QLineF(self._start_pos, self._end_pos)
+
     def updateEndPoint(self, pos):
         """Update the end point for an in-progress connection"""
         self.end_point = pos
@@ -80,16 +157,18 @@ class Connection(QGraphicsPathItem):
 
     def setEndPort(self, end_port):
         """Set the end port for this connection"""
+        self._notify_scene('connectionRemoved')
+
         # Remove from old end port, if any
-        if self.end_port and self in self.end_port.connections:
-            self.end_port.connections.remove(self)
+        if self.end_port:
+            self.end_port.connections.discard(self)
             
         # Set new end port
         self.end_port = end_port
         
         # Add to new end port
-        if end_port and not self in end_port.connections:
-            end_port.connections.append(self)
+        if end_port:
+            end_port.connections.add(self)
             
         # Update visual style for completed connection
         self.setPen(QPen(self.complete_color, self.pen_width))
@@ -97,15 +176,25 @@ class Connection(QGraphicsPathItem):
         # Update path
         self.updatePath()
 
+        self._notify_scene('connectionAdded')
+
+    def connectToPorts(self, start_port, end_port):
+        """Attach this connection to a pair of ports, e.g. again after disconnectFromPorts"""
+        self.start_port = start_port
+        start_port.connections.add(self)
+        self.setEndPort(end_port)
+
     def disconnectFromPorts(self):
         """Remove this connection from its ports"""
+        self._notify_scene('connectionRemoved')
+
         # Remove from start port
-        if self.start_port and self in self.start_port.connections:
-            self.start_port.connections.remove(self)
+        if self.start_port:
+            self.start_port.connections.discard(self)
             
         # Remove from end port
-        if self.end_port and self in self.end_port.connections:
-            self.end_port.connections.remove(self)
+        if self.end_port:
+            self.end_port.connections.discard(self)
             
         # Clear references
         self.start_port = None
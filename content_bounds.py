@@ -0,0 +1,71 @@
+from PySide6.QtCore import QRectF
+
+
+class ContentBounds:
+    """
+    Incrementally maintained union of item rectangles in scene coordinates.
+
+    Growing is O(1) per update. Shrinking only needs a full rescan when an
+    item that defined one of the edges moves inward or is removed, and that
+    rescan is deferred until the bounds are next read.
+    """
+    def __init__(self):
+        # item -> (left, top, right, bottom)
+        self._rects = {}
+        self._bounds = None
+        self._stale = False
+
+    def __len__(self):
+        return len(self._rects)
+
+    def update(self, item, rect):
+        """Record the scene rectangle currently covered by an item"""
+        new = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        old = self._rects.get(item)
+        self._rects[item] = new
+
+        if self._stale:
+            return
+        if self._bounds is None:
+            self._bounds = new
+            return
+
+        left, top, right, bottom = self._bounds
+        if old is not None and (
+                (old[0] == left and new[0] > left) or
+                (old[1] == top and new[1] > top) or
+                (old[2] == right and new[2] < right) or
+                (old[3] == bottom and new[3] < bottom)):
+            # The item defined an edge and moved inward; recompute on demand
+            self._stale = True
+            return
+
+        self._bounds = (min(left, new[0]), min(top, new[1]),
+                        max(right, new[2]), max(bottom, new[3]))
+
+    def remove(self, item):
+        """Stop tracking an item"""
+        old = self._rects.pop(item, None)
+        if old is None or self._stale or self._bounds is None:
+            return
+        left, top, right, bottom = self._bounds
+        if old[0] == left or old[1] == top or old[2] == right or old[3] == bottom:
+            self._stale = True
+
+    def rect(self):
+        """Get the bounding rectangle of all tracked items (empty if there are none)"""
+        if self._stale:
+            self._recompute()
+        if self._bounds is None:
+            return QRectF()
+        left, top, right, bottom = self._bounds
+        return QRectF(left, top, right - left, bottom - top)
+
+    def _recompute(self):
+        self._stale = False
+        if not self._rects:
+            self._bounds = None
+            return
+        rects = self._rects.values()
+        self._bounds = (min(r[0] for r in rects), min(r[1] for r in rects),
+                        max(r[2] for r in rects), max(r[3] for r in rects))
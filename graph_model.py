@@ -0,0 +1,298 @@
+"""
+Headless graph model.
+
+The graph's state (nodes with their type, title, position, run state and
+ports, and the edges between ports) lives in plain Python objects with
+``__slots__``, independent of Qt. NodeScene keeps a GraphModel in sync with
+its items, and the items read and write their state through it, so analysis
+and export code can work on a GraphModel alone, e.g. one loaded from a file
+with graph_io.load_model(), without creating any widgets.
+
+Adjacency is indexed both per port and per node (by neighbouring node), so
+adding or removing an edge, finding the edges between two nodes and walking
+upstream or downstream are all independent of how many edges a node has.
+"""
+from collections import deque
+
+import message_types
+
+
+class ConnectionSet(dict):
+    """
+    Insertion-ordered set with O(1) add, remove and membership tests.
+
+    Keeps the list-style append/remove/extend used for connections before,
+    so it can stand in for the lists of connections or edges it replaces.
+    """
+    __slots__ = ()
+
+    def __init__(self, items=()):
+        # Most sets start out empty (one per port), so skip building a dict for them
+        if items:
+            super().__init__(dict.fromkeys(items))
+
+    def __repr__(self):
+        return f"ConnectionSet({list(self)!r})"
+
+    def add(self, item):
+        self[item] = None
+
+    append = add
+
+    def extend(self, items):
+        self.update(dict.fromkeys(items))
+
+    def remove(self, item):
+        """Remove an item, raising KeyError if it isn't in the set"""
+        del self[item]
+
+    def discard(self, item):
+        self.pop(item, None)
+
+    def copy(self):
+        return ConnectionSet(self)
+
+
+class PortModel:
+    """A named input or output of a node, carrying messages of one type"""
+    __slots__ = ('node', 'name', 'is_input', 'msg_type', 'type_id', 'required', 'edges')
+
+    def __init__(self, node, name, is_input, msg_type=message_types.ANY, required=False):
+        self.node = node
+        self.name = name
+        self.is_input = is_input
+        self.msg_type = msg_type
+        # Interned id of msg_type, for compatibility checks
+        self.type_id = message_types.type_id(msg_type)
+        # Whether the node can't work with this input unconnected
+        self.required = required
+        # Edges attached to this port
+        self.edges = ConnectionSet()
+
+    def __repr__(self):
+        direction = 'input' if self.is_input else 'output'
+        return f"PortModel({self.node.title!r}.{self.name!r}, {direction})"
+
+
+class NodeModel:
+    """A node: its type, title, position, run state and ports"""
+    __slots__ = (
+        'id', 'graph', 'type_name', 'title', 'x', 'y', 'is_running', 'inputs', 'outputs',
+        'upstream', 'downstream',
+    )
+
+    def __init__(self, type_name, title, x=0.0, y=0.0, is_running=False):
+        # Set when the node is added to a graph
+        self.id = None
+        self.graph = None
+
+        self.type_name = type_name
+        self.title = title
+        self.x = x
+        self.y = y
+        self.is_running = is_running
+        self.inputs = {}
+        self.outputs = {}
+        # Neighbouring node -> ConnectionSet of the edges from it / to it
+        self.upstream = {}
+        self.downstream = {}
+
+    def __repr__(self):
+        return f"NodeModel({self.id}, {self.type_name!r}, {self.title!r})"
+
+    def add_input(self, name, msg_type=message_types.ANY, required=False):
+        port = self.inputs[name] = PortModel(self, name, True, msg_type, required)
+        return port
+
+    def add_output(self, name, msg_type=message_types.ANY):
+        port = self.outputs[name] = PortModel(self, name, False, msg_type)
+        return port
+
+    def ports(self):
+        """Iterate over the input ports, then the output ports"""
+        yield from self.inputs.values()
+        yield from self.outputs.values()
+
+    def copy(self):
+        """Create a detached copy with the same type, title, position, run state and ports"""
+        node = NodeModel(self.type_name, self.title, self.x, self.y, self.is_running)
+        for name, port in self.inputs.items():
+            node.add_input(name, port.msg_type, port.required)
+        for name, port in self.outputs.items():
+            node.add_output(name, port.msg_type)
+        return node
+
+
+class EdgeModel:
+    """A connection from an output port to an input port"""
+    __slots__ = ('id', 'source', 'target')
+
+    def __init__(self, source, target):
+        self.id = None
+        self.source = source
+        self.target = target
+
+    def __repr__(self):
+        return f"EdgeModel({self.source!r} -> {self.target!r})"
+
+
+class GraphModel:
+    """Nodes and edges keyed by id, in the order they were added"""
+    def __init__(self):
+        self.nodes = {}
+        self.edges = {}
+        self._next_id = 0
+
+    def __repr__(self):
+        return f"GraphModel({len(self.nodes)} nodes, {len(self.edges)} edges)"
+
+    def _new_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    def create_node(self, type_name, title, x=0.0, y=0.0, inputs=(), outputs=(), is_running=False):
+        """Create a node with the given ports and add it to the graph"""
+        node = NodeModel(type_name, title, x, y, is_running)
+        for name in inputs:
+            node.add_input(name)
+        for name in outputs:
+            node.add_output(name)
+        return self.add_node(node)
+
+    def add_node(self, node):
+        """Add a detached node to the graph"""
+        if node.graph is not None:
+            raise ValueError(f"{node!r} already belongs to a graph")
+        node.id = self._new_id()
+        node.graph = self
+        self.nodes[node.id] = node
+        return node
+
+    def remove_node(self, node):
+        """Remove a node and every edge attached to it"""
+        if node.graph is not self:
+            return
+        for port in node.ports():
+            for edge in list(port.edges):
+                self.remove_edge(edge)
+        del self.nodes[node.id]
+        node.graph = None
+        node.id = None
+
+    def connect(self, source, target):
+        """Add an edge from an output port to an input port of nodes in this graph"""
+        if source.is_input or not target.is_input:
+            raise ValueError("Edges go from an output port to an input port")
+        if source.node.graph is not self or target.node.graph is not self:
+            raise ValueError("Both ports must belong to nodes in this graph")
+        edge = EdgeModel(source, target)
+        edge.id = self._new_id()
+        self.edges[edge.id] = edge
+        source.edges.add(edge)
+        target.edges.add(edge)
+        _link(source.node.downstream, target.node, edge)
+        _link(target.node.upstream, source.node, edge)
+        return edge
+
+    def remove_edge(self, edge):
+        """Remove an edge (no-op if it isn't in the graph)"""
+        if self.edges.pop(edge.id, None) is None:
+            return
+        edge.source.edges.discard(edge)
+        edge.target.edges.discard(edge)
+        _unlink(edge.source.node.downstream, edge.target.node, edge)
+        _unlink(edge.target.node.upstream, edge.source.node, edge)
+        edge.id = None
+
+    def edges_between(self, source, target):
+        """Edges from any output of source to any input of target"""
+        return list(source.downstream.get(target, ()))
+
+    def node_edges(self, node):
+        """Every edge attached to a node"""
+        edges = []
+        for port in node.ports():
+            edges.extend(port.edges)
+        return edges
+
+    def upstream_nodes(self, node):
+        """Every node with a path of edges into node, nearest first"""
+        return _reachable(node, 'upstream')
+
+    def downstream_nodes(self, node):
+        """Every node reachable from node along edges, nearest first"""
+        return _reachable(node, 'downstream')
+
+    def topological_layers(self):
+        """
+        Group the nodes into layers in dataflow order: each node comes in
+        the layer after the last of its upstream nodes, so the nodes within
+        a layer don't depend on each other. Returns (layers, cyclic), where
+        cyclic lists the nodes on or downstream of a cycle, which can't be
+        ordered.
+        """
+        pending = {}
+        layer = []
+        for node in self.nodes.values():
+            count = len(node.upstream) - (node in node.upstream)
+            if count:
+                pending[node] = count
+            else:
+                layer.append(node)
+
+        layers = []
+        while layer:
+            layers.append(layer)
+            next_layer = []
+            for node in layer:
+                for neighbour in node.downstream:
+                    if neighbour is node:
+                        continue
+                    pending[neighbour] -= 1
+                    if not pending[neighbour]:
+                        del pending[neighbour]
+                        next_layer.append(neighbour)
+            layer = next_layer
+        return layers, list(pending)
+
+    def clear(self):
+        """Remove every node and edge"""
+        for node in self.nodes.values():
+            node.graph = None
+            node.id = None
+            node.upstream.clear()
+            node.downstream.clear()
+            for port in node.ports():
+                port.edges.clear()
+        for edge in self.edges.values():
+            edge.id = None
+        self.nodes.clear()
+        self.edges.clear()
+
+
+def _link(adjacency, neighbour, edge):
+    edges = adjacency.get(neighbour)
+    if edges is None:
+        edges = adjacency[neighbour] = ConnectionSet()
+    edges.add(edge)
+
+
+def _unlink(adjacency, neighbour, edge):
+    edges = adjacency[neighbour]
+    edges.discard(edge)
+    if not edges:
+        del adjacency[neighbour]
+
+
+def _reachable(node, direction):
+    """Breadth-first walk over the upstream or downstream adjacency of node"""
+    seen = {node}
+    order = []
+    queue = deque([node])
+    while queue:
+        for neighbour in getattr(queue.popleft(), direction):
+            if neighbour not in seen:
+                seen.add(neighbour)
+                order.append(neighbour)
+                queue.append(neighbour)
+    return order
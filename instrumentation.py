@@ -0,0 +1,166 @@
+"""
+Call counters and timings for the editor's hot paths.
+
+While enabled, every call of the methods in HOT_PATHS is counted and timed
+into a histogram. enable() swaps each method on its class for a wrapper
+that does the bookkeeping, and disable() puts the original back, so
+nothing is counted or timed (and nothing costs anything) while it is off.
+Enabling is counted, so independent users (the performance HUD, the
+operator's menu toggle) can share it: the wrappers stay until the last one
+disables it.
+
+snapshot() returns the figures as plain data, and dump() writes them as
+JSON, e.g. to attach to a bug report.
+"""
+import importlib
+import json
+import platform
+import time
+from bisect import bisect_left
+
+import PySide6
+
+# (module, class, method) of each instrumented routine; the modules are only
+# imported when counting starts, as some of them use this one
+HOT_PATHS = (
+    ("connection", "Connection", "updatePath"),
+    ("connection", "Connection", "paint"),
+    ("packages.base.node", "BaseNode", "paint"),
+    ("packages.base.node", "BaseNode", "updateConnections"),
+    ("scene", "NodeScene", "findPortAt"),
+    ("view", "NodeView", "updateSceneRect"),
+    ("node_menu", "NodeSearchMenu", "filter_nodes"),
+)
+
+# Upper bounds of the histogram buckets in microseconds; one more bucket holds slower calls
+HISTOGRAM_BOUNDS_US = (1, 2, 5, 10, 20, 50, 100, 200, 500,
+                       1000, 2000, 5000, 10000, 20000, 50000, 100000)
+_BOUNDS_S = tuple(bound / 1e6 for bound in HISTOGRAM_BOUNDS_US)
+
+
+class Counter:
+    """Number of calls of one routine, their total and longest time, and a histogram of their times"""
+    __slots__ = ("name", "calls", "total", "longest", "buckets")
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.buckets = [0] * (len(_BOUNDS_S) + 1)
+
+    def add(self, seconds):
+        """Record one call that took `seconds`"""
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.longest:
+            self.longest = seconds
+        self.buckets[bisect_left(_BOUNDS_S, seconds)] += 1
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "total_ms": self.total * 1000.0,
+            "mean_us": self.total * 1e6 / self.calls if self.calls else 0.0,
+            "max_us": self.longest * 1e6,
+            "histogram": list(self.buckets),
+        }
+
+
+# Counter of each hot path, by "Class.method"
+counters = {f"{cls}.{name}": Counter(f"{cls}.{name}") for _, cls, name in HOT_PATHS}
+
+# How many users have enabled counting, and the original methods while it is on
+_users = 0
+_originals = {}
+# Seconds spent counting before the current stretch, and when the current stretch started
+_recorded = 0.0
+_started = None
+
+
+def _timed(method, counter):
+    perf_counter = time.perf_counter
+
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            counter.add(perf_counter() - start)
+    timed.__name__ = method.__name__
+    timed.__doc__ = method.__doc__
+    return timed
+
+
+def enable():
+    """Start counting hot-path calls (each enable needs a matching disable)"""
+    global _users, _started
+    if _users == 0:
+        for module, class_name, name in HOT_PATHS:
+            cls = getattr(importlib.import_module(module), class_name)
+            method = cls.__dict__[name]
+            _originals[(cls, name)] = method
+            setattr(cls, name, _timed(method, counters[f"{class_name}.{name}"]))
+        _started = time.perf_counter()
+    _users += 1
+
+
+def disable():
+    """Stop counting once every user that enabled it has disabled it; the figures are kept"""
+    global _users, _recorded, _started
+    if _users == 0:
+        return
+    _users -= 1
+    if _users == 0:
+        for (cls, name), method in _originals.items():
+            setattr(cls, name, method)
+        _originals.clear()
+        _recorded += time.perf_counter() - _started
+        _started = None
+
+
+def is_enabled():
+    return _users > 0
+
+
+def reset():
+    """Clear every counter"""
+    global _recorded, _started
+    for counter in counters.values():
+        counter.reset()
+    _recorded = 0.0
+    if _users:
+        _started = time.perf_counter()
+
+
+def recorded_seconds():
+    """Get how long the counters have been counting since they were last reset"""
+    if _started is None:
+        return _recorded
+    return _recorded + time.perf_counter() - _started
+
+
+def snapshot():
+    """Get the counters, and how long they have been recording, as plain (JSON-ready) data"""
+    return {
+        "enabled": is_enabled(),
+        "recorded_s": recorded_seconds(),
+        "histogram_bounds_us": list(HISTOGRAM_BOUNDS_US),
+        "counters": {name: counter.snapshot() for name, counter in counters.items()},
+    }
+
+
+def dump(path):
+    """Write a snapshot, along with the Python, PySide and platform versions, as JSON"""
+    data = snapshot()
+    data["environment"] = {
+        "python": platform.python_version(),
+        "pyside": PySide6.__version__,
+        "platform": platform.platform(),
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,310 @@
+"""
+Exporting node graphs as ROS 2 Python launch files.
+
+Each node becomes one launch action built from its `command`:
+
+* ``ros2 run <package> <executable>``: a launch_ros ``Node``
+* ``ros2 launch <package> <file>``: an ``IncludeLaunchDescription`` in a
+  ``GroupAction`` that scopes its remappings
+* anything else: an ``ExecuteProcess``
+
+Connections become topic remappings derived from port names. Ports joined
+by connections share one topic, named after the first output port among
+them: ``/<node name>/<port name>``.
+
+The launch file is a list of per-node fragments. A LaunchExporter keeps the
+fragments of its last export and only renders the nodes whose name,
+command or remappings changed since; everything else is reused as is. For
+CI jobs that export from a fresh process every time, a cache file records
+where each fragment is in the previous launch file, and the digest of the
+graph file it came from so that an unchanged graph isn't even loaded.
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+
+import graph_io
+from node_registry import default_registry
+
+CACHE_FORMAT_VERSION = 1
+
+_HEADER = '''\
+# Generated by the node editor; changes will be overwritten on the next export.
+from launch import LaunchDescription
+from launch.actions import ExecuteProcess, GroupAction, IncludeLaunchDescription
+from launch.launch_description_sources import PythonLaunchDescriptionSource
+from launch.substitutions import PathJoinSubstitution
+from launch_ros.actions import Node, SetRemap
+from launch_ros.substitutions import FindPackageShare
+
+
+def generate_launch_description():
+    return LaunchDescription([
+'''
+_FOOTER = '''\
+    ])
+'''
+
+# Indentation of the actions inside LaunchDescription([...])
+_INDENT = ' ' * 8
+
+_NOT_NAME_CHARACTER = re.compile(r'[^0-9a-zA-Z_]+')
+
+
+@functools.lru_cache(maxsize=1024)
+def _name_base(title):
+    base = _NOT_NAME_CHARACTER.sub('_', title).strip('_').lower() or 'node'
+    if base[0].isdigit():
+        base = 'node_' + base
+    return base
+
+
+def node_name(node):
+    """ROS node name of a NodeModel: its title made a valid name, plus its id to keep it unique"""
+    return f"{_name_base(node.title)}_{node.id}"
+
+
+def port_topics(graph):
+    """
+    Map each connected port of a GraphModel to the topic it is remapped to.
+
+    Ports joined by connections, directly or through a shared port, form
+    one topic, named after the output with the lowest (node id, port name).
+    """
+    topics = {}
+    for edge in graph.edges.values():
+        if edge.source in topics:
+            continue
+        component = _joined_ports(edge.source)
+        owner = min((port for port in component if not port.is_input),
+                    key=lambda port: (port.node.id, port.name))
+        topic = f"/{node_name(owner.node)}/{owner.name}"
+        for port in component:
+            topics[port] = topic
+    return topics
+
+
+def _joined_ports(port):
+    """Every port reachable from port along edges"""
+    seen = {port}
+    stack = [port]
+    while stack:
+        for edge in stack.pop().edges:
+            for other in (edge.source, edge.target):
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+    return seen
+
+
+def render_fragment(name, command, remappings):
+    """Render the launch action of one node; remappings are (port name, topic) pairs"""
+    if not command:
+        return f"{_INDENT}# {name}: no command\n"
+    command = list(command)
+    if command[:2] == ['ros2', 'run'] and len(command) >= 4:
+        lines = [
+            "Node(",
+            f"    package={command[2]!r},",
+            f"    executable={command[3]!r},",
+            f"    name={name!r},",
+        ]
+        if len(command) > 4:
+            lines.append(f"    arguments={command[4:]!r},")
+        if remappings:
+            lines.append("    remappings=[")
+            lines.extend(f"        ({port!r}, {topic!r})," for port, topic in remappings)
+            lines.append("    ],")
+        lines.append("),")
+    elif command[:2] == ['ros2', 'launch'] and len(command) >= 4:
+        arguments = [argument.split(':=', 1) for argument in command[4:] if ':=' in argument]
+        lines = [f"# {name}", "GroupAction(["]
+        lines.extend(f"    SetRemap(src={port!r}, dst={topic!r})," for port, topic in remappings)
+        lines.append("    IncludeLaunchDescription(PythonLaunchDescriptionSource(PathJoinSubstitution(")
+        lines.append(f"        [FindPackageShare({command[2]!r}), 'launch', {command[3]!r}]))")
+        if arguments:
+            lines[-1] += ","
+            lines.append(f"        launch_arguments={[tuple(argument) for argument in arguments]!r}")
+        lines.append("    ),")
+        lines.append("]),")
+    else:
+        if remappings:
+            command.append('--ros-args')
+            for port, topic in remappings:
+                command.extend(('-r', f"{port}:={topic}"))
+        lines = [f"ExecuteProcess(cmd={command!r}, name={name!r}),"]
+    return ''.join(f"{_INDENT}{line}\n" for line in lines)
+
+
+class LaunchExporter:
+    """Renders graphs to launch files, reusing the fragments of nodes that didn't change"""
+
+    def __init__(self, registry=None):
+        self.registry = registry
+        # (name, command, remappings) -> fragment, for the nodes of the last export
+        self._fragments = {}
+        # Key digest -> fragment, from the export recorded in a cache file
+        self._saved = {}
+        # Node type -> class command, looked up once per type
+        self._commands = {}
+        # Fragments rendered and reused by the last export, and its text
+        self.rendered = 0
+        self.reused = 0
+        self._text = ''
+
+    def command_for(self, node, scene=None):
+        """The command of a NodeModel: its item's if it is in a scene, else its class's"""
+        if scene is not None:
+            item = scene.nodeForModel(node)
+            if item is not None:
+                command = item.command
+                return tuple(command) if command else None
+        try:
+            return self._commands[node.type_name]
+        except KeyError:
+            pass
+        node_type = (self.registry or default_registry()).get(node.type_name)
+        command = getattr(node_type.load_class(), 'command', None) if node_type else None
+        command = self._commands[node.type_name] = tuple(command) if command else None
+        return command
+
+    def export(self, graph):
+        """Get the launch file of a NodeScene or GraphModel as a string"""
+        scene = graph if hasattr(graph, 'model') else None
+        model = graph.model if scene is not None else graph
+        topics = port_topics(model)
+
+        fragments = {}
+        parts = [_HEADER]
+        rendered = 0
+        for node in model.nodes.values():
+            if node.upstream or node.downstream:
+                remappings = tuple((port.name, topics[port]) for port in node.ports() if port.edges)
+            else:
+                remappings = ()
+            key = (node_name(node), self.command_for(node, scene), remappings)
+            fragment = self._fragments.get(key)
+            if fragment is None and self._saved:
+                fragment = self._saved.get(_key_digest(key))
+            if fragment is None:
+                fragment = render_fragment(*key)
+                rendered += 1
+            fragments[key] = fragment
+            parts.append(fragment)
+        parts.append(_FOOTER)
+
+        # Only keep what this export used, so the cache doesn't grow with every edit
+        self._fragments = fragments
+        self._saved = {}
+        self.rendered = rendered
+        self.reused = len(model.nodes) - rendered
+        self._text = ''.join(parts)
+        return self._text
+
+    def write(self, graph, path):
+        """Export a graph to a file, leaving it untouched if it is up to date; returns whether it was written"""
+        text = self.export(graph)
+        if _read_text(path) == text:
+            return False
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(text)
+        return True
+
+    def load_cache(self, path, output_path):
+        """
+        Reuse the fragments of the export recorded by save_cache(), reading
+        them back from output_path. Returns the source digest recorded with
+        them, or None if the cache is missing or the output file has changed
+        since.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            return None
+        text = _read_text(output_path)
+        if (not isinstance(data, dict) or data.get('version') != CACHE_FORMAT_VERSION
+                or text is None or _digest(text) != data.get('output')):
+            return None
+        self._saved = {digest: text[start:end] for digest, start, end in data['fragments']}
+        return data.get('source')
+
+    def save_cache(self, path, source_digest=None):
+        """
+        Record where the fragments of the last export are in its output, so
+        that a later process can reuse them with load_cache(). source_digest
+        identifies what was exported, e.g. the digest of the graph file.
+        """
+        entries = []
+        position = len(_HEADER)
+        for key, fragment in self._fragments.items():
+            entries.append([_key_digest(key), position, position + len(fragment)])
+            position += len(fragment)
+        data = {
+            'version': CACHE_FORMAT_VERSION,
+            'source': source_digest,
+            'output': _digest(self._text),
+            'fragments': entries,
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as stream:
+            stream.write(json.dumps(data))
+        os.replace(tmp_path, path)
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as stream:
+            return stream.read()
+    except OSError:
+        return None
+
+
+def _key_digest(key):
+    # Fragment keys are tuples of strings, so their repr is the same in every process
+    return hashlib.blake2b(repr(key).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _digest(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def export_launch(graph_path, output_path, cache_path=None, registry=None):
+    """
+    Export a graph file to a launch file. With a cache file, nothing is
+    loaded or rendered if the graph file hasn't changed since the last
+    export, and otherwise only the nodes that changed are rendered.
+    Returns the exporter, or None if the launch file was already up to date.
+    """
+    exporter = LaunchExporter(registry)
+    with open(graph_path, 'rb') as stream:
+        source_digest = _digest(stream.read())
+    if cache_path and exporter.load_cache(cache_path, output_path) == source_digest:
+        return None
+    exporter.write(graph_io.load_model(graph_path), output_path)
+    if cache_path:
+        exporter.save_cache(cache_path, source_digest)
+    return exporter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a node graph as a ROS 2 launch file")
+    parser.add_argument('graph', help="graph file (.rgraph or .jsonl)")
+    parser.add_argument('output', help="launch file to write")
+    parser.add_argument('--cache', help="cache file that lets the next export skip unchanged nodes")
+    args = parser.parse_args(argv)
+
+    exporter = export_launch(args.graph, args.output, args.cache)
+    if exporter is None:
+        print(f"{args.output} is up to date")
+    else:
+        print(f"{args.output}: {exporter.rendered} nodes rendered, {exporter.reused} reused")
+
+
+if __name__ == '__main__':
+    main()
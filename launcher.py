@@ -0,0 +1,335 @@
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from lifecycle import STOPPED
+
+# How often (ms) nodes of the current layer are checked for readiness
+READY_POLL_INTERVAL = 10
+
+# How long (s) a layer may take to become ready before the launch is abandoned
+READY_TIMEOUT = 30.0
+
+
+class LaunchResult:
+    """Outcome of starting one node"""
+    __slots__ = ('node', 'layer', 'latency', 'error')
+
+    def __init__(self, node, layer):
+        self.node = node
+        self.layer = layer
+        # Seconds from start() to the node reporting ready, None until then
+        self.latency = None
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.latency is not None
+
+
+class LaunchReport:
+    """Per-node results of a graph launch, in launch order"""
+    def __init__(self):
+        self.results = []
+        # Nodes on or downstream of a cycle (launched last, in no particular order)
+        self.cyclic = []
+        # Nodes that were never started because an earlier layer failed
+        self.skipped = []
+        self.layer_count = 0
+        self.duration = 0.0
+
+    @property
+    def ok(self):
+        return not self.skipped and all(result.ok for result in self.results)
+
+    def failures(self):
+        return [result for result in self.results if not result.ok]
+
+    def summary(self):
+        """One line describing the launch"""
+        started = sum(result.ok for result in self.results)
+        text = (f"Started {started} of {len(self.results) + len(self.skipped)} nodes "
+                f"in {self.layer_count} layers in {self.duration:.2f} s")
+        if not self.ok:
+            text += f" ({len(self.failures())} failed, {len(self.skipped)} not started)"
+        return text
+
+    def format(self):
+        """The summary followed by one line per node with its layer and startup latency"""
+        lines = [self.summary()]
+        for result in self.results:
+            if result.ok:
+                status = f"{result.latency * 1000:8.1f} ms"
+            else:
+                status = f"  failed: {result.error}"
+            lines.append(f"  [{result.layer}] {result.node.title:<24}{status}")
+        for node in self.skipped:
+            lines.append(f"  [-] {node.title:<24}  not started")
+        return '\n'.join(lines)
+
+
+class GraphLauncher(QObject):
+    """
+    Starts every node of a NodeScene in dependency order.
+
+    The graph is split into topological layers (see
+    GraphModel.topological_layers). All nodes of a layer are started
+    together, then the launcher waits without blocking the event loop until
+    each of them reports is_ready() before starting the next layer. Nodes
+    that are already running count as ready straight away. If a node fails
+    to start or a layer isn't ready within the timeout, the remaining layers
+    are not started.
+    """
+    # Emitted with (node, latency in seconds) as each node becomes ready
+    nodeReady = Signal(object, float)
+    # Emitted with the LaunchReport once the launch is over
+    finished = Signal(object)
+
+    def __init__(self, scene, timeout=READY_TIMEOUT, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.timeout = timeout
+        self.report = None
+        self._active = False
+        self._layers = []
+        self._waiting = {}
+        self._layer_start = 0.0
+        self._launch_start = 0.0
+        self._timer = QTimer(self)
+        self._timer.setInterval(READY_POLL_INTERVAL)
+        self._timer.timeout.connect(self._poll)
+
+    def isRunning(self):
+        return self._active
+
+    def start(self):
+        """Start launching the scene's graph; returns immediately"""
+        layers, cyclic = self.scene.model.topological_layers()
+        node_item = self.scene.nodeForModel
+        self._layers = [[node_item(model) for model in layer] for layer in layers]
+        self.report = LaunchReport()
+        self.report.cyclic = [node_item(model) for model in cyclic]
+        if self.report.cyclic:
+            # Their order can't be resolved, so bring them up after everything else
+            self._layers.append(self.report.cyclic)
+        self._active = True
+        self._launch_start = time.perf_counter()
+        self._startLayer()
+
+    def _startLayer(self):
+        if not self._layers:
+            self._finish()
+            return
+
+        layer = self._layers.pop(0)
+        index = self.report.layer_count
+        self.report.layer_count += 1
+        self._waiting = {}
+        self._layer_start = time.perf_counter()
+        for node in layer:
+            result = LaunchResult(node, index)
+            self.report.results.append(result)
+            started = time.perf_counter()
+            try:
+                node.start()
+            except Exception as error:
+                result.error = str(error) or type(error).__name__
+                continue
+            if node.is_ready():
+                # Came up synchronously, so don't count the rest of the layer's startup
+                result.latency = time.perf_counter() - started
+                self.nodeReady.emit(node, result.latency)
+            else:
+                self._waiting[node] = (result, started)
+
+        self._poll()
+
+    def _poll(self):
+        now = time.perf_counter()
+        for node, (result, started) in list(self._waiting.items()):
+            if node.is_ready():
+                result.latency = now - started
+                del self._waiting[node]
+                self.nodeReady.emit(node, result.latency)
+            elif not node.is_started():
+                # E.g. its startup hook raised or its process exited
+                result.error = node.run_error() or "stopped before it was ready"
+                del self._waiting[node]
+
+        if self._waiting and now - self._layer_start < self.timeout:
+            if not self._timer.isActive():
+                self._timer.start()
+            return
+        self._timer.stop()
+
+        for result, _ in self._waiting.values():
+            result.error = "not ready after %.1f s" % self.timeout
+        self._waiting = {}
+        if self.report.failures():
+            # Downstream nodes would start without their inputs
+            for layer in self._layers:
+                self.report.skipped.extend(layer)
+            self._layers = []
+        # Return to the event loop (and let the view repaint) between layers
+        QTimer.singleShot(0, self._startLayer)
+
+    def _finish(self):
+        self._active = False
+        self.report.duration = time.perf_counter() - self._launch_start
+        self.finished.emit(self.report)
+
+
+# Bulk lifecycle operations
+START = 'start'
+STOP = 'stop'
+RESTART = 'restart'
+
+# Nodes a bulk operation works on at the same time
+BULK_CONCURRENCY = 4
+
+# How long (s) one node may take to complete a bulk operation
+BULK_TIMEOUT = 30.0
+
+# Steps each operation takes on a node, in order
+_OPERATION_STEPS = {START: (START,), STOP: (STOP,), RESTART: (STOP, START)}
+
+# Past tense of each operation, for summaries
+_OPERATION_DONE = {START: "Started", STOP: "Stopped", RESTART: "Restarted"}
+
+
+class BulkResult:
+    """Outcome of a bulk operation on one node"""
+    __slots__ = ('node', 'elapsed', 'error')
+
+    def __init__(self, node):
+        self.node = node
+        # Seconds from the node's turn coming up to it finishing, None until then
+        self.elapsed = None
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.elapsed is not None and self.error is None
+
+
+class BulkReport:
+    """Per-node results of a bulk operation, in completion order"""
+    def __init__(self, operation):
+        self.operation = operation
+        self.results = []
+        self.duration = 0.0
+
+    @property
+    def ok(self):
+        return all(result.ok for result in self.results)
+
+    def failures(self):
+        return [result for result in self.results if not result.ok]
+
+    def summary(self):
+        """One line describing the operation, naming the nodes that failed"""
+        done = sum(result.ok for result in self.results)
+        text = (f"{_OPERATION_DONE[self.operation]} {done} of {len(self.results)} nodes "
+                f"in {self.duration:.2f} s")
+        failures = self.failures()
+        if failures:
+            text += " (failed: " + ", ".join(f"{result.node.title}: {result.error}" for result in failures) + ")"
+        return text
+
+
+class BulkOperation(QObject):
+    """
+    Starts, stops or restarts a set of nodes through a bounded pool.
+
+    At most `concurrency` nodes are worked on at a time; as each finishes
+    (or runs out of its `timeout`), the next waiting node takes its slot.
+    Nodes are taken in the order given, so callers can put upstream nodes
+    first. Progress is polled from a QTimer, so the event loop never blocks,
+    and the results are gathered into one BulkReport.
+    """
+    # Emitted with the BulkResult as each node finishes
+    nodeFinished = Signal(object)
+    # Emitted with the BulkReport once every node has finished
+    finished = Signal(object)
+
+    def __init__(self, nodes, operation, concurrency=BULK_CONCURRENCY, timeout=BULK_TIMEOUT, parent=None):
+        super().__init__(parent)
+        if operation not in _OPERATION_STEPS:
+            raise ValueError(f"Unknown operation: {operation!r}")
+        self.operation = operation
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.report = None
+        self._pending = list(dict.fromkeys(nodes))
+        # node -> (result, remaining steps, time its turn came up)
+        self._active = {}
+        self._start = 0.0
+        self._timer = QTimer(self)
+        self._timer.setInterval(READY_POLL_INTERVAL)
+        self._timer.timeout.connect(self._poll)
+
+    def isRunning(self):
+        return self.report is not None and (bool(self._active) or bool(self._pending))
+
+    def start(self):
+        """Start working through the nodes; returns immediately"""
+        self.report = BulkReport(self.operation)
+        self._start = time.perf_counter()
+        self._poll()
+
+    def _poll(self):
+        now = time.perf_counter()
+        for node, (result, steps, started) in list(self._active.items()):
+            self._advance(node, result, steps, started, now)
+
+        while self._pending and len(self._active) < self.concurrency:
+            node = self._pending.pop(0)
+            result = BulkResult(node)
+            steps = list(_OPERATION_STEPS[self.operation])
+            started = time.perf_counter()
+            self._active[node] = (result, steps, started)
+            self._beginStep(node, result, steps[0])
+            # Nodes that finish synchronously free their slot straight away
+            self._advance(node, result, steps, started, started)
+
+        if self._active:
+            if not self._timer.isActive():
+                self._timer.start()
+            return
+        self._timer.stop()
+        self.report.duration = time.perf_counter() - self._start
+        self.finished.emit(self.report)
+
+    def _beginStep(self, node, result, step):
+        try:
+            if step == START:
+                node.start()
+            else:
+                node.stop()
+        except Exception as error:
+            result.error = str(error) or type(error).__name__
+
+    def _advance(self, node, result, steps, started, now):
+        """Move a node on to its next step once the current one is done"""
+        while result.error is None:
+            step = steps[0]
+            if step == START:
+                if not node.is_ready():
+                    if not node.is_started():
+                        result.error = node.run_error() or "stopped before it was ready"
+                    break
+            elif node.run_state != STOPPED:
+                break
+            steps.pop(0)
+            if not steps:
+                result.elapsed = time.perf_counter() - started
+                break
+            self._beginStep(node, result, steps[0])
+
+        if result.error is None and result.elapsed is None:
+            if now - started < self.timeout:
+                return
+            result.error = "timed out after %.1f s" % self.timeout
+        del self._active[node]
+        self.report.results.append(result)
+        self.nodeFinished.emit(result)
@@ -0,0 +1,279 @@
+"""
+Layered (Sugiyama-style) automatic layout.
+
+layered_layout() places the nodes of a directed graph in columns that
+follow the dataflow from left to right, in three passes:
+1. Ranking: each node goes one column right of its furthest upstream
+   node (longest path). Edges that close a cycle are left out, and
+   nodes with nothing upstream move right, next to their first consumer.
+2. Ordering: edges spanning several columns get a dummy node in every
+   column they cross. Nodes are then reordered within their columns by
+   the barycenter of their neighbours, sweeping alternately downstream and
+   upstream to reduce edge crossings.
+3. Coordinates: each column is as wide as its widest node, and nodes are
+   pulled towards the height of their neighbours without overlapping or
+   changing order.
+
+The passes work on NumPy arrays: the ranking one frontier of nodes at a
+time, the ordering one column at a time, and the coordinates all columns
+at once (each pass moving nodes towards where the previous pass left their
+neighbours). They take and return plain arrays only, so the layout can be
+computed on a worker thread.
+"""
+import numpy as np
+
+# Horizontal gap between columns, and vertical gap between the nodes of a column
+COLUMN_GAP = 120.0
+NODE_GAP = 40.0
+
+# Height reserved for a long edge in each column it crosses
+DUMMY_HEIGHT = 20.0
+
+# Long edges get no dummy nodes when that would add more than this many per node
+MAX_DUMMIES_PER_NODE = 4
+
+# Reordering sweeps (alternately downstream and upstream) and coordinate passes
+ORDER_SWEEPS = 4
+COORDINATE_PASSES = 8
+
+
+def _out_edges(num_nodes, sources, targets):
+    """Outgoing edges in compressed form: targets of node i are heads[indptr[i]:indptr[i + 1]]"""
+    heads = targets[np.argsort(sources, kind='stable')]
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+    return indptr, heads
+
+
+def rank_nodes(num_nodes, sources, targets):
+    """
+    Get the column of each node: one more than the furthest column upstream.
+
+    Nodes are ranked a frontier at a time (every node whose predecessors are
+    all ranked). When only cycles remain, the unranked node with the fewest
+    unranked predecessors is ranked next, and the edges into it from
+    the cycle are ignored.
+    """
+    rank = np.zeros(num_nodes, dtype=np.int64)
+    indptr, heads = _out_edges(num_nodes, sources, targets)
+    indegree = np.bincount(targets, minlength=num_nodes)
+    ranked = np.zeros(num_nodes, dtype=bool)
+    frontier = np.flatnonzero(indegree == 0)
+    remaining = num_nodes
+    while remaining:
+        if frontier.size == 0:
+            unranked = np.flatnonzero(~ranked)
+            frontier = unranked[[np.argmin(indegree[unranked])]]
+        ranked[frontier] = True
+        remaining -= frontier.size
+
+        # Every edge out of the frontier, into nodes not ranked yet
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = counts.sum()
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        edge_heads = heads[np.repeat(starts, counts) + offsets]
+        edge_ranks = np.repeat(rank[frontier], counts) + 1
+        forward = ~ranked[edge_heads]
+        edge_heads = edge_heads[forward]
+        np.maximum.at(rank, edge_heads, edge_ranks[forward])
+        np.subtract.at(indegree, edge_heads, 1)
+        frontier = np.unique(edge_heads[indegree[edge_heads] == 0])
+    return rank
+
+
+def _pull_sources(rank, sources, targets):
+    """Move nodes with nothing upstream right, to the column before their nearest consumer"""
+    nearest = np.full(rank.size, np.iinfo(np.int64).max)
+    forward = rank[targets] > rank[sources]
+    np.minimum.at(nearest, sources[forward], rank[targets[forward]] - 1)
+    has_inputs = np.zeros(rank.size, dtype=bool)
+    has_inputs[targets[forward]] = True
+    movable = ~has_inputs & (nearest != np.iinfo(np.int64).max)
+    rank[movable] = nearest[movable]
+    return rank
+
+
+def _split_long_edges(num_nodes, rank, sources, targets):
+    """
+    Replace edges spanning several columns by chains through dummy nodes,
+    one per column crossed. Returns the ranks of all nodes (dummies after
+    the real ones) and the edges between neighbouring columns.
+    """
+    span = rank[targets] - rank[sources]
+    dummies = span - 1
+    if dummies.sum() > MAX_DUMMIES_PER_NODE * max(num_nodes, 1):
+        return rank, sources, targets
+
+    # Each edge becomes the chain source, dummies..., target
+    lengths = dummies + 2
+    edge = np.repeat(np.arange(sources.size), lengths)
+    step = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    first_dummy = num_nodes + np.cumsum(dummies) - dummies
+    chain = np.where(step == 0, sources[edge],
+                     np.where(step == lengths[edge] - 1, targets[edge],
+                              first_dummy[edge] + step - 1))
+    linked = edge[:-1] == edge[1:]
+    dummy_ranks = np.repeat(rank[sources], dummies) + \
+        (np.arange(dummies.sum()) - np.repeat(np.cumsum(dummies) - dummies, dummies)) + 1
+    return np.concatenate([rank, dummy_ranks]), chain[:-1][linked], chain[1:][linked]
+
+
+def _positions(rank, order_keys):
+    """Get each node's index within its column when sorted by order_keys (last key sorts first)"""
+    order = np.lexsort(order_keys + (rank,))
+    column_sizes = np.bincount(rank)
+    column_starts = np.cumsum(column_sizes) - column_sizes
+    position = np.empty(rank.size, dtype=np.float64)
+    position[order] = np.arange(rank.size) - column_starts[rank[order]]
+    return position
+
+
+def _barycenters(values, sources, targets, num_nodes, downstream):
+    """Mean of each node's neighbour values, upstream (downstream=False) or downstream; NaN without any"""
+    ends, others = (sources, targets) if downstream else (targets, sources)
+    sums = np.bincount(ends, weights=values[others], minlength=num_nodes)
+    counts = np.bincount(ends, minlength=num_nodes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+def _column_edges(rank, ends, others):
+    """
+    Group edges by the column of their `ends` node. Returns a function
+    giving, for one column's nodes, the slice of grouped edges into them
+    as (local index of the end node, other node).
+    """
+    order = np.argsort(rank[ends], kind='stable')
+    ends, others = ends[order], others[order]
+    bounds = np.searchsorted(rank[ends], np.arange(rank.max() + 2))
+    local = np.empty(rank.size, dtype=np.int64)
+
+    def edges(column, nodes):
+        local[nodes] = np.arange(nodes.size)
+        start, stop = bounds[column], bounds[column + 1]
+        return local[ends[start:stop]], others[start:stop]
+    return edges
+
+
+def order_nodes(rank, sources, targets):
+    """
+    Get each node's position within its column, reordered to reduce crossings.
+
+    Sweeps go column by column, each column sorted by the barycenter of its
+    neighbours' positions in the column just done; nodes without neighbours
+    on that side keep their place.
+    """
+    num_nodes = rank.size
+    position = _positions(rank, (np.arange(num_nodes),))
+    by_column = np.argsort(rank, kind='stable')
+    column_bounds = np.searchsorted(rank[by_column], np.arange(rank.max() + 2))
+    columns = [by_column[column_bounds[c]:column_bounds[c + 1]] for c in range(rank.max() + 1)]
+    # A single node has nowhere else to go
+    columns = [(c, nodes) for c, nodes in enumerate(columns) if nodes.size > 1]
+    upstream = _column_edges(rank, targets, sources)
+    downstream = _column_edges(rank, sources, targets)
+
+    for sweep in range(ORDER_SWEEPS):
+        edges = downstream if sweep % 2 else upstream
+        for column, nodes in (reversed(columns) if sweep % 2 else columns):
+            local, others = edges(column, nodes)
+            if local.size == 0:
+                continue
+            current = position[nodes]
+            sums = np.bincount(local, weights=position[others], minlength=nodes.size)
+            counts = np.bincount(local, minlength=nodes.size)
+            barycenter = np.where(counts > 0, sums / np.maximum(counts, 1), current)
+            position[nodes[np.lexsort((current, barycenter))]] = np.arange(nodes.size)
+    return position
+
+
+def _resolve_overlaps(desired, stacked, column_of, order):
+    """
+    Move nodes as close as possible to their desired centers while keeping
+    each column's order and spacing: stacked holds the centers of each
+    column packed tightly from 0, so node i may sit no higher than
+    stacked[i] plus the largest shift (desired - stacked) above it.
+    """
+    shift = (desired - stacked)[order]
+    columns = column_of[order]
+    # Offsetting each column past the previous one restarts the running maximum at every column
+    spread = shift.max() - shift.min() + 1.0
+    running = np.maximum.accumulate(shift + columns * spread) - columns * spread
+    centers = np.empty_like(desired)
+    centers[order] = stacked[order] + running
+    return centers
+
+
+def assign_coordinates(rank, position, sources, targets, widths, heights):
+    """Get the left x and center y of every node"""
+    num_nodes = rank.size
+    num_columns = rank.max() + 1
+    column_widths = np.zeros(num_columns)
+    np.maximum.at(column_widths, rank, widths)
+    column_left = np.cumsum(column_widths + COLUMN_GAP) - column_widths - COLUMN_GAP
+    x = column_left[rank] + (column_widths[rank] - widths) / 2.0
+
+    # Centers with each column packed from the top, in order
+    order = np.lexsort((position, rank))
+    spacing = heights[order] + NODE_GAP
+    packed = np.cumsum(spacing) - spacing
+    column_sizes = np.bincount(rank, minlength=num_columns)
+    column_starts = np.cumsum(column_sizes) - column_sizes
+    stacked = np.empty(num_nodes)
+    stacked[order] = packed - packed[column_starts[rank[order]]] + heights[order] / 2.0
+
+    y = stacked.copy()
+    column_counts = np.maximum(column_sizes, 1)
+    for _ in range(COORDINATE_PASSES):
+        upstream = _barycenters(y, sources, targets, num_nodes, downstream=False)
+        downstream = _barycenters(y, sources, targets, num_nodes, downstream=True)
+        desired = np.where(np.isnan(upstream), downstream,
+                           np.where(np.isnan(downstream), upstream, (upstream + downstream) / 2.0))
+        desired = np.where(np.isnan(desired), y, desired)
+        y = _resolve_overlaps(desired, stacked, rank, order)
+        # Overlaps only push nodes down: move each column back up by its average drift
+        drift = np.bincount(rank, weights=y - desired, minlength=num_columns) / column_counts
+        y -= drift[rank]
+    return x, y
+
+
+def layered_layout(num_nodes, sources, targets, widths, heights):
+    """
+    Lay out a directed graph in columns following its edges.
+
+    Nodes are numbered 0..num_nodes-1; sources and targets are integer
+    arrays with the two ends of each edge, widths and heights the node
+    sizes. Returns float arrays (x, y) with the top left corner of each
+    node, the whole layout starting at (0, 0).
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    widths = np.asarray(widths, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    if num_nodes == 0:
+        return np.zeros(0), np.zeros(0)
+
+    # Self loops don't affect the layout
+    keep = sources != targets
+    sources, targets = sources[keep], targets[keep]
+    rank = rank_nodes(num_nodes, sources, targets)
+
+    # Edges ignored by the ranking point backwards: turn them around, and drop
+    # the ones between nodes of the same column
+    backwards = rank[targets] < rank[sources]
+    sources, targets = np.where(backwards, targets, sources), np.where(backwards, sources, targets)
+    forward = rank[targets] > rank[sources]
+    sources, targets = sources[forward], targets[forward]
+    rank = _pull_sources(rank, sources, targets)
+
+    all_ranks, chain_sources, chain_targets = _split_long_edges(num_nodes, rank, sources, targets)
+    num_dummies = all_ranks.size - num_nodes
+    all_widths = np.concatenate([widths, np.zeros(num_dummies)])
+    all_heights = np.concatenate([heights, np.full(num_dummies, DUMMY_HEIGHT)])
+
+    position = order_nodes(all_ranks, chain_sources, chain_targets)
+    x, center = assign_coordinates(all_ranks, position, chain_sources, chain_targets,
+                                   all_widths, all_heights)
+    x, y = x[:num_nodes], center[:num_nodes] - heights / 2.0
+    return x - x.min(), y - y.min()
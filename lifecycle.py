@@ -0,0 +1,65 @@
+"""
+asyncio integration for node lifecycles.
+
+Coroutines run on QtAsyncio's event loop, whose callbacks are Qt timer
+events. The application runs the Qt event loop through the asyncio loop's
+run_forever() (scripts and tests use run_until_complete() below), so the
+asyncio loop is the running one whenever Qt is processing events and
+asyncio.sleep(), asyncio.gather() and friends work inside the hooks without
+a second loop or thread. BaseNode.async_on_start/async_on_stop are run as tasks here
+while the node shows the "starting"/"stopping" state.
+"""
+import asyncio
+
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtAsyncio import QAsyncioEventLoopPolicy
+
+# Run states of a node; the same values as the supervisor's process states
+from supervisor import STOPPED, STARTING, RUNNING, STOPPING
+
+
+def _create_task(loop, coro, context=None):
+    # asyncio's own tasks run on any loop; QAsyncioTask breaks asyncio.gather() when cancelled
+    return asyncio.Task(coro, loop=loop, context=context)
+
+
+def event_loop():
+    """Get the asyncio event loop driven by the Qt event loop, installing QtAsyncio's policy on first use"""
+    if QCoreApplication.instance() is None:
+        # The policy would create a QCoreApplication, and a QApplication made later would fail
+        raise RuntimeError("Create the application before running node lifecycles")
+    policy = asyncio.get_event_loop_policy()
+    if not isinstance(policy, QAsyncioEventLoopPolicy):
+        # Stopping the loop mustn't quit the application, which would close every window
+        policy = QAsyncioEventLoopPolicy(quit_qapp=False)
+        asyncio.set_event_loop_policy(policy)
+    loop = policy.get_event_loop()
+    if loop.is_closed():
+        loop = policy.new_event_loop()
+        policy.set_event_loop(loop)
+    if loop.get_task_factory() is None:
+        loop.set_task_factory(_create_task)
+    return loop
+
+
+def run_soon(coro):
+    """Schedule a coroutine on the Qt-driven event loop and return its task"""
+    return event_loop().create_task(coro)
+
+
+def run_until_complete(coro):
+    """
+    Run the Qt event loop as the asyncio loop until coro finishes and return
+    its result, for scripts and tests that aren't inside run_forever().
+    """
+    loop = event_loop()
+    task = loop.create_task(coro)
+
+    def finished(task):
+        # exit() ends run_forever() without closing windows, unlike quit()
+        loop.stop()
+        QCoreApplication.exit(0)
+
+    task.add_done_callback(finished)
+    loop.run_forever()
+    return task.result()
@@ -1,10 +1,25 @@
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow
+from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
+from PySide6.QtGui import QAction, QKeySequence, QUndoGroup
 from scene import NodeScene
 from view import NodeView
 
 # Import node classes from their respective packages
 from packages.base import BaseNode
+import graph_io
+import instrumentation
+import launcher
+import lifecycle
+from launch_export import LaunchExporter
+from launcher import GraphLauncher, BulkOperation
+from node_registry import default_registry
+from subgraph import PASTE_OFFSET
+from supervisor import Supervisor, install_supervisor
+
+# File dialog filter for the supported graph formats
+GRAPH_FILE_FILTER = "Node graphs (*.rgraph);;JSON lines graphs (*.jsonl)"
+LAUNCH_FILE_FILTER = "ROS 2 launch files (*.launch.py *.py)"
+COUNTERS_FILE_FILTER = "JSON files (*.json)"
 
 
 class MainWindow(QMainWindow):
@@ -12,12 +27,256 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Node-Based Editor")
         self.resize(800, 600)
+
+        # Run each node's command as a supervised child process
+        self.supervisor = Supervisor(parent=self)
+        install_supervisor(self.supervisor)
+        self.scene = NodeScene()
+        self.view = NodeView(self.scene)
+        self.view.setPerformanceMode(True)
+        self.setCentralWidget(self.view)
+        
+        # File menu for saving and loading graphs
+        file_menu = self.menuBar().addMenu("&File")
+        open_action = QAction("&Open...", self)
+        open_action.setShortcut(QKeySequence.Open)
+        open_action.triggered.connect(self.open_graph)
+        file_menu.addAction(open_action)
+        save_action = QAction("&Save As...", self)
+        save_action.setShortcut(QKeySequence.SaveAs)
+        save_action.triggered.connect(self.save_graph)
+        file_menu.addAction(save_action)
+        export_action = QAction("&Export Launch File...", self)
+        export_action.setShortcut(QKeySequence("Ctrl+E"))
+        export_action.triggered.connect(self.export_launch_file)
+        file_menu.addAction(export_action)
+        # Reused between exports, so that re-exporting only renders the nodes that changed
+        self.launch_exporter = LaunchExporter()
+
+        # Edit menu; undo and redo follow the undo stack of the current scene
+        edit_menu = self.menuBar().addMenu("&Edit")
+        self.undo_group = QUndoGroup(self)
+        self.undo_group.addStack(self.scene.undo_stack)
+        self.undo_group.setActiveStack(self.scene.undo_stack)
+        undo_action = self.undo_group.createUndoAction(self, "&Undo")
+        undo_action.setShortcut(QKeySequence.Undo)
+        edit_menu.addAction(undo_action)
+        redo_action = self.undo_group.createRedoAction(self, "&Redo")
+        redo_action.setShortcut(QKeySequence.Redo)
+        edit_menu.addAction(redo_action)
+        edit_menu.addSeparator()
+        for text, shortcut, slot in (("&Copy", QKeySequence.Copy, self.copy_selection),
+                                     ("&Paste", QKeySequence.Paste, self.paste),
+                                     ("D&uplicate", QKeySequence("Ctrl+D"), self.duplicate_selection)):
+            action = QAction(text, self)
+            action.setShortcut(shortcut)
+            action.triggered.connect(slot)
+            edit_menu.addAction(action)
+        # Nodes copied last, and how many times they have been pasted
+        self.clipboard = None
+        self.paste_count = 0
+        delete_action = QAction("&Delete", self)
+        delete_action.setShortcut(QKeySequence.Delete)
+        delete_action.triggered.connect(lambda: self.scene.deleteNodes(self.scene.selectedNodes()))
+        edit_menu.addAction(delete_action)
+
+        # View menu; the performance overlay shows where frame time goes
+        view_menu = self.menuBar().addMenu("&View")
+        self.hud_action = QAction("Performance &HUD", self)
+        self.hud_action.setCheckable(True)
+        self.hud_action.setShortcut(QKeySequence("F12"))
+        self.hud_action.toggled.connect(lambda visible: self.view.setHudVisible(visible))
+        view_menu.addAction(self.hud_action)
+        # Hot-path counters, to attach to bug reports
+        view_menu.addSeparator()
+        self.counters_action = QAction("Record Performance &Counters", self)
+        self.counters_action.setCheckable(True)
+        self.counters_action.toggled.connect(self.record_counters)
+        view_menu.addAction(self.counters_action)
+        export_counters_action = QAction("&Export Performance Counters...", self)
+        export_counters_action.triggered.connect(self.export_counters)
+        view_menu.addAction(export_counters_action)
+
+        # Graph menu for launching the whole graph in dependency order
+        graph_menu = self.menuBar().addMenu("&Graph")
+        self.run_graph_action = QAction("&Run Graph", self)
+        self.run_graph_action.setShortcut(QKeySequence("Ctrl+R"))
+        self.run_graph_action.triggered.connect(self.run_graph)
+        graph_menu.addAction(self.run_graph_action)
+        self.launcher = None
+
+        # Run/stop/restart for the selected nodes, or every node of a category
+        graph_menu.addSeparator()
+        for text, shortcut, operation in (
+                ("Run &Selected", "Ctrl+Shift+R", launcher.START),
+                ("S&top Selected", "Ctrl+Shift+T", launcher.STOP),
+                ("R&estart Selected", "Ctrl+Shift+E", launcher.RESTART)):
+            action = QAction(text, self)
+            action.setShortcut(QKeySequence(shortcut))
+            action.triggered.connect(lambda checked=False, operation=operation:
+                                     self.run_bulk(operation, self.scene.selectedNodes()))
+            graph_menu.addAction(action)
+        self.category_menus = {}
+        for text, operation in (("Run Category", launcher.START),
+                                ("Stop Category", launcher.STOP),
+                                ("Restart Category", launcher.RESTART)):
+            self.category_menus[operation] = graph_menu.addMenu(text)
+            self.category_menus[operation].aboutToShow.connect(
+                lambda operation=operation: self.fill_category_menu(operation))
+        self.bulk_operations = set()
+
+        # Arrange the selected nodes, or the whole graph, in columns following the dataflow
+        graph_menu.addSeparator()
+        layout_action = QAction("Auto &Layout", self)
+        layout_action.setShortcut(QKeySequence("Ctrl+L"))
+        layout_action.triggered.connect(lambda: self.scene.layoutNodes(self.scene.selectedNodes() or None))
+        graph_menu.addAction(layout_action)
+
+    def open_graph(self):
+        """Replace the current graph with one loaded from a file"""
+        path, _ = QFileDialog.getOpenFileName(self, "Open Graph", "", GRAPH_FILE_FILTER)
+        if not path:
+            return
         scene = NodeScene()
-        view = NodeView(scene)
-        self.setCentralWidget(view)
+        try:
+            graph_io.load_graph(scene, path)
+        except (OSError, graph_io.GraphFormatError) as error:
+            QMessageBox.warning(self, "Open Graph", f"Could not open {path}:\n{error}")
+            return
+        # The old graph's nodes go with it, so stop their processes
+        for node in self.scene.nodes():
+            node.release()
+        self.undo_group.removeStack(self.scene.undo_stack)
+        self.undo_group.addStack(scene.undo_stack)
+        self.undo_group.setActiveStack(scene.undo_stack)
+        self.scene = scene
+        # The overlay times paint calls of every view while shown, so stop it with the old view
+        self.view.setHudVisible(False)
+        self.view = NodeView(scene)
+        self.view.setPerformanceMode(True)
+        self.view.setHudVisible(self.hud_action.isChecked())
+        self.setCentralWidget(self.view)
+
+    def save_graph(self):
+        """Save the current graph to a file"""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Graph", "", GRAPH_FILE_FILTER)
+        if not path:
+            return
+        try:
+            graph_io.save_graph(self.scene, path)
+        except OSError as error:
+            QMessageBox.warning(self, "Save Graph", f"Could not save {path}:\n{error}")
+
+    def export_launch_file(self):
+        """Export the current graph as a ROS 2 launch file"""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Launch File", "", LAUNCH_FILE_FILTER)
+        if not path:
+            return
+        try:
+            self.launch_exporter.write(self.scene, path)
+        except OSError as error:
+            QMessageBox.warning(self, "Export Launch File", f"Could not export {path}:\n{error}")
+            return
+        self.statusBar().showMessage(
+            f"Exported {path}: {self.launch_exporter.rendered} nodes rendered, {self.launch_exporter.reused} reused")
+
+    def record_counters(self, enabled):
+        """Start counting hot-path calls from zero, or stop counting (keeping the figures for export)"""
+        if enabled:
+            instrumentation.reset()
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    def export_counters(self):
+        """Save the hot-path counters as JSON"""
+        path, _ = QFileDialog.getSaveFileName(self, "Export Performance Counters", "", COUNTERS_FILE_FILTER)
+        if not path:
+            return
+        try:
+            instrumentation.dump(path)
+        except OSError as error:
+            QMessageBox.warning(self, "Export Performance Counters", f"Could not export {path}:\n{error}")
+
+    def copy_selection(self):
+        """Copy the selected nodes and the connections among them"""
+        nodes = self.scene.selectedNodes()
+        if nodes:
+            self.clipboard = self.scene.copyNodes(nodes)
+            self.paste_count = 0
+
+    def paste(self):
+        """Paste the copied nodes, each paste a little further from the originals"""
+        if self.clipboard is None:
+            return
+        self.paste_count += 1
+        self.scene.pasteSubgraph(self.clipboard, PASTE_OFFSET[0] * self.paste_count,
+                                 PASTE_OFFSET[1] * self.paste_count)
+
+    def duplicate_selection(self):
+        """Paste a copy of the selected nodes next to them"""
+        nodes = self.scene.selectedNodes()
+        if nodes:
+            self.scene.duplicateNodes(nodes)
+
+    def closeEvent(self, event):
+        """Stop every node process before the editor exits"""
+        self.supervisor.shutdown()
+        install_supervisor(None)
+        super().closeEvent(event)
+
+    def run_graph(self):
+        """Start every node of the graph, upstream nodes first"""
+        self.launcher = GraphLauncher(self.scene, parent=self)
+        self.launcher.nodeReady.connect(
+            lambda node, latency: self.statusBar().showMessage(f"{node.title} ready in {latency * 1000:.0f} ms"))
+        self.launcher.finished.connect(self.graph_launched)
+        self.run_graph_action.setEnabled(False)
+        self.launcher.start()
+
+    def fill_category_menu(self, operation):
+        """List the node categories, each applying operation to its nodes"""
+        menu = self.category_menus[operation]
+        menu.clear()
+        for category in default_registry().categories():
+            action = menu.addAction(category.split('/')[-1])
+            action.triggered.connect(lambda checked=False, category=category:
+                                     self.run_bulk(operation, self.scene.nodesInCategory(category)))
+
+    def run_bulk(self, operation, nodes):
+        """Start, stop or restart nodes a few at a time, upstream nodes first"""
+        if not nodes:
+            self.statusBar().showMessage("No nodes to " + operation)
+            return
+        nodes = self.scene.inDependencyOrder(nodes)
+        if operation == launcher.STOP:
+            # Stop consumers before the nodes feeding them
+            nodes.reverse()
+        bulk = BulkOperation(nodes, operation, parent=self)
+        bulk.finished.connect(lambda report: self.bulk_finished(bulk, report))
+        self.bulk_operations.add(bulk)
+        verb = {launcher.START: "Starting", launcher.STOP: "Stopping", launcher.RESTART: "Restarting"}[operation]
+        self.statusBar().showMessage(f"{verb} {len(nodes)} nodes...")
+        bulk.start()
+
+    def bulk_finished(self, bulk, report):
+        """Show the outcome of a bulk run/stop/restart"""
+        self.bulk_operations.discard(bulk)
+        bulk.deleteLater()
+        self.statusBar().showMessage(report.summary())
+        if not report.ok:
+            QMessageBox.warning(self, "Nodes", report.summary())
+
+    def graph_launched(self, report):
+        """Show the outcome of a graph launch"""
+        self.run_graph_action.setEnabled(True)
+        self.statusBar().showMessage(report.summary())
+        if not report.ok:
+            QMessageBox.warning(self, "Run Graph", report.format())
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    # Run Qt's event loop through the asyncio loop, so node lifecycle hooks can await
+    lifecycle.event_loop().run_forever()
@@ -0,0 +1,79 @@
+"""
+ROS message types of ports.
+
+Every type name is interned to a small integer id the first time it is
+seen, and which output types may feed which input types is kept as a
+precomputed compatibility matrix: one row per output type, indexed by input
+type id. Checking a pair of ports is then two indexing operations, however
+many types and extra compatibilities are registered.
+
+A type is compatible with itself, ANY (untyped ports, e.g. on generic
+nodes) is compatible with everything, and further pairs can be declared
+with allow().
+"""
+
+# Type of ports that accept or produce any message
+ANY = 'any'
+
+# Common message types of the built-in node packages
+TWIST = 'geometry_msgs/Twist'
+POSE_STAMPED = 'geometry_msgs/PoseStamped'
+LASER_SCAN = 'sensor_msgs/LaserScan'
+JOY = 'sensor_msgs/Joy'
+JOINT_STATE = 'sensor_msgs/JointState'
+ODOMETRY = 'nav_msgs/Odometry'
+PATH = 'nav_msgs/Path'
+OCCUPANCY_GRID = 'nav_msgs/OccupancyGrid'
+TF_MESSAGE = 'tf2_msgs/TFMessage'
+FLOAT64_MULTI_ARRAY = 'std_msgs/Float64MultiArray'
+
+# Type name -> id, and id -> type name
+_ids = {}
+_names = []
+# Declared (output type id, input type id) pairs on top of the default rules
+_allowed = set()
+# _matrix[output type id][input type id] is 1 if the link is allowed
+_matrix = []
+
+
+def _compatible(source, target):
+    return source == target or source == 0 or target == 0 or (source, target) in _allowed
+
+
+def type_id(name):
+    """Get the id of a message type, registering it if it is new"""
+    id = _ids.get(name)
+    if id is None:
+        id = _ids[name] = len(_names)
+        _names.append(name)
+        # Grow the matrix by one column and one row
+        for source, row in enumerate(_matrix):
+            row.append(_compatible(source, id))
+        _matrix.append(bytearray(_compatible(id, target) for target in range(id + 1)))
+    return id
+
+
+def type_name(id):
+    """Get the name of a message type from its id"""
+    return _names[id]
+
+
+def allow(output_type, input_type):
+    """Declare that ports of output_type may feed ports of input_type"""
+    source, target = type_id(output_type), type_id(input_type)
+    _allowed.add((source, target))
+    _matrix[source][target] = 1
+
+
+def compatible(output_id, input_id):
+    """Whether an output of one type id may be connected to an input of another"""
+    return _matrix[output_id][input_id]
+
+
+def compatible_inputs(output_id):
+    """The row of the matrix for an output type: indexed by input type id, truthy if allowed"""
+    return _matrix[output_id]
+
+
+# ANY gets id 0, which _compatible relies on
+type_id(ANY)
@@ -2,6 +2,11 @@ from PySide6.QtWidgets import QMenu, QLineEdit, QVBoxLayout, QWidget, QWidgetAct
 from PySide6.QtCore import Qt, Signal, QEvent, QObject
 from PySide6.QtGui import QFont, QAction
 
+from search_index import SearchIndex
+
+# Maximum number of matches listed while searching
+SEARCH_RESULT_LIMIT = 20
+
 class NodeSearchMenu(QMenu):
     """
     Custom menu with search functionality for node selection.
@@ -20,7 +25,8 @@ class NodeSearchMenu(QMenu):
         # Create the search bar
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Search nodes...")
-        self.search_bar.textChanged.connect(self.filter_nodes)
+        # Looked up on each change, so that instrumentation can wrap filter_nodes
+        self.search_bar.textChanged.connect(lambda text: self.filter_nodes(text))
         self.search_layout.addWidget(self.search_bar)
         
         # Add the search widget to the menu
@@ -29,12 +35,32 @@ class NodeSearchMenu(QMenu):
         self.addAction(search_action)
         
         # Add a separator
-        self.addSeparator()
+        separator = self.addSeparator()
         
         # Store all node actions
         self.all_node_actions = {}
         self.section_titles = {}
         self.submenus = {}
+
+        # Ranked search over every node action, keyed by node name
+        self.search_index = SearchIndex()
+        self.searching = False
+
+        # Reusable actions listing the best matches while searching
+        self.result_actions = []
+        for _ in range(SEARCH_RESULT_LIMIT):
+            action = QAction(self)
+            action.setVisible(False)
+            self.addAction(action)
+            self.result_actions.append(action)
+        self.no_results_action = QAction("No matching nodes", self)
+        self.no_results_action.setEnabled(False)
+        self.no_results_action.setVisible(False)
+        self.addAction(self.no_results_action)
+
+        # Actions that aren't part of the category tree
+        self.search_actions = set(self.result_actions)
+        self.search_actions.update((search_action, separator, self.no_results_action))
         
         # Install event filter to handle key navigation
         self.installEventFilter(self)
@@ -112,79 +138,78 @@ class NodeSearchMenu(QMenu):
             action = QAction(node_name, self)
             self.addAction(action)
         
+        # The chosen action leads straight back to its node type
+        action.setData(node_class)
+
         # Store the action info
         self.all_node_actions[node_name] = {
             'action': action,
             'category': category,
             'node_class': node_class
         }
+
+        # Index the name along with the node type's ports and description
+        ports = tuple(getattr(node_class, 'inputs', ())) + tuple(getattr(node_class, 'outputs', ()))
+        self.search_index.add(node_name, node_name, category, ports,
+                              getattr(node_class, 'description', ''))
+
+        if self.searching:
+            # Keep the new entry's section hidden and include it in the results
+            self.searching = False
+            self.filter_nodes(self.search_bar.text())
         
         return action
         
+    def add_node_type(self, node_type):
+        """Add an action for a registered node type (hidden types have no category)"""
+        if node_type.category is None or node_type.name in self.all_node_actions:
+            return None
+        return self.add_node_action(node_type.category, node_type.name, node_type, submenu=True)
+
+    def populate(self, registry):
+        """Add every node type of a registry, and any registered later"""
+        for node_type in registry:
+            self.add_node_type(node_type)
+        registry.add_listener(self.add_node_type)
+
+    def set_searching(self, searching):
+        """Switch between browsing the category tree and listing search results"""
+        if searching == self.searching:
+            return
+        self.searching = searching
+
+        # Only the top level of the tree needs hiding, submenu contents are untouched
+        for action in self.actions():
+            if action not in self.search_actions:
+                action.setVisible(not searching)
+        if not searching:
+            for action in self.result_actions:
+                action.setVisible(False)
+            self.no_results_action.setVisible(False)
+
     def filter_nodes(self, text):
         """Filter nodes based on search text"""
-        # If search is empty, show all categories and nodes
-        if not text:
-            # Show all section titles
-            for title, action in self.section_titles.items():
-                action.setVisible(True)
-                
-            # Show all submenus
-            for key, submenu in self.submenus.items():
-                submenu.menuAction().setVisible(True)
-                
-            # Show all node actions
-            for node_info in self.all_node_actions.values():
-                node_info['action'].setVisible(True)
-                
-            # Show all separators
-            for action in self.actions():
-                if action.isSeparator():
-                    action.setVisible(True)
-                    
+        if not text.strip():
+            self.set_searching(False)
             return
-            
-        # Convert search text to lowercase for case-insensitive search
-        text = text.lower()
-        
-        # Track which categories have visible nodes
-        visible_categories = set()
-        visible_submenus = set()
-        
-        # First pass: determine which nodes match the search
-        for node_name, node_info in self.all_node_actions.items():
-            visible = text in node_name.lower()
-            node_info['action'].setVisible(visible)
-            
-            if visible:
-                category = node_info['category']
-                if '/' in category:
-                    # This is a submenu item
-                    visible_submenus.add(category)
-                    # Also mark the parent section as visible
-                    visible_categories.add(category.split('/')[0])
-                else:
-                    # This is a direct section item
-                    visible_categories.add(category)
-                
-        # Second pass: show/hide section titles and separators
-        for title, action in self.section_titles.items():
-            action.setVisible(title in visible_categories)
-            
-        # Show/hide submenus
-        for key, submenu in self.submenus.items():
-            submenu.menuAction().setVisible(key in visible_submenus)
-            
-        # Hide separators if no nodes are visible in a category
-        prev_was_separator = False
-        for action in self.actions():
-            if action.isSeparator():
-                # Don't show consecutive separators
-                if prev_was_separator:
-                    action.setVisible(False)
-                prev_was_separator = True
+        self.set_searching(True)
+
+        # List the best matches in the reusable result actions
+        names = self.search_index.search(text, len(self.result_actions))
+        for index, action in enumerate(self.result_actions):
+            if index < len(names):
+                node_info = self.all_node_actions[names[index]]
+                # Show the category in the shortcut column
+                action.setText(f"{names[index]}\t{node_info['category'].split('/')[-1]}")
+                action.setData(node_info['action'].data())
+                action.setVisible(True)
             else:
-                prev_was_separator = False
+                action.setVisible(False)
+        self.no_results_action.setVisible(not names)
+
+        # Highlight the best match
+        if names:
+            self.setActiveAction(self.result_actions[0])
                 
     def eventFilter(self, obj, event):
         """Handle keyboard events for the menu"""
@@ -199,6 +224,12 @@ class NodeSearchMenu(QMenu):
                     
         return super().eventFilter(obj, event)
         
+    def hideEvent(self, event):
+        """Clear the search so the menu is complete the next time it's shown"""
+        super().hideEvent(event)
+        if self.search_bar.text():
+            self.search_bar.clear()
+
     def showEvent(self, event):
         """Focus the search bar when the menu is shown"""
         super().showEvent(event)
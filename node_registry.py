@@ -0,0 +1,193 @@
+"""
+Registry of available node types.
+
+Node types are described by ``manifest.json`` files that sit next to the
+code of each node package. A manifest names the module and class of each
+node together with its display name, category, description and ports, so
+the editor can list and search node types without importing any node
+code. A node's module is imported the first time a node of that type is
+created.
+
+Manifests are found in every sub-directory of ``packages/`` and in the
+packages advertised by installed distributions under the
+``ENTRY_POINT_GROUP`` entry point group, e.g. in a plugin's pyproject.toml::
+
+    [project.entry-points."robot_os_node_editor.packages"]
+    my_nodes = "my_nodes"
+
+where ``my_nodes`` is a package containing a manifest.json.
+"""
+import importlib
+import importlib.util
+import json
+import os
+import types
+import weakref
+from importlib.metadata import entry_points
+
+MANIFEST_NAME = 'manifest.json'
+ENTRY_POINT_GROUP = 'robot_os_node_editor.packages'
+
+# Directory holding the node packages shipped with the editor
+PACKAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'packages')
+
+
+class NodeType:
+    """Metadata for one kind of node; the node class itself is imported on demand"""
+    __slots__ = ('type_name', 'name', 'category', 'module', 'description',
+                 'inputs', 'outputs', '_node_class')
+
+    def __init__(self, type_name, name, category, module, description='',
+                 inputs=(), outputs=(), node_class=None):
+        self.type_name = type_name
+        self.name = name
+        self.category = category
+        self.module = module
+        self.description = description
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self._node_class = node_class
+
+    def __repr__(self):
+        return f"NodeType({self.type_name!r}, category={self.category!r})"
+
+    @property
+    def is_loaded(self):
+        """Whether the node class has been imported yet"""
+        return self._node_class is not None
+
+    def load_class(self):
+        """Import (once) and return the node class"""
+        if self._node_class is None:
+            module = importlib.import_module(self.module)
+            self._node_class = getattr(module, self.type_name)
+        return self._node_class
+
+    def create(self):
+        """Create a new node of this type (see BaseNode.create)"""
+        return self.load_class().create()
+
+
+class NodeRegistry:
+    """Collection of node types keyed by type name"""
+    def __init__(self):
+        self._types = {}
+        self._listeners = []
+
+    def __len__(self):
+        return len(self._types)
+
+    def __iter__(self):
+        return iter(self._types.values())
+
+    def __contains__(self, type_name):
+        return type_name in self._types
+
+    def get(self, type_name):
+        """Get a node type by name, or None if it isn't registered"""
+        return self._types.get(type_name)
+
+    def register(self, node_type):
+        """Add (or replace) a node type and notify listeners"""
+        self._types[node_type.type_name] = node_type
+        for listener in list(self._listeners):
+            callback = listener()
+            if callback is None:
+                # The listener's owner has been deleted
+                self._listeners.remove(listener)
+            else:
+                callback(node_type)
+        return node_type
+
+    def register_class(self, node_class, name=None, category=None, description=''):
+        """Register an already imported node class"""
+        return self.register(NodeType(
+            node_class.__name__, name or node_class.__name__, category, node_class.__module__,
+            description, node_class=node_class,
+        ))
+
+    def add_listener(self, callback):
+        """
+        Call callback(node_type) whenever a node type is registered.
+
+        Bound methods are held weakly so that listening doesn't keep their
+        object (e.g. a menu) alive.
+        """
+        if isinstance(callback, types.MethodType):
+            self._listeners.append(weakref.WeakMethod(callback))
+        else:
+            self._listeners.append(lambda: callback)
+
+    def remove_listener(self, callback):
+        self._listeners = [listener for listener in self._listeners if listener() != callback]
+
+    def categories(self):
+        """Get the node types grouped by category, in registration order"""
+        grouped = {}
+        for node_type in self._types.values():
+            if node_type.category:
+                grouped.setdefault(node_type.category, []).append(node_type)
+        return grouped
+
+    def create(self, type_name):
+        """Create a new node of the given type"""
+        node_type = self._types.get(type_name)
+        if node_type is None:
+            raise KeyError(f"Unknown node type: {type_name}")
+        return node_type.create()
+
+    def load_manifest(self, path):
+        """Register every node type listed in a manifest file"""
+        with open(path, 'r', encoding='utf-8') as stream:
+            manifest = json.load(stream)
+
+        default_category = manifest.get('category')
+        registered = []
+        for entry in manifest.get('nodes', []):
+            registered.append(self.register(NodeType(
+                entry['type'],
+                entry.get('name', entry['type']),
+                entry.get('category', default_category),
+                entry['module'],
+                entry.get('description', ''),
+                entry.get('inputs', ()),
+                entry.get('outputs', ()),
+            )))
+        return registered
+
+    def discover(self, packages_dir=PACKAGES_DIR):
+        """Load the manifest of every package directly under packages_dir"""
+        for entry in sorted(os.listdir(packages_dir)):
+            path = os.path.join(packages_dir, entry, MANIFEST_NAME)
+            if os.path.isfile(path):
+                self.load_manifest(path)
+
+    def discover_entry_points(self, group=ENTRY_POINT_GROUP):
+        """Load the manifests of packages advertised by installed distributions"""
+        for entry_point in entry_points(group=group):
+            # Locate the package without importing it
+            spec = importlib.util.find_spec(entry_point.value)
+            if spec is None or not spec.submodule_search_locations:
+                continue
+            for location in spec.submodule_search_locations:
+                path = os.path.join(location, MANIFEST_NAME)
+                if os.path.isfile(path):
+                    self.load_manifest(path)
+
+
+_default_registry = None
+
+
+def default_registry():
+    """Get the registry of built-in and installed node types, discovering them on first use"""
+    global _default_registry
+    if _default_registry is None:
+        from packages.base.node import BaseNode
+
+        registry = NodeRegistry()
+        # Plain nodes can be saved and loaded but aren't offered in the palette
+        registry.register_class(BaseNode, name="Base Node")
+        registry.discover()
+        registry.discover_entry_points()
+        _default_registry = registry
+    return _default_registry
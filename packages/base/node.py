@@ -1,16 +1,97 @@
+import asyncio
+import copy
+import math
+
 from PySide6.QtWidgets import QGraphicsItem
 from PySide6.QtCore import QRectF, QPointF, Qt
-from PySide6.QtGui import QPainter, QBrush, QPen, QColor, QFont
+from PySide6.QtGui import QPainter, QPainterPath, QBrush, QPen, QColor, QFont, QFontMetricsF, QPixmap
+
+from graph_model import ConnectionSet, NodeModel, PortModel
+import message_types
+import supervisor
+import validation
+import lifecycle
+from lifecycle import STOPPED, STARTING, RUNNING, STOPPING
+
+# Distance (in scene units) within which a click or drop counts as hitting a port
+PORT_HIT_RADIUS = 10
+
+# Zoom range over which node chrome is drawn from the shared pixmap cache
+CHROME_CACHE_MIN_ZOOM = 0.125
+CHROME_CACHE_MAX_ZOOM = 2.0
+CHROME_CACHE_LIMIT = 512
+
+# Level-of-detail tiers (view scale): below LOD_LOW_THRESHOLD nodes are flat
+# rectangles and connections straight lines; below LOD_MEDIUM_THRESHOLD port
+# labels are skipped
+LOD_LOW_THRESHOLD = 0.35
+LOD_MEDIUM_THRESHOLD = 0.6
+
+# Item change values compared in BaseNode.itemChange, looked up once: attribute
+# access on PySide6 enums is slow enough to matter for a method called this often
+_POSITION_HAS_CHANGED = QGraphicsItem.ItemPositionHasChanged
+_SCENE_CHANGE = QGraphicsItem.ItemSceneChange
+_SCENE_HAS_CHANGED = QGraphicsItem.ItemSceneHasChanged
+_SELECTED_HAS_CHANGED = QGraphicsItem.ItemSelectedHasChanged
+
+# Shared rendering resources, keyed by _chrome_key() and (size, bold) respectively
+_chrome_cache = {}
+_fonts = {}
+
+# Prototype instance of each node class, used by BaseNode.prototype()
+_prototypes = {}
+
+# Per-instance state that BaseNode.clone() resets instead of copying
+_CLONE_SKIP = frozenset((
+    'model', 'input_ports', 'output_ports', '_shape_path',
+    'port_under_mouse', 'candidate_ports', '_dragging', '_drag_start_pos', '_drag_nodes',
+    '_lifecycle_state', '_lifecycle_task', 'lifecycle_error',
+    'validation_issues', '_badge_color',
+))
+# Attribute types BaseNode.clone() shares instead of copying
+_IMMUTABLE_TYPES = frozenset((int, float, bool, str, tuple, frozenset, type(None)))
+
+# Radius of the validation badge in the header, and its color for each severity
+BADGE_RADIUS = 8
+_BADGE_COLORS = {
+    validation.ERROR: QColor(220, 60, 60),
+    validation.WARNING: QColor(230, 170, 40),
+    validation.INFO: QColor(90, 140, 210),
+}
+_ALIGN_CENTER = Qt.AlignCenter
+
+# Run/stop button label for each run state
+_BUTTON_TEXT = {STOPPED: "RUN", STARTING: "...", RUNNING: "STOP", STOPPING: "..."}
 
 class Port:
-    def __init__(self, node, name, is_input=True):
+    def __init__(self, node, name, is_input=True, msg_type=message_types.ANY, required=False):
         self.node = node
         self.name = name
         self.is_input = is_input
-        self.connections = []  # List of connections attached to this port
+        # Graph state of the port; the node registers it with its own model
+        self.model = PortModel(node.model if hasattr(node, 'model') else None, name, is_input, msg_type, required)
+        self.connections = ConnectionSet()  # Connections attached to this port
         self.relative_pos = QPointF(0, 0)  # Will be set by node
         self.radius = node.port_radius if hasattr(node, 'port_radius') else 8  # Port radius
 
+    @property
+    def msg_type(self):
+        """ROS message type carried by the port, e.g. geometry_msgs/Twist"""
+        return self.model.msg_type
+
+    def clone(self, node):
+        """Create a copy of this port (name, direction, type, position) on another node"""
+        # Filled in directly: __init__ would look up defaults that are all overwritten here
+        port = Port.__new__(Port)
+        port.node = node
+        port.name = self.name
+        port.is_input = self.is_input
+        port.model = PortModel(node.model, self.name, self.is_input, self.model.msg_type, self.model.required)
+        port.connections = ConnectionSet()
+        port.relative_pos = QPointF(self.relative_pos)
+        port.radius = self.radius
+        return port
+
     def get_scene_pos(self):
         """Get the port position in scene coordinates"""
         if not self.node or not self.node.scene():
@@ -18,14 +99,14 @@ class Port:
         return self.node.mapToScene(self.relative_pos)
 
     def contains_point(self, point):
-        """Check if the given point (in node coordinates) is within the port circle"""
+        """Check if the given point (in node coordinates) is within the port's hit radius"""
         port_center = self.relative_pos
         diff = point - port_center
-        return (diff.x() * diff.x() + diff.y() * diff.y()) <= (self.radius * self.radius)
+        return (diff.x() * diff.x() + diff.y() * diff.y()) <= (PORT_HIT_RADIUS * PORT_HIT_RADIUS)
 
     def disconnect_all(self):
         """Disconnect all connections from this port"""
-        # Create a copy of the list since we'll be modifying it
+        # Create a copy of the set since we'll be modifying it
         connections_copy = self.connections.copy()
         for connection in connections_copy:
             connection.disconnectFromPorts()
@@ -41,13 +122,39 @@ class Port:
         return connected_nodes
 
 class BaseNode(QGraphicsItem):
+    """
+    Graphics item for a node.
+
+    The item is a view of a NodeModel: title, position, run state and ports
+    are stored in self.model, which NodeScene adds to its GraphModel.
+
+    Nodes with a command run it as a child process while they are running,
+    under the installed supervisor (see supervisor.install_supervisor), and
+    their run state follows the process. Slow startup or shutdown work goes
+    in the async_on_start/async_on_stop coroutines, which run on the
+    Qt-driven asyncio loop while the node shows as starting or stopping.
+    """
+    # Program and arguments this node runs, or None for nodes without a process
+    command = None
+    # What to do when the process exits on its own (see supervisor.RESTART_*)
+    restart_policy = supervisor.RESTART_ON_FAILURE
+    # Whether new nodes of this class may be cloned from a prototype instead of
+    # being built by __init__ (see clones_from_prototype). Only for classes whose
+    # __init__ adds ports and sets colors and plain values: clones share or
+    # shallow-copy everything else. A subclass defining its own __init__ has to
+    # opt in again
+    clone_from_prototype = True
+
     def __init__(self, title="Base Node"):
         super().__init__()
+        self.model = NodeModel(type(self).__name__, title)
         
         # Set basic flags - these determine how the item can be interacted with
-        self.setFlag(QGraphicsItem.ItemIsMovable)
-        self.setFlag(QGraphicsItem.ItemIsSelectable)
-        self.setFlag(QGraphicsItem.ItemSendsScenePositionChanges)
+        self.setFlags(
+            QGraphicsItem.ItemIsMovable |
+            QGraphicsItem.ItemIsSelectable |
+            QGraphicsItem.ItemSendsScenePositionChanges
+        )
         
         # Visual properties
         self.width = 180
@@ -66,37 +173,178 @@ class BaseNode(QGraphicsItem):
         self.border_color = QColor(100, 100, 100) # Medium gray for borders
         self.run_button_color = QColor(50, 180, 50)  # Green for run
         self.stop_button_color = QColor(180, 50, 50)  # Red for stop
+        self.pending_button_color = QColor(200, 160, 40)  # Amber while starting or stopping
+        self.candidate_port_color = QColor(120, 220, 120)  # Ports a dragged connection can end on
         
         # Port management
         self.input_ports = {}
         self.output_ports = {}
+        self._shape_path = None
         
         # Interaction state
         self.port_under_mouse = None
+        # Ports highlighted as valid ends of the connection being dragged, set by the scene
+        self.candidate_ports = ()
         self._dragging = False
         self._drag_start_pos = QPointF()
+        # Nodes moved by the current drag: the selection, or just this node
+        self._drag_nodes = ()
         
         # Run/Stop button properties
         self.is_running = False
+        # STARTING/STOPPING while an async lifecycle hook runs, else None
+        self._lifecycle_state = None
+        # Task running the latest async hook; superseded ones are cancelled
+        self._lifecycle_task = None
+        # Why the last async hook failed, if it did
+        self.lifecycle_error = None
+        # Problems found by the scene's validator, shown as a badge
+        self.validation_issues = ()
+        self._badge_color = None
         self.button_size = 20
         self.button_margin = 10
         
         # Accept hover events
         self.setAcceptHoverEvents(True)
 
-    def add_input_port(self, name):
-        port = Port(self, name, is_input=True)
-        self.input_ports[name] = port
+    @classmethod
+    def clones_from_prototype(cls):
+        """Whether the nearest class setting clone_from_prototype also defines this class's __init__, and sets it"""
+        for klass in cls.__mro__:
+            if 'clone_from_prototype' in klass.__dict__:
+                return klass.__dict__['clone_from_prototype']
+            if '__init__' in klass.__dict__:
+                return False
+        return False
+
+    @classmethod
+    def create(cls, pos=None):
+        """Create a new node of this class at pos (x, y), cloned from the class prototype if the class allows it"""
+        if cls.clones_from_prototype():
+            return cls.prototype().clone(pos)
+        node = cls()
+        if pos is not None:
+            node.setPos(*pos)
+        return node
+
+    @classmethod
+    def prototype(cls):
+        """Get a shared instance of this class to clone new nodes from (never added to a scene)"""
+        node = _prototypes.get(cls)
+        if node is None:
+            node = _prototypes[cls] = cls()
+        return node
+
+    def clone(self, pos=None):
+        """
+        Create a new node that looks like this one: title, colors, ports and layout.
+
+        For classes that allow it (see clone_from_prototype) the subclass
+        __init__ is not run again, and ports are copied in one go instead of
+        being laid out after every add_*_port call. Position, selection,
+        connections and run state are not copied; pass pos (x, y) to place
+        the new node, which is cheaper than calling setPos on it.
+        """
+        cls = type(self)
+        if not cls.clones_from_prototype():
+            return self._rebuild(pos)
+        node = cls.__new__(cls)
+        QGraphicsItem.__init__(node)
+        node.model = NodeModel(self.model.type_name, self.model.title)
+        if pos is not None:
+            # Before the flags are set, moving the node doesn't notify itemChange
+            node.setPos(*pos)
+            node.model.x, node.model.y = pos
+        node.setFlags(self.flags())
+        node.setAcceptHoverEvents(self.acceptHoverEvents())
+        
+        # Values are shared where they are immutable and copied otherwise
+        state = node.__dict__
+        for name, value in self.__dict__.items():
+            if name not in _CLONE_SKIP:
+                state[name] = value if type(value) in _IMMUTABLE_TYPES else copy.copy(value)
+        
+        node.input_ports = {}
+        node.output_ports = {}
+        for port in self.input_ports.values():
+            node._attach_port(port.clone(node))
+        for port in self.output_ports.values():
+            node._attach_port(port.clone(node))
+        node._shape_path = None
+        node.port_under_mouse = None
+        node.candidate_ports = ()
+        node._dragging = False
+        node._drag_start_pos = QPointF()
+        node._drag_nodes = ()
+        node._lifecycle_state = None
+        node._lifecycle_task = None
+        node.lifecycle_error = None
+        node.validation_issues = ()
+        node._badge_color = None
+        return node
+
+    def _rebuild(self, pos):
+        """clone() for classes that don't allow cloning: __init__ gives the new node its own state"""
+        node = type(self)()
+        # Plain values (sizes, a changed title...) follow this node; mutable ones stay as __init__ made them
+        state = node.__dict__
+        for name, value in self.__dict__.items():
+            if name not in _CLONE_SKIP and type(value) in _IMMUTABLE_TYPES:
+                state[name] = value
+        node.title = self.title
+        for port in self.input_ports.values():
+            if port.name not in node.input_ports:
+                node.add_input_port(port.name, port.msg_type, port.model.required)
+        for port in self.output_ports.values():
+            if port.name not in node.output_ports:
+                node.add_output_port(port.name, port.msg_type)
+        if pos is not None:
+            node.setPos(*pos)
+        return node
+
+    @property
+    def title(self):
+        return self.model.title
+
+    @title.setter
+    def title(self, title):
+        self.model.title = title
+
+    @property
+    def is_running(self):
+        return self.model.is_running
+
+    @is_running.setter
+    def is_running(self, running):
+        self.model.is_running = running
+
+    def _attach_port(self, port):
+        """Add a port to the node and its model, without laying the ports out again"""
+        if port.is_input:
+            self.input_ports[port.name] = port
+            self.model.inputs[port.name] = port.model
+        else:
+            self.output_ports[port.name] = port
+            self.model.outputs[port.name] = port.model
+        port.model.node = self.model
+
+    def add_input_port(self, name, msg_type=message_types.ANY, required=False):
+        port = Port(self, name, is_input=True, msg_type=msg_type, required=required)
+        self._attach_port(port)
         self._update_port_positions()
         return port
         
-    def add_output_port(self, name):
-        port = Port(self, name, is_input=False)
-        self.output_ports[name] = port
+    def add_output_port(self, name, msg_type=message_types.ANY):
+        port = Port(self, name, is_input=False, msg_type=msg_type)
+        self._attach_port(port)
         self._update_port_positions()
         return port
         
     def _update_port_positions(self):
+        # The node may grow, so let the scene know our bounding rect is changing
+        self.prepareGeometryChange()
+        self._shape_path = None
+        
         # Position input ports on the left edge
         for i, port in enumerate(self.input_ports.values()):
             port.relative_pos = QPointF(0, self.header_height + (i + 1) * self.port_spacing)
@@ -109,13 +357,33 @@ class BaseNode(QGraphicsItem):
         num_ports = max(len(self.input_ports), len(self.output_ports))
         self.height = max(120, self.header_height + (num_ports + 1) * self.port_spacing)
 
+        # Keep the scene's indexes in sync with the new layout
+        self._notify_scene('nodeMoved')
+
+    def _notify_scene(self, hook):
+        """Call a node bookkeeping hook (nodeAdded, nodeMoved, nodeRemoved) on scenes that have it"""
+        callback = getattr(self.scene(), hook, None)
+        if callback is not None:
+            callback(self)
+
     def boundingRect(self):
-        # Add some padding to the bounding rect to prevent artifacts
-        padding = 10
+        # Pad by the port hit radius so port circles on the edges (and the shape) fit inside
+        padding = PORT_HIT_RADIUS
         return QRectF(-padding, -padding, 
                      self.width + 2*padding, 
                      self.height + 2*padding)
 
+    def shape(self):
+        """Return the node body plus its port hit areas, cached until the ports change"""
+        if self._shape_path is None:
+            path = QPainterPath()
+            path.addRoundedRect(0, 0, self.width, self.height, 5, 5)
+            for port in list(self.input_ports.values()) + list(self.output_ports.values()):
+                path.addEllipse(port.relative_pos, PORT_HIT_RADIUS, PORT_HIT_RADIUS)
+            path.setFillRule(Qt.WindingFill)
+            self._shape_path = path
+        return self._shape_path
+
     def toggle_run_state(self):
         """Toggle the run/stop state of the node"""
         self.is_running = not self.is_running
@@ -124,19 +392,143 @@ class BaseNode(QGraphicsItem):
         # Implement any additional logic when the state changes
         if self.is_running:
             self.on_start()
+            self._run_lifecycle_hook('async_on_start', STARTING)
         else:
             self.on_stop()
+            self._run_lifecycle_hook('async_on_stop', STOPPING)
+
+    def _run_lifecycle_hook(self, name, state):
+        """Run an async lifecycle hook on the Qt-driven event loop, showing state until it finishes"""
+        # Stopping a node that is still starting (or the reverse) abandons the old hook
+        if self._lifecycle_task is not None:
+            self._lifecycle_task.cancel()
+            self._lifecycle_task = None
+        self._lifecycle_state = None
+        if getattr(type(self), name) is getattr(BaseNode, name):
+            # Nothing to wait for, so skip the round trip through the event loop
+            return
+        self._lifecycle_state = state
+        self.lifecycle_error = None
+        self._lifecycle_task = lifecycle.run_soon(self._run_lifecycle(getattr(self, name), state))
+
+    async def _run_lifecycle(self, hook, state):
+        task = asyncio.current_task()
+        try:
+            await hook()
+        except Exception as error:
+            self.lifecycle_error = str(error) or type(error).__name__
+            if state == STARTING:
+                # A node whose startup failed isn't running
+                self.is_running = False
+                self.on_stop()
+        finally:
+            # A cancelled hook has already been replaced
+            if task is self._lifecycle_task:
+                self._lifecycle_task = None
+                self._lifecycle_state = None
+                self.update()
+
+    async def async_on_start(self):
+        """Awaited after on_start; the node shows as starting until it returns"""
+        # Override in subclasses with slow startup work
+        pass
+
+    async def async_on_stop(self):
+        """Awaited after on_stop; the node shows as stopping until it returns"""
+        # Override in subclasses with slow shutdown work
+        pass
+
+    @property
+    def run_state(self):
+        """STOPPED, STARTING, RUNNING or STOPPING, following the async hooks and the node's process"""
+        if self._lifecycle_state is not None:
+            return self._lifecycle_state
+        current = supervisor.current_supervisor()
+        process = current.process(self) if current is not None else None
+        if process is not None:
+            if process.state in (supervisor.STARTING, supervisor.BACKOFF):
+                return STARTING
+            if process.state == supervisor.STOPPING:
+                return STOPPING
+        elif current is not None and current.command_for(self):
+            # A node with a command only runs while its process does, whatever is_running says
+            return STOPPED
+        return RUNNING if self.is_running else STOPPED
+
+    def run_error(self):
+        """Why the node last failed to start or stopped on its own, or None"""
+        process = self.process()
+        return self.lifecycle_error or (process.error if process is not None else None)
     
+    def is_started(self):
+        """Whether the node is running or on its way up, unlike is_running never true with nothing behind it"""
+        return self.is_running and self.run_state != STOPPED
+
+    def start(self):
+        """Start the node if it isn't running"""
+        if not self.is_started():
+            # Start for real even if is_running was left set without a process
+            self.is_running = False
+            try:
+                self.toggle_run_state()
+            except Exception:
+                # A node whose startup failed isn't running
+                self.is_running = False
+                self.update()
+                raise
+
+    def stop(self):
+        """Stop the node if it is running"""
+        if self.is_running:
+            self.toggle_run_state()
+
+    def is_ready(self):
+        """Whether a started node is up and serving its outputs"""
+        return self.run_state == RUNNING
+
+    def process(self):
+        """Get the supervised process running this node's command, or None"""
+        current = supervisor.current_supervisor()
+        return current.process(self) if current is not None else None
+
     def on_start(self):
         """Called when the node is started"""
-        # Override in subclasses to implement specific start behavior
-        pass
+        # Run the node's command if it has one; subclasses can extend this
+        current = supervisor.current_supervisor()
+        if current is not None and current.command_for(self):
+            current.start(self)
     
     def on_stop(self):
         """Called when the node is stopped"""
-        # Override in subclasses to implement specific stop behavior
-        pass
+        current = supervisor.current_supervisor()
+        if current is not None:
+            current.stop(self)
+
+    def release(self):
+        """Stop the node when it is deleted or its graph closed; its process is dropped once it has exited"""
+        self.stop()
+        current = supervisor.current_supervisor()
+        if current is not None:
+            current.release(self)
+
+    def process_state_changed(self, state):
+        """Called by the supervisor when this node's process changes state"""
+        self.is_running = state in (supervisor.STARTING, supervisor.RUNNING, supervisor.BACKOFF)
+        self.update()
     
+    @property
+    def badge_color(self):
+        """Color of the validation badge (that of the most severe issue), or None without issues"""
+        return self._badge_color
+
+    def set_validation_issues(self, issues):
+        """Show the issues found by validation as a badge, with their messages in the tooltip"""
+        self.validation_issues = tuple(issues)
+        severity = validation.worst_severity(self.validation_issues)
+        self._badge_color = _BADGE_COLORS[severity] if severity else None
+        self.setToolTip("\n".join(issue.message for issue in self.validation_issues))
+        self.update()
+
     def get_button_rect(self):
         """Get the rectangle for the run/stop button"""
         return QRectF(
@@ -154,7 +546,12 @@ class BaseNode(QGraphicsItem):
         """Handle mouse press events on the node"""
         # Check if we clicked on the run/stop button
         if self.is_point_in_button(event.pos()):
-            self.toggle_run_state()
+            set_run_state = getattr(self.scene(), 'setRunState', None)
+            if set_run_state is not None:
+                # Undoable through the scene
+                set_run_state((self,), not self.is_started())
+            else:
+                self.toggle_run_state()
             event.accept()
             return
             
@@ -183,16 +580,18 @@ class BaseNode(QGraphicsItem):
             # Toggle selection with Shift
             self.setSelected(not self.isSelected())
         else:
-            # If not using Shift, clear other selections unless this is the only selected item
+            # If not using Shift, select just this node unless it is already
+            # selected, in which case the whole selection is dragged
             scene = self.scene()
-            if scene:
-                selected_items = scene.selectedItems()
-                if len(selected_items) != 1 or selected_items[0] != self:
-                    scene.clearSelection()
-                    self.setSelected(True)  # Select this node
+            if scene and not self.isSelected():
+                scene.clearSelection()
+                self.setSelected(True)  # Select this node
         
-        # Prepare for dragging
+        # Prepare for dragging; the selection moves together, as one edit per drag
         self._dragging = True
+        scene = self.scene()
+        selected = scene.selectedNodes() if hasattr(scene, 'selectedNodes') else ()
+        self._drag_nodes = tuple(selected) if self in selected else (self,)
         self.setCursor(Qt.ClosedHandCursor)
         
         # Let the base class handle the rest
@@ -205,10 +604,14 @@ class BaseNode(QGraphicsItem):
         if self._dragging:
             # Calculate the new position
             new_pos = self.mapToScene(event.pos() - self._drag_start_pos)
-            self.setPos(new_pos)
             
-            # Update connections
-            self.updateConnections()
+            # Connections are updated from itemChange once the position changes
+            move_nodes = getattr(self.scene(), 'moveNodes', None)
+            if move_nodes is not None:
+                offset = new_pos - self.pos()
+                move_nodes(self._drag_nodes, offset.x(), offset.y())
+            else:
+                self.setPos(new_pos)
             
             event.accept()
             return
@@ -220,6 +623,7 @@ class BaseNode(QGraphicsItem):
         # Only handle release if we were dragging
         if self._dragging:
             self._dragging = False
+            self._drag_nodes = ()
             self.setCursor(Qt.ArrowCursor)
             event.accept()
             return
@@ -229,35 +633,49 @@ class BaseNode(QGraphicsItem):
 
     def itemChange(self, change, value):
         # Update connections when node is moved
-        if change == QGraphicsItem.ItemPositionHasChanged:
+        if change == _POSITION_HAS_CHANGED:
+            self.model.x = value.x()
+            self.model.y = value.y()
+            self._notify_scene('nodeMoved')
             self.updateConnections()
+
+        # Let the old and new scenes update their bookkeeping when the node changes scene
+        elif change == _SCENE_CHANGE:
+            self._notify_scene('nodeRemoved')
+        elif change == _SCENE_HAS_CHANGED:
+            self._notify_scene('nodeAdded')
             
         # When selection state changes, make sure we're properly handling group selection
-        elif change == QGraphicsItem.ItemSelectedHasChanged:
+        elif change == _SELECTED_HAS_CHANGED:
             if value:  # If being selected
                 # If we're being selected and not due to Shift key,
                 # we've already cleared other selections in mousePressEvent
                 pass
                 
-        return super().itemChange(change, value)
+        # QGraphicsItem.itemChange just returns value; calling it would cost
+        # a round trip through PySide on every change of every item
+        return value
 
     def updateConnections(self):
         """Update all connections attached to this node's ports without moving nodes"""
-        # Store original selected items state to restore it after updates
         scene = self.scene()
         if not scene:
             return
             
-        # Look for existing connections in the port's connection list and update them
+        # Scenes that batch path updates rebuild each connection once per frame,
+        # however many of its endpoints moved; otherwise update right away
+        schedule = getattr(scene, 'scheduleConnectionUpdate', None)
+        update = schedule if schedule else lambda connection: connection.updatePath()
+        
         # Input ports
-        for port_name, port in self.input_ports.items():
+        for port in self.input_ports.values():
             for connection in port.connections:
-                connection.updatePath()
+                update(connection)
         
         # Output ports
-        for port_name, port in self.output_ports.items():
+        for port in self.output_ports.values():
             for connection in port.connections:
-                connection.updatePath()
+                update(connection)
 
     def port_at_position(self, pos):
         # Check input ports
@@ -286,75 +704,173 @@ class BaseNode(QGraphicsItem):
         self.update()
         super().hoverLeaveEvent(event)
 
-    def paint(self, painter, option, widget):
-        # Draw node body
+    @staticmethod
+    def _font(size, bold=False):
+        """Get a shared (font, metrics) pair; fonts are built once, not on every repaint"""
+        key = (size, bold)
+        entry = _fonts.get(key)
+        if entry is None:
+            font = QFont("Arial", size, QFont.Bold if bold else QFont.Normal)
+            entry = _fonts[key] = (font, QFontMetricsF(font))
+        return entry
+
+    @staticmethod
+    def clear_chrome_cache():
+        """Drop every cached chrome pixmap (e.g. after changing node colors globally)"""
+        _chrome_cache.clear()
+
+    def _chrome_key(self, zoom_bucket, device_pixel_ratio, labels):
+        """Build the cache key describing everything drawn by _paint_chrome"""
+        return (
+            type(self), self.title, self.isSelected(), labels,
+            self.width, self.height, self.header_height,
+            self.body_color.rgba(), self.header_color.rgba(), self.selected_color.rgba(),
+            self.text_color.rgba(), self.port_color.rgba(), self.border_color.rgba(),
+            tuple(self.input_ports), tuple(self.output_ports),
+            zoom_bucket, device_pixel_ratio,
+        )
+
+    def _chrome_pixmap(self, zoom_bucket, device_pixel_ratio, labels=True):
+        """Get the cached rendering of the node's static parts, rendering it if needed"""
+        key = self._chrome_key(zoom_bucket, device_pixel_ratio, labels)
+        pixmap = _chrome_cache.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        rect = self.boundingRect()
+        scale = zoom_bucket * device_pixel_ratio
+        pixmap = QPixmap(math.ceil(rect.width() * scale), math.ceil(rect.height() * scale))
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.Antialiasing)
-        
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.scale(scale, scale)
+        painter.translate(-rect.topLeft())
+        self._paint_chrome(painter, labels)
+        painter.end()
+
+        # Keep the cache bounded; entries are cheap to rebuild
+        if len(_chrome_cache) >= CHROME_CACHE_LIMIT:
+            _chrome_cache.clear()
+        _chrome_cache[key] = pixmap
+        return pixmap
+
+    def _paint_chrome(self, painter, labels=True):
+        """Draw the static parts of the node: body, header, title, ports and (optionally) port labels"""
         # Define colors based on selection state
         body_color = self.selected_color if self.isSelected() else self.body_color
-        
+        border_pen = QPen(self.border_color, 1)
+        text_pen = QPen(self.text_color)
+
         # Draw main body
-        painter.setPen(QPen(self.border_color, 1))
+        painter.setPen(border_pen)
         painter.setBrush(QBrush(body_color))
         painter.drawRoundedRect(0, 0, self.width, self.height, 5, 5)
-        
+
         # Draw header
         painter.setBrush(QBrush(self.header_color))
         painter.drawRoundedRect(0, 0, self.width, self.header_height, 5, 5)
         painter.drawRect(0, self.header_height - 5, self.width, 5)  # Bottom of header
-        
+
         # Draw title
-        painter.setPen(QPen(self.text_color))
-        painter.setFont(QFont("Arial", 10, QFont.Bold))
+        painter.setPen(text_pen)
+        painter.setFont(self._font(10, bold=True)[0])
         painter.drawText(10, 25, self.title)
-        
-        # Draw ports
+
+        # Draw port circles
+        painter.setPen(border_pen)
+        painter.setBrush(self.port_color)
         for port in self.input_ports.values():
-            # Determine port color based on hover state
-            if port == self.port_under_mouse:
-                painter.setBrush(QColor(200, 200, 200))  # Lighter color for hover
-            else:
-                painter.setBrush(self.port_color)
-            
-            painter.setPen(QPen(self.border_color, 1))
-            # Draw port circle centered at the port's relative position
             painter.drawEllipse(port.relative_pos, port.radius, port.radius)
-            
-            # Draw port name
-            painter.setPen(QPen(self.text_color))
-            painter.setFont(QFont("Arial", 8))
-            painter.drawText(port.relative_pos.x() + 10, port.relative_pos.y() + 4, port.name)
-        
         for port in self.output_ports.values():
-            # Determine port color based on hover state
-            if port == self.port_under_mouse:
-                painter.setBrush(QColor(200, 200, 200))  # Lighter color for hover
-            else:
-                painter.setBrush(self.port_color)
-            
+            painter.drawEllipse(port.relative_pos, port.radius, port.radius)
+
+        if not labels:
+            return
+
+        # Draw port names (output names are right-aligned)
+        label_font, label_metrics = self._font(8)
+        painter.setPen(text_pen)
+        painter.setFont(label_font)
+        for port in self.input_ports.values():
+            painter.drawText(QPointF(port.relative_pos.x() + 10, port.relative_pos.y() + 4), port.name)
+        for port in self.output_ports.values():
+            text_width = label_metrics.horizontalAdvance(port.name)
+            painter.drawText(QPointF(port.relative_pos.x() - text_width - 10, port.relative_pos.y() + 4), port.name)
+
+    def paint(self, painter, option, widget):
+        zoom = option.levelOfDetailFromTransform(painter.worldTransform())
+
+        # Zoomed far out: a flat rectangle is all that can be seen anyway
+        if zoom < LOD_LOW_THRESHOLD:
+            body_color = self.selected_color if self.isSelected() else self.body_color
+            painter.fillRect(QRectF(0, 0, self.width, self.height), body_color)
+            if self._badge_color is not None:
+                # Keep problems visible when zoomed out: the header corner takes the badge color
+                size = self.header_height
+                painter.fillRect(QRectF(self.width - size, 0, size, size), self._badge_color)
+            return
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        labels = zoom >= LOD_MEDIUM_THRESHOLD
+
+        # Static chrome comes from a pixmap shared by every node that looks the same,
+        # rendered at the nearest power-of-two zoom level
+        zoom_bucket = 2.0 ** round(math.log2(max(zoom, CHROME_CACHE_MIN_ZOOM)))
+        if zoom_bucket <= CHROME_CACHE_MAX_ZOOM:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            pixmap = self._chrome_pixmap(zoom_bucket, painter.device().devicePixelRatioF(), labels)
+            painter.drawPixmap(self.boundingRect(), pixmap, QRectF(pixmap.rect()))
+        else:
+            # Zoomed in far enough that only a few nodes are visible; draw directly
+            self._paint_chrome(painter, labels)
+
+        # Highlight the hovered port on top of the cached chrome
+        if self.port_under_mouse is not None:
+            port = self.port_under_mouse
             painter.setPen(QPen(self.border_color, 1))
-            # Draw port circle centered at the port's relative position
+            painter.setBrush(QColor(200, 200, 200))  # Lighter color for hover
             painter.drawEllipse(port.relative_pos, port.radius, port.radius)
-            
-            # Draw port name (right-aligned)
+
+        # Highlight the ports a connection being dragged can be dropped on
+        if self.candidate_ports:
+            painter.setPen(QPen(self.border_color, 1))
+            painter.setBrush(self.candidate_port_color)
+            for port in self.candidate_ports:
+                painter.drawEllipse(port.relative_pos, port.radius, port.radius)
+
+        # Validation badge: the number of issues, colored by the most severe
+        if self._badge_color is not None:
+            center = QPointF(self.width - BADGE_RADIUS - 6, self.header_height / 2)
+            painter.setPen(QPen(self.border_color, 1))
+            painter.setBrush(self._badge_color)
+            painter.drawEllipse(center, BADGE_RADIUS, BADGE_RADIUS)
             painter.setPen(QPen(self.text_color))
-            painter.setFont(QFont("Arial", 8))
-            text_width = painter.fontMetrics().horizontalAdvance(port.name)
-            painter.drawText(port.relative_pos.x() - text_width - 10, port.relative_pos.y() + 4, port.name)
-            
+            painter.setFont(self._font(7, bold=True)[0])
+            badge_rect = QRectF(center.x() - BADGE_RADIUS, center.y() - BADGE_RADIUS, 2 * BADGE_RADIUS, 2 * BADGE_RADIUS)
+            painter.drawText(badge_rect, _ALIGN_CENTER, str(len(self.validation_issues)))
+
         # Draw run/stop button
         button_rect = self.get_button_rect()
-        button_color = self.run_button_color if self.is_running else self.stop_button_color
+        run_state = self.run_state
+        if run_state == RUNNING:
+            button_color = self.run_button_color
+        elif run_state == STOPPED:
+            button_color = self.stop_button_color
+        else:
+            button_color = self.pending_button_color
         painter.setBrush(QBrush(button_color))
         painter.setPen(QPen(self.border_color, 1))
         painter.drawRoundedRect(button_rect, 3, 3)
-        
+
         # Draw button text
+        button_font, button_metrics = self._font(8, bold=True)
         painter.setPen(QPen(self.text_color))
-        painter.setFont(QFont("Arial", 8, QFont.Bold))
-        button_text = "RUN" if not self.is_running else "STOP"
-        text_width = painter.fontMetrics().horizontalAdvance(button_text)
-        text_height = painter.fontMetrics().height()
+        painter.setFont(button_font)
+        button_text = _BUTTON_TEXT[run_state]
+        text_width = button_metrics.horizontalAdvance(button_text)
+        text_height = button_metrics.height()
         text_x = button_rect.x() + (button_rect.width() - text_width) / 2
         text_y = button_rect.y() + (button_rect.height() + text_height) / 2 - 2
-        painter.drawText(text_x, text_y, button_text) 
\ No newline at end of file
+        painter.drawText(QPointF(text_x, text_y), button_text)
@@ -1,5 +1,16 @@
-from packages.navigation.nav2_node import Nav2Node
-from packages.navigation.slam_toolbox_node import SlamToolboxNode
+import importlib
 
+# Node classes are imported on first access, so importing one node module
+# doesn't pull in the rest of the package
+_EXPORTS = {
+    'Nav2Node': 'packages.navigation.nav2_node',
+    'SlamToolboxNode': 'packages.navigation.slam_toolbox_node',
+}
 
 __all__ = ['Nav2Node', 'SlamToolboxNode']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -1,5 +1,6 @@
 from PySide6.QtGui import QColor
 from packages.base.node import BaseNode
+import message_types
 
 class Nav2Node(BaseNode):
     """
@@ -7,6 +8,9 @@ class Nav2Node(BaseNode):
     
     Handles path planning, obstacle avoidance, and robot navigation.
     """
+    command = ["ros2", "launch", "nav2_bringup", "navigation_launch.py"]
+    clone_from_prototype = True
+
     def __init__(self):
         super().__init__(title="Nav2")
         
@@ -15,29 +19,11 @@ class Nav2Node(BaseNode):
         self.header_color = QColor(65, 160, 65)
         
         # Add standard ports
-        self.add_input_port("scan")
-        self.add_input_port("odom")
-        self.add_input_port("goal_pose")
-        self.add_output_port("cmd_vel")
-        self.add_output_port("path")
+        self.add_input_port("scan", message_types.LASER_SCAN, required=True)
+        self.add_input_port("odom", message_types.ODOMETRY, required=True)
+        self.add_input_port("goal_pose", message_types.POSE_STAMPED)
+        self.add_output_port("cmd_vel", message_types.TWIST)
+        self.add_output_port("path", message_types.PATH)
         
         # Update the node's appearance
         self.update()
-        
-    def on_start(self):
-        """Called when the node is started"""
-        print(f"Starting navigation node: {self.title}")
-        # In a real implementation, this would:
-        # 1. Initialize the navigation stack
-        # 2. Start subscribing to sensor topics
-        # 3. Set up the navigation parameters
-        # 4. Begin processing navigation requests
-        
-    def on_stop(self):
-        """Called when the node is stopped"""
-        print(f"Stopping navigation node: {self.title}")
-        # In a real implementation, this would:
-        # 1. Stop the navigation stack
-        # 2. Unsubscribe from sensor topics
-        # 3. Send zero velocity commands to stop the robot
-        # 4. Clean up any resources 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from PySide6.QtGui import QColor
 from packages.base.node import BaseNode
+import message_types
 
 class SlamToolboxNode(BaseNode):
     """
@@ -7,6 +8,9 @@ class SlamToolboxNode(BaseNode):
     
     Handles Simultaneous Localization and Mapping for creating maps.
     """
+    command = ["ros2", "launch", "slam_toolbox", "online_async_launch.py"]
+    clone_from_prototype = True
+
     def __init__(self):
         super().__init__(title="SLAM Toolbox")
         
@@ -15,10 +19,10 @@ class SlamToolboxNode(BaseNode):
         self.header_color = QColor(65, 160, 65)
         
         # Add standard ports
-        self.add_input_port("scan")
-        self.add_input_port("odom")
-        self.add_output_port("map")
-        self.add_output_port("tf")
+        self.add_input_port("scan", message_types.LASER_SCAN, required=True)
+        self.add_input_port("odom", message_types.ODOMETRY)
+        self.add_output_port("map", message_types.OCCUPANCY_GRID)
+        self.add_output_port("tf", message_types.TF_MESSAGE)
         
         # Update the node's appearance
         self.update() 
\ No newline at end of file
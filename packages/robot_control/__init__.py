@@ -1,4 +1,16 @@
-from packages.robot_control.ros2_controllers_node import ROS2ControllersNode
-from packages.robot_control.twist_mux_node import TwistMuxNode
+import importlib
+
+# Node classes are imported on first access, so importing one node module
+# doesn't pull in the rest of the package
+_EXPORTS = {
+    'ROS2ControllersNode': 'packages.robot_control.ros2_controllers_node',
+    'TwistMuxNode': 'packages.robot_control.twist_mux_node',
+}
 
 __all__ = ['ROS2ControllersNode', 'TwistMuxNode']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -1,5 +1,6 @@
 from PySide6.QtGui import QColor
 from packages.base.node import BaseNode
+import message_types
 
 class ROS2ControllersNode(BaseNode):
     """
@@ -7,6 +8,9 @@ class ROS2ControllersNode(BaseNode):
     
     Hardware interface for controlling robot joints.
     """
+    command = ["ros2", "run", "controller_manager", "ros2_control_node"]
+    clone_from_prototype = True
+
     def __init__(self):
         super().__init__(title="ROS2 Controllers")
         
@@ -15,9 +19,9 @@ class ROS2ControllersNode(BaseNode):
         self.header_color = QColor(160, 70, 70)
         
         # Add standard ports
-        self.add_input_port("joint_states")
-        self.add_input_port("cmd_vel")
-        self.add_output_port("joint_commands")
+        self.add_input_port("joint_states", message_types.JOINT_STATE)
+        self.add_input_port("cmd_vel", message_types.TWIST)
+        self.add_output_port("joint_commands", message_types.FLOAT64_MULTI_ARRAY)
         
         # Update the node's appearance
         self.update() 
\ No newline at end of file
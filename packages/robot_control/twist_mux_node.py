@@ -1,5 +1,6 @@
 from PySide6.QtGui import QColor
 from packages.base.node import BaseNode
+import message_types
 
 class TwistMuxNode(BaseNode):
     """
@@ -7,6 +8,9 @@ class TwistMuxNode(BaseNode):
     
     Multiplexer for prioritizing velocity commands from different sources.
     """
+    command = ["ros2", "launch", "twist_mux", "twist_mux_launch.py"]
+    clone_from_prototype = True
+
     def __init__(self):
         super().__init__(title="Twist Mux")
         
@@ -15,10 +19,10 @@ class TwistMuxNode(BaseNode):
         self.header_color = QColor(160, 70, 70)
         
         # Add standard ports
-        self.add_input_port("cmd_vel1")
-        self.add_input_port("cmd_vel2")
-        self.add_input_port("cmd_vel3")
-        self.add_output_port("cmd_vel")
+        self.add_input_port("cmd_vel1", message_types.TWIST)
+        self.add_input_port("cmd_vel2", message_types.TWIST)
+        self.add_input_port("cmd_vel3", message_types.TWIST)
+        self.add_output_port("cmd_vel", message_types.TWIST)
         
         # Update the node's appearance
         self.update() 
\ No newline at end of file
@@ -1,4 +1,16 @@
-from packages.teleoperation.keyboard_teleop_node import KeyboardTeleopNode
-from packages.teleoperation.joystick_teleop_node import JoystickTeleopNode
+import importlib
+
+# Node classes are imported on first access, so importing one node module
+# doesn't pull in the rest of the package
+_EXPORTS = {
+    'KeyboardTeleopNode': 'packages.teleoperation.keyboard_teleop_node',
+    'JoystickTeleopNode': 'packages.teleoperation.joystick_teleop_node',
+}
 
 __all__ = ['KeyboardTeleopNode', 'JoystickTeleopNode']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
@@ -1,5 +1,6 @@
 from PySide6.QtGui import QColor
 from packages.base.node import BaseNode
+import message_types
 
 class JoystickTeleopNode(BaseNode):
     """
@@ -7,6 +8,9 @@ class JoystickTeleopNode(BaseNode):
     
     Subscribes to joy messages and publishes velocity commands.
     """
+    command = ["ros2", "launch", "teleop_twist_joy", "teleop-launch.py"]
+    clone_from_prototype = True
+
     def __init__(self):
         super().__init__(title="Joystick Teleop")
         
@@ -15,8 +19,8 @@ class JoystickTeleopNode(BaseNode):
         self.header_color = QColor(60, 110, 160)
         
         # Add standard ports
-        self.add_input_port("joy")
-        self.add_output_port("cmd_vel")
+        self.add_input_port("joy", message_types.JOY, required=True)
+        self.add_output_port("cmd_vel", message_types.TWIST)
         
         # Update the node's appearance
         self.update() 
\ No newline at end of file
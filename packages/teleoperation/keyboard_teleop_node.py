@@ -1,5 +1,6 @@
 from PySide6.QtGui import QColor
 from packages.base.node import BaseNode
+import message_types
 
 class KeyboardTeleopNode(BaseNode):
     """
@@ -7,6 +8,9 @@ class KeyboardTeleopNode(BaseNode):
     
     Publishes velocity commands based on keyboard input.
     """
+    command = ["ros2", "run", "teleop_twist_keyboard", "teleop_twist_keyboard"]
+    clone_from_prototype = True
+
     def __init__(self):
         super().__init__(title="Keyboard Teleop")
         
@@ -15,23 +19,7 @@ class KeyboardTeleopNode(BaseNode):
         self.header_color = QColor(60, 110, 160)
         
         # Add standard ports
-        self.add_output_port("cmd_vel")
+        self.add_output_port("cmd_vel", message_types.TWIST)
         
         # Update the node's appearance
         self.update()
-        
-    def on_start(self):
-        """Called when the node is started"""
-        print(f"Starting keyboard teleoperation node: {self.title}")
-        # In a real implementation, this would:
-        # 1. Start listening for keyboard events
-        # 2. Initialize any required resources
-        # 3. Set up connections to ROS or other systems
-        
-    def on_stop(self):
-        """Called when the node is stopped"""
-        print(f"Stopping keyboard teleoperation node: {self.title}")
-        # In a real implementation, this would:
-        # 1. Stop listening for keyboard events
-        # 2. Release any resources
-        # 3. Clean up connections to ROS or other systems 
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+On-screen performance overlay for NodeView.
+
+The HUD shows, in a corner of the view:
+- how long the last frame took to paint, and frames per second;
+- paint time and item count per item type (nodes and connections);
+- how many items the scene holds, and how many are in the visible area,
+  along with the time the item index took to find them (hit-testing
+  uses the same index);
+- scene signals per second: changed, sceneRectChanged and
+  contentBoundsChanged.
+
+Painted items are timed through the hot-path counters of the
+instrumentation module, which are enabled while any HUD is shown and
+cost nothing once they are all hidden.
+"""
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, QRectF, QTimer, Qt
+from PySide6.QtGui import QColor, QFont, QFontMetrics
+
+import instrumentation
+from packages.base.node import BaseNode
+from connection import Connection
+
+# How often the HUD recomputes its rates and visible counts, in ms
+HUD_REFRESH_MS = 500
+
+# Frames kept for the average and worst frame time
+FRAME_HISTORY = 60
+
+# Item types whose paint time is shown, with their labels and paint counters
+PAINTED_TYPES = ((BaseNode, "nodes"), (Connection, "connections"))
+PAINT_COUNTERS = {BaseNode: "BaseNode.paint", Connection: "Connection.paint"}
+
+# Look of the overlay
+HUD_MARGIN = 8
+HUD_PADDING = 6
+HUD_BACKGROUND = QColor(0, 0, 0, 170)
+HUD_TEXT_COLOR = QColor(220, 255, 220)
+
+
+class PerformanceHud(QObject):
+    """Frame statistics of one NodeView, drawn over its viewport"""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        instrumentation.enable()
+
+        self._frame_start = None
+        self.frame_times = deque(maxlen=FRAME_HISTORY)
+        # Paint seconds and item counts per type in the last frame
+        self.paint_times = {cls: (0.0, 0) for cls, _ in PAINTED_TYPES}
+        # Counter totals at the start of the frame, and painting done outside the
+        # items' paint methods (the batched overview) during the frame
+        self._counts_at_start = {}
+        self._batched = {}
+        self._frames = 0
+        self.fps = 0.0
+
+        # Scene signals counted since the last refresh, and their rates per second
+        self._signal_counts = {}
+        self.signal_rates = {}
+        self._connections = []
+        scene = view.scene()
+        for name in ("changed", "sceneRectChanged", "contentBoundsChanged"):
+            signal = getattr(scene, name, None)
+            if signal is not None:
+                self._signal_counts[name] = 0
+                self.signal_rates[name] = 0.0
+                slot = lambda *args, name=name: self._countSignal(name)
+                signal.connect(slot)
+                self._connections.append((signal, slot))
+
+        self.visible_counts = {cls: 0 for cls, _ in PAINTED_TYPES}
+        self.total_counts = dict(self.visible_counts)
+        self.query_ms = 0.0
+
+        self.font = QFont("Monospace", 9)
+        self.font.setStyleHint(QFont.TypeWriter)
+        self.rect = QRectF()
+        self._last_refresh = time.perf_counter()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(HUD_REFRESH_MS)
+        self.refresh()
+
+    def close(self):
+        """Stop collecting statistics and disconnect from the scene"""
+        self.timer.stop()
+        for signal, slot in self._connections:
+            signal.disconnect(slot)
+        self._connections.clear()
+        instrumentation.disable()
+        self.view.viewport().update(self.rect.toAlignedRect())
+
+    def _countSignal(self, name):
+        self._signal_counts[name] += 1
+
+    def beginFrame(self):
+        """Start timing a frame (called at the start of the view's paintEvent)"""
+        counters = instrumentation.counters
+        self._counts_at_start = {cls: (counters[name].total, counters[name].calls)
+                                 for cls, name in PAINT_COUNTERS.items()}
+        self._batched = {cls: (0.0, 0) for cls in PAINT_COUNTERS}
+        self._frame_start = time.perf_counter()
+
+    def recordBatched(self, cls, seconds, count):
+        """Add painting done for items of type cls outside their paint methods, during this frame"""
+        total, items = self._batched[cls]
+        self._batched[cls] = (total + seconds, items + count)
+
+    def endFrame(self):
+        """Finish timing a frame (called at the end of the view's paintEvent)"""
+        if self._frame_start is None:
+            return
+        self.frame_times.append((time.perf_counter() - self._frame_start) * 1000.0)
+        self._frame_start = None
+        self._frames += 1
+        counters = instrumentation.counters
+        self.paint_times = {}
+        for cls, name in PAINT_COUNTERS.items():
+            total, calls = self._counts_at_start[cls]
+            batched_total, batched_items = self._batched[cls]
+            # Counters reset during the frame start again from zero
+            self.paint_times[cls] = (max(counters[name].total - total, 0.0) + batched_total,
+                                     max(counters[name].calls - calls, 0) + batched_items)
+
+    def refresh(self):
+        """Update the rates and visible item counts, and repaint the overlay"""
+        now = time.perf_counter()
+        elapsed = max(now - self._last_refresh, 1e-6)
+        self._last_refresh = now
+        self.fps = self._frames / elapsed
+        self._frames = 0
+        for name, count in self._signal_counts.items():
+            self.signal_rates[name] = count / elapsed
+            self._signal_counts[name] = 0
+
+        view = self.view
+        scene = view.scene()
+        self.total_counts = {BaseNode: len(scene.nodes()), Connection: len(scene.connections)}
+
+        # The same index lookup the scene does for hit-testing, over the visible area
+        visible = view.mapToScene(view.viewport().rect()).boundingRect()
+        start = time.perf_counter()
+        items = scene.items(visible)
+        self.query_ms = (time.perf_counter() - start) * 1000.0
+        self.visible_counts = {cls: 0 for cls, _ in PAINTED_TYPES}
+        for item in items:
+            for cls, _ in PAINTED_TYPES:
+                if isinstance(item, cls):
+                    self.visible_counts[cls] += 1
+                    break
+
+        # Repaint the overlay even when nothing under it changed (partial updates)
+        view.viewport().update(self.rect.toAlignedRect())
+
+    def lines(self):
+        """Get the text of the overlay, one string per line"""
+        frame = self.frame_times[-1] if self.frame_times else 0.0
+        average = sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0.0
+        worst = max(self.frame_times, default=0.0)
+
+        lines = [f"frame {frame:6.2f} ms  avg {average:6.2f}  max {worst:6.2f}  {self.fps:5.1f} fps"]
+        lines.append("paint " + "  ".join(
+            f"{label} {self.paint_times[cls][0] * 1000.0:6.2f} ms ({self.paint_times[cls][1]})"
+            for cls, label in PAINTED_TYPES))
+        lines.append("items " + "  ".join(
+            f"{label} {self.visible_counts[cls]}/{self.total_counts[cls]}" for cls, label in PAINTED_TYPES)
+            + f"  visible, index {self.query_ms:.2f} ms")
+        lines.append("signals/s " + "  ".join(
+            f"{name} {rate:.0f}" for name, rate in self.signal_rates.items()))
+        return lines
+
+    def draw(self, painter):
+        """Draw the overlay in the top left corner of the viewport"""
+        painter.save()
+        painter.resetTransform()
+        painter.setFont(self.font)
+        metrics = QFontMetrics(self.font)
+        lines = self.lines()
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 2 * HUD_PADDING
+        height = metrics.lineSpacing() * len(lines) + 2 * HUD_PADDING
+        self.rect = QRectF(HUD_MARGIN, HUD_MARGIN, width, height)
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(HUD_BACKGROUND)
+        painter.drawRect(self.rect)
+        painter.setPen(HUD_TEXT_COLOR)
+        y = HUD_MARGIN + HUD_PADDING + metrics.ascent()
+        for line in lines:
+            painter.drawText(HUD_MARGIN + HUD_PADDING, y, line)
+            y += metrics.lineSpacing()
+        painter.restore()
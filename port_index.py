@@ -0,0 +1,107 @@
+import math
+
+from packages.base.node import PORT_HIT_RADIUS
+
+
+class PortIndex:
+    """
+    Spatial index of port centers in scene coordinates.
+
+    Ports are bucketed into a uniform grid whose cells are as wide as the
+    hit radius, so a hit test only has to look at the 3x3 block of cells
+    around the query point instead of walking every node in the scene.
+    """
+    def __init__(self, hit_radius=PORT_HIT_RADIUS):
+        self.hit_radius = hit_radius
+        self.cell_size = float(hit_radius)
+
+        # (cell_x, cell_y) -> {port: (x, y)}
+        self._cells = {}
+        # port -> (cell_key, x, y)
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, port):
+        return port in self._entries
+
+    def _cell_key(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, port, scene_pos):
+        """Add or move a port to the given scene position"""
+        self._insert(port, scene_pos.x(), scene_pos.y())
+
+    def _insert(self, port, x, y):
+        key = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+        entry = self._entries.get(port)
+        if entry is not None and entry[0] != key:
+            # The port crossed into another cell, drop it from the old one
+            self._discard_from_cell(entry[0], port)
+
+        self._cells.setdefault(key, {})[port] = (x, y)
+        self._entries[port] = (key, x, y)
+
+    def remove(self, port):
+        """Remove a port from the index (no-op if it is not indexed)"""
+        entry = self._entries.pop(port, None)
+        if entry is not None:
+            self._discard_from_cell(entry[0], port)
+
+    def _discard_from_cell(self, key, port):
+        cell = self._cells.get(key)
+        if cell is None:
+            return
+        cell.pop(port, None)
+        if not cell:
+            del self._cells[key]
+
+    def update_node(self, node):
+        """Re-index every port of a node from its current scene position"""
+        # Nodes are only ever translated, so offsetting by the scene position
+        # is equivalent to (and much cheaper than) mapToScene per port
+        origin = node.scenePos()
+        x, y = origin.x(), origin.y()
+        for port in node.input_ports.values():
+            offset = port.relative_pos
+            self._insert(port, x + offset.x(), y + offset.y())
+        for port in node.output_ports.values():
+            offset = port.relative_pos
+            self._insert(port, x + offset.x(), y + offset.y())
+
+    def remove_node(self, node):
+        """Remove every port of a node from the index"""
+        for port in node.input_ports.values():
+            self.remove(port)
+        for port in node.output_ports.values():
+            self.remove(port)
+
+    def ports_at(self, scene_pos):
+        """Return the ports within the hit radius of scene_pos, closest first"""
+        x, y = scene_pos.x(), scene_pos.y()
+        cell_x, cell_y = self._cell_key(x, y)
+
+        hits = []
+        radius_sq = self.hit_radius * self.hit_radius
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                cell = self._cells.get((cell_x + dx, cell_y + dy))
+                if not cell:
+                    continue
+                for port, (px, py) in cell.items():
+                    dist = (px - x) * (px - x) + (py - y) * (py - y)
+                    if dist <= radius_sq:
+                        hits.append((dist, port))
+        hits.sort(key=lambda hit: hit[0])
+        return [port for _, port in hits]
+
+    def port_at(self, scene_pos):
+        """Return the closest port within the hit radius of scene_pos, or None"""
+        ports = self.ports_at(scene_pos)
+        return ports[0] if ports else None
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
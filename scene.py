@@ -1,18 +1,42 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 from PySide6.QtWidgets import QGraphicsScene, QGraphicsPathItem, QMenu, QGraphicsSceneMouseEvent
-from PySide6.QtCore import Qt, QPointF, Signal
+from PySide6.QtCore import Qt, QPointF, QRectF, Signal, QTimer, QVariantAnimation, QEasingCurve
 from PySide6.QtGui import QPainterPath, QPen, QColor, QTransform, QBrush
 
 from packages.base.node import BaseNode, Port
 from connection import Connection
 from node_menu import NodeSearchMenu
+from port_index import PortIndex
+from content_bounds import ContentBounds
+from node_registry import default_registry
+from graph_model import ConnectionSet, GraphModel
+import message_types
+from validation import GraphValidator
+import undo
+import lifecycle
+from layout import layered_layout
+from subgraph import PASTE_OFFSET, Subgraph
+from scene_updates import suspended_updates
+
+# Data of the "Add node button" menu action
+ADD_NODE_BUTTON_ACTION = 'add_node_button'
+
+# Duration of the move from the old node positions to a new layout, in ms
+LAYOUT_ANIMATION_MS = 400
 
-# Import specific node types from their respective packages
-from packages.teleoperation import KeyboardTeleopNode, JoystickTeleopNode
-from packages.navigation import Nav2Node, SlamToolboxNode
-from packages.robot_control import ROS2ControllersNode, TwistMuxNode
+# Thread computing layouts off the GUI thread. layered_layout needs no Qt
+# event loop, so this is a plain pool rather than QtAsyncio's executor,
+# whose per-call QEventLoop can outlive its thread
+_layout_executor = ThreadPoolExecutor(max_workers=1)
 
 
 class NodeScene(QGraphicsScene):
+    # Emitted at most once per frame when the bounds of the nodes change
+    contentBoundsChanged = Signal(QRectF)
+
     def __init__(self):
         super().__init__()
         self.setSceneRect(0, 0, 8000, 8000)  # Set a large scene rect by default
@@ -21,9 +45,47 @@ class NodeScene(QGraphicsScene):
         self.current_connection = None
         self.start_port = None
         self.is_creating_connection = False  # Flag to track connection creation state
+        # Input ports the connection being created may end on, and their nodes
+        self.connection_candidates = set()
+        self._candidate_nodes = []
         
-        # Keep track of all connections for easy access
-        self.connections = []
+        # Complete connections in this scene, kept up to date by the connections themselves
+        self.connections = ConnectionSet()
+
+        # Graph state of the nodes and complete connections in this scene
+        self.model = GraphModel()
+        # Node model -> node item, for mapping model queries back to items
+        self._node_items = {}
+        # Issues of each node; edits mark what they affect, which is re-checked once per frame
+        self.validator = GraphValidator(self.model)
+        self._validation_scheduled = False
+
+        # History of the edits made through the editor, for undo/redo
+        self.undo_stack = undo.create_undo_stack(self)
+        # Moves the nodes to a new layout (see layoutNodes), and the edit it is making
+        self._layout_animation = QVariantAnimation(self)
+        self._layout_animation.setDuration(LAYOUT_ANIMATION_MS)
+        self._layout_animation.setEasingCurve(QEasingCurve.OutCubic)
+        self._layout_animation.setStartValue(0.0)
+        self._layout_animation.setEndValue(1.0)
+        self._layout_animation.valueChanged.connect(self._stepLayout)
+        self._layout_animation.finished.connect(self._finishLayout)
+        self._layout_command = None
+
+        # Spatial index of port centers, kept up to date by the nodes themselves
+        self.port_index = PortIndex()
+
+        # Connections whose path needs rebuilding, flushed once per frame
+        self._dirty_connections = set()
+        self._connection_flush_scheduled = False
+        
+        # Node menu, built on the first right-click and reused afterwards
+        self._node_palette = None
+
+        # Bounds of all nodes, kept up to date as nodes move
+        self.content_bounds = ContentBounds()
+        self._content_rect = QRectF()
+        self._bounds_flush_scheduled = False
         
         # Add grid (optional)
         self.grid_size = 20
@@ -32,10 +94,297 @@ class NodeScene(QGraphicsScene):
         # Set a background color
         self.setBackgroundBrush(QBrush(QColor(40, 40, 40)))
     
+    def nodeAdded(self, node):
+        """Called by a node once it has been added to this scene"""
+        if node.model.graph is None:
+            self.model.add_node(node.model)
+            self._node_items[node.model] = node
+            self.validator.node_added(node.model)
+            self._scheduleValidation()
+            # Restore the edges of connections that stayed in the scene
+            for port in list(node.input_ports.values()) + list(node.output_ports.values()):
+                for connection in port.connections:
+                    if connection.scene() is self:
+                        self.connectionAdded(connection)
+        self.nodeMoved(node)
+
+    def nodeMoved(self, node):
+        """Called by a node when its position or size changes"""
+        self.port_index.update_node(node)
+        self.content_bounds.update(node, node.sceneBoundingRect())
+        self._scheduleBoundsUpdate()
+
+    def nodeRemoved(self, node):
+        """Called by a node just before it leaves this scene"""
+        self.port_index.remove_node(node)
+        self.content_bounds.remove(node)
+        self._scheduleBoundsUpdate()
+        for port in list(node.input_ports.values()) + list(node.output_ports.values()):
+            for connection in port.connections:
+                self.connectionRemoved(connection)
+        self._node_items.pop(node.model, None)
+        self.model.remove_node(node.model)
+        self.validator.node_removed(node.model)
+        self._scheduleValidation()
+        node.set_validation_issues(())
+        # Nodes only run while they are in a scene
+        node.release()
+
+    def connectionAdded(self, connection):
+        """Called by a connection once it is in this scene and has both of its ports"""
+        if connection.model is not None or not (connection.start_port and connection.end_port):
+            return
+        source = connection.start_port.model
+        target = connection.end_port.model
+        # Edges are only recorded between nodes of this scene
+        if source.node.graph is self.model and target.node.graph is self.model:
+            connection.model = self.model.connect(source, target)
+            self.connections.add(connection)
+            self.validator.edge_added(connection.model)
+            self._scheduleValidation()
+
+    def connectionRemoved(self, connection):
+        """Called by a connection before it leaves this scene or loses a port"""
+        if connection.model is not None:
+            self.model.remove_edge(connection.model)
+            self.validator.edge_removed(connection.model)
+            self._scheduleValidation()
+            connection.model = None
+        self.connections.discard(connection)
+
+    def nodeForModel(self, node_model):
+        """Get the node item of a NodeModel in this scene's model, or None"""
+        return self._node_items.get(node_model)
+
+    def upstreamNodes(self, node):
+        """Get every node with a path of connections into node, nearest first"""
+        return [self._node_items[model] for model in self.model.upstream_nodes(node.model)]
+
+    def downstreamNodes(self, node):
+        """Get every node reachable from node along connections, nearest first"""
+        return [self._node_items[model] for model in self.model.downstream_nodes(node.model)]
+
+    def nodes(self):
+        """Get every node in this scene, in the order they were added"""
+        return list(self._node_items.values())
+
+    def selectedNodes(self):
+        """Get the selected nodes, in the order they were added"""
+        return [node for node in self._node_items.values() if node.isSelected()]
+
+    def nodesInCategory(self, category, registry=None):
+        """Get the nodes whose type is in category or one of its subcategories"""
+        registry = registry or default_registry()
+        nodes = []
+        for node in self._node_items.values():
+            node_type = registry.get(node.model.type_name)
+            node_category = node_type.category if node_type is not None else None
+            if node_category and (node_category == category or node_category.startswith(category + '/')):
+                nodes.append(node)
+        return nodes
+
+    def inDependencyOrder(self, nodes):
+        """Sort nodes so that each comes after the nodes upstream of it"""
+        layers, cyclic = self.model.topological_layers()
+        rank = {model: index for index, layer in enumerate(layers) for model in layer}
+        last = len(layers)
+        return sorted(nodes, key=lambda node: rank.get(node.model, last))
+
+    def batchUpdates(self):
+        """Context manager for adding or removing a batch of items (see suspended_updates)"""
+        return suspended_updates(self, index=False)
+
+    def addNodes(self, nodes):
+        """Add nodes as one undoable edit"""
+        self.undo_stack.push(undo.AddNodesCommand(self, nodes))
+
+    def copyNodes(self, nodes):
+        """Get a Subgraph of nodes and the connections among them, for pasting later"""
+        return Subgraph(nodes)
+
+    def pasteSubgraph(self, subgraph, dx=PASTE_OFFSET[0], dy=PASTE_OFFSET[1]):
+        """Add a copy of a Subgraph, moved by (dx, dy), as one undoable edit; the copy becomes the selection"""
+        nodes, connections = subgraph.instantiate(dx, dy)
+        self.undo_stack.push(undo.AddNodesCommand(self, nodes, connections))
+        self.clearSelection()
+        for node in nodes:
+            node.setSelected(True)
+        return nodes
+
+    def duplicateNodes(self, nodes):
+        """Paste a copy of nodes and the connections among them next to them"""
+        return self.pasteSubgraph(Subgraph(nodes, detach=False))
+
+    def deleteNodes(self, nodes):
+        """Remove nodes and their connections as one undoable edit"""
+        if nodes:
+            self.undo_stack.push(undo.RemoveNodesCommand(self, nodes))
+
+    def moveNodes(self, nodes, dx, dy):
+        """
+        Move nodes by (dx, dy) as an undoable edit.
+
+        Moves of the same nodes tuple in a row make one edit, so a drag
+        passes the same tuple for all of its steps.
+        """
+        undo.push_move(self.undo_stack, nodes, dx, dy)
+
+    def setNodePositions(self, nodes, positions):
+        """Move each node to its (x, y) in positions, in one batch; connection paths follow on the next frame"""
+        with self.batchUpdates():
+            for node, (x, y) in zip(nodes, np.asarray(positions, dtype=float).tolist()):
+                node.setPos(x, y)
+
+    def layoutNodes(self, nodes=None, animate=True):
+        """
+        Arrange nodes (by default all of them) in columns following the
+        dataflow, as one undoable edit; the layout keeps the nodes' top left
+        corner. The layout is computed on a worker thread and, with animate
+        and a view showing the scene, the nodes then move there over
+        LAYOUT_ANIMATION_MS. Returns the asyncio task doing it.
+        """
+        nodes = self.nodes() if nodes is None else list(nodes)
+        index = {node: position for position, node in enumerate(nodes)}
+        sources, targets = [], []
+        for source, node in enumerate(nodes):
+            for port in node.output_ports.values():
+                for connection in port.connections:
+                    target = index.get(connection.end_port.node) if connection.end_port else None
+                    if target is not None:
+                        sources.append(source)
+                        targets.append(target)
+        widths = [node.width for node in nodes]
+        heights = [node.height for node in nodes]
+        return lifecycle.run_soon(self._layOut(nodes, sources, targets, widths, heights, animate))
+
+    async def _layOut(self, nodes, sources, targets, widths, heights, animate):
+        x, y = await asyncio.wrap_future(
+            _layout_executor.submit(layered_layout, len(nodes), sources, targets, widths, heights))
+        # A layout still moving into place is finished first, so it is one edit of its own
+        if self._layout_command is not None:
+            self._layout_animation.setCurrentTime(self._layout_animation.duration())
+
+        # Nodes deleted in the meantime are left where they are
+        kept = [position for position, node in enumerate(nodes) if node.scene() is self]
+        if not kept:
+            return
+        nodes = [nodes[position] for position in kept]
+        start = np.array([(node.x(), node.y()) for node in nodes])
+        end = np.column_stack((x[kept], y[kept])) + start.min(axis=0)
+        command = undo.LayoutNodesCommand(self, nodes, start, end)
+        if animate and self.views():
+            self._layout_command = command
+            self._layout_animation.start()
+        else:
+            self.undo_stack.push(command)
+
+    def _stepLayout(self, progress):
+        # Every frame of the animation moves all the nodes in one batch
+        command = self._layout_command
+        if command is not None:
+            start, end = command.old_positions, command.new_positions
+            self.setNodePositions(command.nodes, start + (end - start) * progress)
+
+    def _finishLayout(self):
+        command, self._layout_command = self._layout_command, None
+        if command is not None:
+            # Puts every node exactly at its final position
+            self.undo_stack.push(command)
+
+    def removeConnection(self, connection):
+        """Remove a connection as an undoable edit"""
+        self.undo_stack.push(undo.RemoveConnectionCommand(self, connection))
+
+    def setRunState(self, nodes, running):
+        """Start or stop nodes as one undoable edit"""
+        command = undo.SetRunStateCommand(nodes, running)
+        if command.nodes:
+            self.undo_stack.push(command)
+
+    def _scheduleBoundsUpdate(self):
+        if not self._bounds_flush_scheduled:
+            self._bounds_flush_scheduled = True
+            QTimer.singleShot(0, self.flushContentBounds)
+
+    def flushContentBounds(self):
+        """Emit contentBoundsChanged if the node bounds changed since the last flush"""
+        self._bounds_flush_scheduled = False
+        rect = self.content_bounds.rect()
+        if rect != self._content_rect:
+            self._content_rect = rect
+            self.contentBoundsChanged.emit(rect)
+
+    def contentRect(self):
+        """Get the bounding rectangle of all nodes in the scene"""
+        return self.content_bounds.rect()
+
+    def _scheduleValidation(self):
+        if not self._validation_scheduled:
+            self._validation_scheduled = True
+            QTimer.singleShot(0, self.flushValidation)
+
+    def flushValidation(self):
+        """Validate what the edits since the last flush affected and update those nodes' badges"""
+        self._validation_scheduled = False
+        for node_model in self.validator.flush():
+            node = self._node_items.get(node_model)
+            if node is not None:
+                node.set_validation_issues(self.validator.issues_for(node_model))
+
+    def scheduleConnectionUpdate(self, connection):
+        """Mark a connection's path as stale; it is rebuilt once on the next frame"""
+        self._dirty_connections.add(connection)
+        if not self._connection_flush_scheduled:
+            self._connection_flush_scheduled = True
+            QTimer.singleShot(0, self.flushConnectionUpdates)
+
+    def flushConnectionUpdates(self):
+        """Rebuild the path of every connection marked stale since the last flush"""
+        dirty = self._dirty_connections
+        self._dirty_connections = set()
+        self._connection_flush_scheduled = False
+
+        for connection in dirty:
+            # Skip connections that were removed in the meantime
+            if connection.scene() is self:
+                connection.updatePath()
+
+    def canConnect(self, output_port, input_port):
+        """Whether a connection may go from output_port to input_port"""
+        return bool(input_port.is_input and not output_port.is_input and input_port.node is not output_port.node
+                    and message_types.compatible(output_port.model.type_id, input_port.model.type_id))
+
+    def connectionCandidates(self, output_port):
+        """Get the set of input ports a connection from output_port may end on"""
+        compatible = message_types.compatible_inputs(output_port.model.type_id)
+        return {
+            port
+            for node in self._node_items.values() if node is not output_port.node
+            for port in node.input_ports.values() if compatible[port.model.type_id]
+        }
+
+    def _setCandidatePorts(self, candidates):
+        """Highlight the given ports, un-highlighting the previous candidates"""
+        for node in self._candidate_nodes:
+            node.candidate_ports = ()
+            node.update()
+        by_node = {}
+        for port in candidates:
+            by_node.setdefault(port.node, []).append(port)
+        for node, ports in by_node.items():
+            node.candidate_ports = ports
+            node.update()
+        self._candidate_nodes = list(by_node)
+
     def startConnection(self, start_port):
         """Start creating a connection from the given output port"""
         self.start_port = start_port
         self.is_creating_connection = True
+
+        # Work out once where the connection may end, so that the drag and
+        # the drop only need set lookups
+        self.connection_candidates = self.connectionCandidates(start_port)
+        self._setCandidatePorts(self.connection_candidates)
         
         # Create a temporary connection
         self.current_connection = Connection(start_port)
@@ -57,14 +406,12 @@ class NodeScene(QGraphicsScene):
             # Try to find a port at the release point
             end_port = self.findPortAt(event.scenePos())
             
-            if end_port and end_port.is_input and end_port.node != self.start_port.node:
-                # We found a valid input port that's not on the same node
-                
-                # Finalize the connection
+            if end_port in self.connection_candidates:
+                # An input port on another node that accepts the start port's message type
+
+                # Finalize the connection (it adds itself to self.connections)
                 self.current_connection.setEndPort(end_port)
-                
-                # Add to our list of connections
-                self.connections.append(self.current_connection)
+                self.undo_stack.push(undo.AddConnectionCommand(self, self.current_connection))
             else:
                 # No valid end port found, remove the temporary connection
                 self.removeItem(self.current_connection)
@@ -73,6 +420,8 @@ class NodeScene(QGraphicsScene):
             self.current_connection = None
             self.start_port = None
             self.is_creating_connection = False
+            self.connection_candidates = set()
+            self._setCandidatePorts(())
             
             # Accept the event to prevent further processing
             event.accept()
@@ -81,19 +430,17 @@ class NodeScene(QGraphicsScene):
         super().mouseReleaseEvent(event)
 
     def findPortAt(self, scene_pos):
-        items = self.items(scene_pos)
-        for item in items:
-            if hasattr(item, 'input_ports'):  # Check if it's a node
-                # Check input ports
-                for port in item.input_ports.values():
-                    port_pos = item.mapToScene(port.relative_pos)
-                    if (port_pos - scene_pos).manhattanLength() < 10:
-                        return port
-                # Check output ports
-                for port in item.output_ports.values():
-                    port_pos = item.mapToScene(port.relative_pos)
-                    if (port_pos - scene_pos).manhattanLength() < 10:
+        """Find the port closest to the given scene position within the hit radius, on the topmost node there"""
+        ports = self.port_index.ports_at(scene_pos)
+        if not ports:
+            return None
+        # Only the node on top at the position can be hit; ports of nodes it covers are out of reach
+        for item in self.items(scene_pos):
+            if isinstance(item, BaseNode):
+                for port in ports:
+                    if port.node is item:
                         return port
+                return None
         return None
 
     def mousePressEvent(self, event):
@@ -132,27 +479,22 @@ class NodeScene(QGraphicsScene):
         # Pass the event to the base class
         super().mousePressEvent(event)
 
+    def nodePalette(self):
+        """Get the node menu, building it the first time it's needed"""
+        if self._node_palette is None:
+            menu = NodeSearchMenu()
+
+            # Add function category with utility actions
+            menu.add_node_action("Functions", "Add node button", ADD_NODE_BUTTON_ACTION)
+
+            # Add package categories and actions from the node registry; the
+            # menu keeps itself up to date as more node types are registered
+            menu.populate(default_registry())
+            self._node_palette = menu
+        return self._node_palette
+
     def showContextMenu(self, position):
         """Show a context menu at the given scene position"""
-        # Create custom menu with search
-        menu = NodeSearchMenu()
-        
-        # Add function category with utility actions
-        menu.add_node_action("Functions", "Add node button", None)
-        
-        # Add package categories and actions
-        # Teleoperation nodes
-        menu.add_node_action("Packages/Teleoperation", "Keyboard Teleop", KeyboardTeleopNode, submenu=True)
-        menu.add_node_action("Packages/Teleoperation", "Joystick Teleop", JoystickTeleopNode, submenu=True)
-        
-        # Navigation nodes
-        menu.add_node_action("Packages/Navigation & Mapping", "Nav2", Nav2Node, submenu=True)
-        menu.add_node_action("Packages/Navigation & Mapping", "SLAM Toolbox", SlamToolboxNode, submenu=True)
-        
-        # Control nodes
-        menu.add_node_action("Packages/Robot Control", "ROS2 Controllers", ROS2ControllersNode, submenu=True)
-        menu.add_node_action("Packages/Robot Control", "Twist Mux", TwistMuxNode, submenu=True)
-        
         # Get the first view
         if not self.views():
             return
@@ -163,19 +505,23 @@ class NodeScene(QGraphicsScene):
         global_pos = view.viewport().mapToGlobal(viewport_pos)
         
         # Execute menu at the correct position
-        action = menu.exec_(global_pos)
-        
-        # Process result - find which node was selected
+        action = self.nodePalette().exec_(global_pos)
         if action:
-            for node_name, node_info in menu.all_node_actions.items():
-                if node_info['action'] == action:
-                    if node_name == "Add node button":
-                        # Handle the Add node button action
-                        print("Add node button clicked")
-                        # TODO: Implement functionality for adding a node button
-                    else:
-                        print(f"Creating {node_name} node")
-                        node = node_info['node_class']()
-                        node.setPos(position)
-                        self.addItem(node)
-                    break
\ No newline at end of file
+            self.triggerPaletteAction(action, position)
+
+    def triggerPaletteAction(self, action, position):
+        """Carry out a node menu action at the given scene position"""
+        node_type = action.data()
+        if node_type == ADD_NODE_BUTTON_ACTION:
+            # Handle the Add node button action
+            print("Add node button clicked")
+            # TODO: Implement functionality for adding a node button
+            return None
+        if node_type is None:
+            return None
+
+        print(f"Creating {node_type.name} node")
+        node = node_type.create()
+        node.setPos(position)
+        self.addNodes([node])
+        return node
\ No newline at end of file
@@ -0,0 +1,326 @@
+import bisect
+import re
+from array import array
+
+import numpy as np
+
+# Scores for the ways a query term can match an entry
+SUBSTRING_SCORE = 20      # term appears as-is in the name
+PREFIX_SCORE = 10         # ... at the very start of the name
+WORD_START_SCORE = 5      # a substring or word-prefix piece of the term starts a word of the name
+CONSECUTIVE_SCORE = 2     # each further character of a word-prefix piece
+FIELD_SCORE = 4           # term prefixes a word of the category, a port or the description
+
+# Terms up to this long have their matches computed when entries are added
+SHORT_TERM_LENGTH = 3
+
+# Shortest term matched against categories, ports and descriptions
+FIELD_TERM_LENGTH = 2
+
+# Number of recent queries whose results are kept for narrowing and backspacing
+HISTORY_SIZE = 64
+
+# Postings of a term no name matches
+_NO_POSTINGS = (array('i'), array('d'))
+
+# Splits text into words, including camelCase and digit boundaries
+_WORD_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+
+def _words(text):
+    return [word.lower() for word in _WORD_RE.findall(text)]
+
+
+def _word_spans(text):
+    return tuple(match.span() for match in _WORD_RE.finditer(text))
+
+
+def _substring_score(term, index, starts):
+    score = SUBSTRING_SCORE + len(term)
+    if index == 0:
+        score += PREFIX_SCORE
+    if index in starts:
+        score += WORD_START_SCORE
+    return score
+
+
+def _hump_score(term, name, spans, first=0):
+    """Score term as prefixes of successive words of name (e.g. "tm" in "twist mux"), or None"""
+    if not term:
+        return 0
+    for k in range(first, len(spans)):
+        start, end = spans[k]
+        if name[start] != term[0]:
+            continue
+        limit = min(len(term), end - start)
+        length = 1
+        while length < limit and name[start + length] == term[length]:
+            length += 1
+        # Prefer taking as much of the term from this word as possible
+        for used in range(length, 0, -1):
+            rest = _hump_score(term[used:], name, spans, k + 1)
+            if rest is not None:
+                return rest + WORD_START_SCORE + CONSECUTIVE_SCORE * (used - 1)
+    return None
+
+
+def _hump_pattern(term):
+    """Regex matching the space separated words of a name when term is a run of their prefixes"""
+    first, *rest = map(re.escape, term)
+    # Each further character either continues the current word or starts a later one
+    return re.compile(r'(?:.* )?' + first + ''.join(r'(?:\S* )*' + char for char in rest))
+
+
+def _name_score(term, name, spans, starts, words, pattern):
+    """Score term against a lowercase name, or None if it doesn't match"""
+    index = name.find(term)
+    if index >= 0:
+        return _substring_score(term, index, starts)
+    # The pattern is cheaper than searching for a way to split the term
+    if pattern.match(words) is None:
+        return None
+    return _hump_score(term, name, spans)
+
+
+def _hump_terms(name, spans, max_length, prefix='', first=0):
+    """Yield every term of up to max_length made of prefixes of successive words of name"""
+    for k in range(first, len(spans)):
+        start, end = spans[k]
+        for used in range(1, min(max_length - len(prefix), end - start) + 1):
+            term = prefix + name[start:start + used]
+            yield term
+            if len(term) < max_length:
+                yield from _hump_terms(name, spans, max_length, term, k + 1)
+
+
+class SearchIndex:
+    """
+    Ranked fuzzy search over a set of entries (e.g. node types).
+
+    A query term matches an entry's name when it is a substring of it, or
+    when it can be split into prefixes of successive words of the name
+    ("tm" and "twmu" both match "Twist Mux"). Failing that, a term of at
+    least FIELD_TERM_LENGTH characters matches when it prefixes a word of the
+    entry's category, port names or description. Every term of a query has
+    to match.
+
+    Name matches for terms of up to SHORT_TERM_LENGTH characters are
+    computed when entries are added. A longer term can only match names its
+    first characters match, so only those are rescanned, and a term that
+    grows while typing only rescans the names the shorter one matched.
+    Scores are combined as arrays over every entry, and recent results are
+    kept so backspacing costs nothing.
+    """
+    def __init__(self):
+        self._keys = []
+        self._names = []
+        self._spans = []
+        self._starts = []
+        # Lowercase words of each name, separated by spaces
+        self._words = []
+        # Per-entry tie-break added to every score: shorter names, then older entries win
+        self._bias = array('d')
+
+        # Short term -> (ids, scores) of every name it matches, in id order
+        self._short_terms = {}
+        # Field word -> ids
+        self._field_words = {}
+        # Sorted field words, for prefix lookups
+        self._vocabulary = []
+        # (first, last + 1) range of the vocabulary -> ids with any of those words
+        self._field_cache = {}
+
+        # Arrays of the entries' biases and field match scores, built on the first search
+        self._bias_array = None
+        self._field_scores = None
+
+        # Normalized query -> per-term results, oldest first
+        self._history = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key, name, category='', ports=(), description=''):
+        """Index an entry; searches return its key"""
+        entry_id = len(self._keys)
+        lower = name.lower()
+        spans = _word_spans(name)
+        starts = tuple(start for start, _ in spans)
+        bias = -len(name) * 1e-3 - entry_id * 1e-9
+
+        self._keys.append(key)
+        self._names.append(lower)
+        self._spans.append(spans)
+        self._starts.append(starts)
+        self._words.append(' '.join(lower[start:end] for start, end in spans))
+        self._bias.append(bias)
+
+        # Every short term this name matches: its substrings (scored at
+        # their first occurrence) plus runs of word prefixes
+        short_terms = {}
+        for length in range(1, SHORT_TERM_LENGTH + 1):
+            for index in range(len(lower) - length + 1):
+                term = lower[index:index + length]
+                if term not in short_terms:
+                    short_terms[term] = _substring_score(term, index, starts)
+        for term in _hump_terms(lower, spans, SHORT_TERM_LENGTH):
+            if term not in short_terms:
+                short_terms[term] = _hump_score(term, lower, spans)
+        for term, score in short_terms.items():
+            postings = self._short_terms.get(term)
+            if postings is None:
+                postings = self._short_terms[term] = (array('i'), array('d'))
+            postings[0].append(entry_id)
+            postings[1].append(score + bias)
+
+        words = set(_words(category))
+        for port in ports:
+            words.update(_words(port))
+            # Also index whole port names so "cmd_v" and "cmdv" find "cmd_vel"
+            words.add(port.lower())
+            words.add(''.join(_words(port)))
+        words.update(_words(description))
+        for word in words:
+            postings = self._field_words.get(word)
+            if postings is None:
+                postings = self._field_words[word] = array('i')
+                bisect.insort(self._vocabulary, word)
+            postings.append(entry_id)
+
+        self._field_cache.clear()
+        self._bias_array = None
+        self._history.clear()
+        return entry_id
+
+    def clear(self):
+        self.__init__()
+
+    def _field_ids(self, term):
+        """Ids with a field word starting with term"""
+        vocabulary = self._vocabulary
+        start = bisect.bisect_left(vocabulary, term)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(term):
+            end += 1
+
+        # Growing a term often still prefixes the same words ("join", "joint")
+        ids = self._field_cache.get((start, end))
+        if ids is None:
+            ids = np.array([], dtype=np.intc)
+            if end > start:
+                ids = np.concatenate([self._field_words[word] for word in vocabulary[start:end]])
+            self._field_cache[(start, end)] = ids
+        return ids
+
+    def _scan(self, term, ids):
+        """Score term against each of the given entries, returning the (ids, scores) that match"""
+        names = self._names
+        spans = self._spans
+        starts = self._starts
+        words = self._words
+        bias = self._bias
+        pattern = _hump_pattern(term)
+
+        matches = array('i')
+        scores = array('d')
+        for entry_id in ids:
+            score = _name_score(term, names[entry_id], spans[entry_id], starts[entry_id], words[entry_id], pattern)
+            if score is not None:
+                matches.append(entry_id)
+                scores.append(score + bias[entry_id])
+        return matches, scores
+
+    def _term_scores(self, term, candidates=None):
+        """
+        Match term against every entry. Returns the ids of the names it
+        matches plus an array of each entry's score, -inf where it doesn't
+        match. Only the names in candidates are scanned for a long term if
+        they are given.
+        """
+        scores = np.full(len(self._keys), -np.inf)
+        if len(term) >= FIELD_TERM_LENGTH:
+            # Name matches take precedence over field matches
+            field_ids = self._field_ids(term)
+            scores[field_ids] = self._field_scores[field_ids]
+
+        if len(term) <= SHORT_TERM_LENGTH:
+            name_ids, name_scores = self._short_terms.get(term, _NO_POSTINGS)
+        else:
+            if candidates is None:
+                candidates = self._short_terms.get(term[:SHORT_TERM_LENGTH], _NO_POSTINGS)[0]
+            name_ids, name_scores = self._scan(term, candidates)
+        name_ids = np.array(name_ids, dtype=np.intc)
+        scores[name_ids] = name_scores
+        return name_ids, scores
+
+    def _match(self, query):
+        """
+        Match a normalized query, reusing the results of the longest cached
+        query it extends. Returns a list of (term, ids of the names the term
+        matches, total scores) with one entry per term, cut short after a
+        term that left nothing matching.
+        """
+        if self._bias_array is None:
+            self._bias_array = np.array(self._bias)
+            self._field_scores = self._bias_array + FIELD_SCORE
+
+        terms = query.split(' ')
+        previous = []
+        for end in range(len(query), 0, -1):
+            cached = self._history.get(query[:end])
+            if cached is not None:
+                if end == len(query):
+                    return cached
+                previous = cached
+                break
+
+        results = []
+        total = None
+        for k, term in enumerate(terms):
+            if k < len(previous) and previous[k][0] == term:
+                # Unchanged term of the cached query
+                results.append(previous[k])
+                total = previous[k][2]
+                continue
+
+            if k == len(previous) - 1 and len(term) > SHORT_TERM_LENGTH:
+                # The last term grew, so it can only match the names it matched before
+                name_ids, term_scores = self._term_scores(term, previous[k][1].tolist())
+            else:
+                name_ids, term_scores = self._term_scores(term)
+
+            # -inf marks entries that missed any term so far
+            total = term_scores if total is None else total + term_scores
+            results.append((term, name_ids, total))
+            if not (total > -np.inf).any():
+                break
+
+        if len(self._history) >= HISTORY_SIZE:
+            del self._history[next(iter(self._history))]
+        self._history[query] = results
+        return results
+
+    def search(self, query, limit=None):
+        """
+        Return the keys of entries matching query, best match first.
+
+        Ties go to shorter names, then to the entry added first. At most
+        `limit` keys are returned if it is given.
+        """
+        query = ' '.join(query.lower().split())
+        if not query:
+            return []
+
+        results = self._match(query)
+        if len(results) < query.count(' ') + 1:
+            # A term left nothing matching, so the rest weren't tried
+            return []
+
+        total = results[-1][2]
+        ids = np.flatnonzero(total > -np.inf)
+        if limit is not None and limit < len(ids):
+            # Only the best matches need sorting, kept in id order so ties stay stable
+            ids = np.sort(ids[np.argpartition(-total[ids], limit - 1)[:limit]])
+        ranked = ids[np.argsort(-total[ids], kind='stable')]
+        keys = self._keys
+        return [keys[entry_id] for entry_id in ranked.tolist()]
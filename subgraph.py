@@ -0,0 +1,55 @@
+"""
+Copying and pasting groups of nodes.
+
+A Subgraph records some nodes and the connections between them (the
+internal connections; links to nodes outside the group are dropped). Its
+nodes serve as prototypes: every paste clones them, which copies ports,
+colors and layout in one go instead of running each subclass __init__ and
+laying the ports out again after every add_*_port call (for node classes
+that allow it, see BaseNode.clone_from_prototype).
+"""
+from connection import Connection
+
+# Offset of pasted and duplicated nodes from the nodes they were copied from
+PASTE_OFFSET = (40.0, 40.0)
+
+
+class Subgraph:
+    """Nodes and their internal connections, to be pasted any number of times"""
+
+    def __init__(self, nodes, detach=True):
+        """
+        Record nodes and the connections among them. With detach, the nodes
+        are cloned straight away, so that later edits to them (or deleting
+        them) don't change what gets pasted; duplicating in place doesn't
+        need that and clones them only once, when pasting.
+        """
+        nodes = list(nodes)
+        index = {node: position for position, node in enumerate(nodes)}
+        # (source index, output name, target index, input name) of each internal connection
+        self.connections = []
+        for source, node in enumerate(nodes):
+            for port in node.output_ports.values():
+                for connection in port.connections:
+                    end_port = connection.end_port
+                    target = index.get(end_port.node) if end_port is not None else None
+                    if target is not None:
+                        self.connections.append((source, port.name, target, end_port.name))
+        self.positions = [(node.x(), node.y()) for node in nodes]
+        self.nodes = [node.clone() for node in nodes] if detach else nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def instantiate(self, dx=0.0, dy=0.0):
+        """Create new nodes and connections like the recorded ones, moved by (dx, dy); returns (nodes, connections)"""
+        nodes = []
+        for prototype, (x, y) in zip(self.nodes, self.positions):
+            node = prototype.clone()
+            node.setPos(x + dx, y + dy)
+            nodes.append(node)
+        connections = [
+            Connection(nodes[source].output_ports[output], nodes[target].input_ports[input])
+            for source, output, target, input in self.connections
+        ]
+        return nodes, connections
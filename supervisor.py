@@ -0,0 +1,305 @@
+"""
+Process supervision for nodes.
+
+Each node with a command runs it as a child process managed by a
+ManagedProcess: output is read from Qt signals as it arrives (never
+blocking the event loop), processes that exit unexpectedly are restarted
+according to the node's restart policy with exponential backoff, and
+stopping sends SIGTERM, escalating to SIGKILL if the process hasn't exited
+within a grace period.
+"""
+import collections
+import time
+
+from PySide6.QtCore import QObject, QProcess, QTimer, Signal
+
+# Process states
+STOPPED = 'stopped'
+STARTING = 'starting'
+RUNNING = 'running'
+STOPPING = 'stopping'
+BACKOFF = 'backoff'    # exited, waiting to be restarted
+FAILED = 'failed'      # exited and won't be restarted
+
+# Restart policies
+RESTART_NEVER = 'never'
+RESTART_ON_FAILURE = 'on-failure'
+RESTART_ALWAYS = 'always'
+
+# Seconds before the first restart; each further consecutive restart waits
+# RESTART_BACKOFF_FACTOR times longer, up to RESTART_BACKOFF_MAX
+RESTART_BACKOFF_INITIAL = 0.5
+RESTART_BACKOFF_FACTOR = 2.0
+RESTART_BACKOFF_MAX = 30.0
+
+# Consecutive restarts after which a process is given up on
+MAX_RESTARTS = 5
+
+# A process that stayed up this long (s) has its restart count reset
+RESTART_RESET_AFTER = 10.0
+
+# Seconds between SIGTERM and SIGKILL when stopping
+STOP_GRACE_PERIOD = 5.0
+
+# Lines of output kept per process
+OUTPUT_LINES = 1000
+
+# QProcess enums compared in signal handlers, looked up once
+_NORMAL_EXIT = QProcess.NormalExit
+_FAILED_TO_START = QProcess.FailedToStart
+_NOT_RUNNING = QProcess.NotRunning
+
+
+class ManagedProcess(QObject):
+    """A node's child process, with its output, restart policy and state"""
+    # Emitted with the new state
+    stateChanged = Signal(str)
+    # Emitted with each complete line of output (stdout and stderr merged)
+    outputReceived = Signal(str)
+
+    def __init__(self, command, restart_policy=RESTART_ON_FAILURE, parent=None):
+        super().__init__(parent)
+        self.command = list(command)
+        self.restart_policy = restart_policy
+        self.state = STOPPED
+        self.output = collections.deque(maxlen=OUTPUT_LINES)
+        self.restart_count = 0
+        self.exit_code = None
+        self.error = None
+        self.grace_period = STOP_GRACE_PERIOD
+
+        self._partial = b''
+        self._started_at = 0.0
+        self._process = None
+
+        self._restart_timer = QTimer(self)
+        self._restart_timer.setSingleShot(True)
+        self._restart_timer.timeout.connect(self._launch)
+        self._kill_timer = QTimer(self)
+        self._kill_timer.setSingleShot(True)
+        self._kill_timer.timeout.connect(self._kill)
+
+    def __repr__(self):
+        return f"ManagedProcess({self.command!r}, {self.state})"
+
+    def pid(self):
+        return self._process.processId() if self._process is not None else 0
+
+    def isActive(self):
+        """Whether the process is running or on its way up"""
+        return self.state in (STARTING, RUNNING, BACKOFF)
+
+    def _setState(self, state):
+        if state != self.state:
+            self.state = state
+            self.stateChanged.emit(state)
+
+    def start(self):
+        """Start the process if it isn't already running"""
+        if self.isActive():
+            return
+        if self.state == STOPPING:
+            # Don't wait for the old process; its late finished() is ignored
+            self._kill_timer.stop()
+            self._kill()
+        self.restart_count = 0
+        self.error = None
+        self._launch()
+
+    def _launch(self):
+        self.exit_code = None
+        self._partial = b''
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.MergedChannels)
+        process.readyReadStandardOutput.connect(self._readOutput)
+        process.started.connect(self._started)
+        process.finished.connect(self._finished)
+        process.errorOccurred.connect(self._errorOccurred)
+        self._process = process
+        self._setState(STARTING)
+        process.start(self.command[0], self.command[1:])
+
+    def stop(self):
+        """Stop the process: SIGTERM now, SIGKILL if it is still running after the grace period"""
+        if self.state == BACKOFF:
+            self._restart_timer.stop()
+            self._setState(STOPPED)
+            return
+        if self.state not in (STARTING, RUNNING):
+            return
+        self._setState(STOPPING)
+        self._process.terminate()
+        self._kill_timer.start(int(self.grace_period * 1000))
+
+    def _kill(self):
+        if self._process is not None and self._process.state() != _NOT_RUNNING:
+            self._process.kill()
+
+    def waitForStopped(self, timeout=STOP_GRACE_PERIOD):
+        """Stop the process and block until it has exited (e.g. when the application quits)"""
+        self.stop()
+        process = self._process
+        if process is not None and process.state() != _NOT_RUNNING:
+            if not process.waitForFinished(int(timeout * 1000)):
+                process.kill()
+                process.waitForFinished(1000)
+
+    def _started(self):
+        self._started_at = time.monotonic()
+        # A process stopped while it was starting stays stopping until it exits
+        if self.state == STARTING:
+            self._setState(RUNNING)
+
+    def _readOutput(self):
+        data = self._partial + bytes(self.sender().readAllStandardOutput())
+        lines = data.split(b'\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._appendLine(line)
+
+    def _appendLine(self, line):
+        text = line.rstrip(b'\r').decode('utf-8', 'replace')
+        self.output.append(text)
+        self.outputReceived.emit(text)
+
+    def _errorOccurred(self, error):
+        if error == _FAILED_TO_START and self.sender() is self._process:
+            # finished() is never emitted for a process that didn't start
+            self.error = self.sender().errorString()
+            # A missing executable won't appear by retrying
+            self._exited(failed=True, restart=False)
+
+    def _finished(self, exit_code, exit_status):
+        if self.sender() is not self._process:
+            # A process killed to make way for a new one
+            self.sender().deleteLater()
+            return
+        if self._partial:
+            self._appendLine(self._partial)
+            self._partial = b''
+        self.exit_code = exit_code
+        failed = exit_status != _NORMAL_EXIT or exit_code != 0
+        if failed and self.error is None and self.state != STOPPING:
+            self.error = f"exited with code {exit_code}" if exit_status == _NORMAL_EXIT else "crashed"
+        self._exited(failed)
+
+    def _exited(self, failed, restart=True):
+        self._kill_timer.stop()
+        process, self._process = self._process, None
+        if process is not None:
+            process.deleteLater()
+
+        if self.state == STOPPING:
+            self._setState(STOPPED)
+            return
+
+        if restart and (self.restart_policy == RESTART_ALWAYS or
+                        (failed and self.restart_policy == RESTART_ON_FAILURE)):
+            if self.state == RUNNING and time.monotonic() - self._started_at >= RESTART_RESET_AFTER:
+                self.restart_count = 0
+            if self.restart_count < MAX_RESTARTS:
+                delay = min(RESTART_BACKOFF_INITIAL * RESTART_BACKOFF_FACTOR ** self.restart_count,
+                            RESTART_BACKOFF_MAX)
+                self.restart_count += 1
+                self._setState(BACKOFF)
+                self._restart_timer.start(int(delay * 1000))
+                return
+        self._setState(FAILED if failed else STOPPED)
+
+
+class Supervisor(QObject):
+    """
+    Owns the processes of nodes with a command, one per node.
+
+    commands maps node class names to a command to run instead of the
+    class's own, e.g. stand-in scripts on a machine without ROS.
+    """
+    def __init__(self, commands=None, parent=None):
+        super().__init__(parent)
+        self.commands = dict(commands or {})
+        self._processes = {}
+        # Process -> node, for processes dropped once they have exited (see release)
+        self._released = {}
+
+    def command_for(self, node):
+        """The command the node runs under this supervisor, or None"""
+        return self.commands.get(type(node).__name__, node.command)
+
+    def process(self, node):
+        """Get the node's ManagedProcess, or None if it was never started"""
+        return self._processes.get(node)
+
+    def start(self, node):
+        """Start (or restart after an exit) the node's command"""
+        command = self.command_for(node)
+        process = self._processes.get(node)
+        if process is None:
+            process = ManagedProcess(command, node.restart_policy, self)
+            process.stateChanged.connect(node.process_state_changed)
+            process.stateChanged.connect(self._processStateChanged)
+            self._processes[node] = process
+        else:
+            # Pick up changes to the node's command since it last ran
+            process.command = list(command)
+            process.restart_policy = node.restart_policy
+            self._released.pop(process, None)
+        process.start()
+        return process
+
+    def stop(self, node):
+        process = self._processes.get(node)
+        if process is not None:
+            process.stop()
+
+    def release(self, node):
+        """
+        Stop the node's process and drop it once it has exited, e.g. when the
+        node is deleted. Starting the node again launches a new process.
+        """
+        process = self._processes.get(node)
+        if process is None:
+            return
+        process.stop()
+        if process.state in (STOPPED, FAILED):
+            self._drop(node, process)
+        else:
+            self._released[process] = node
+
+    def _processStateChanged(self, state):
+        process = self.sender()
+        node = self._released.get(process)
+        if node is not None and state in (STOPPED, FAILED):
+            self._drop(node, process)
+
+    def _drop(self, node, process):
+        del self._processes[node]
+        self._released.pop(process, None)
+        process.deleteLater()
+
+    def shutdown(self, timeout=STOP_GRACE_PERIOD):
+        """Stop every process and wait for them to exit"""
+        # Stopping drops the processes of released nodes
+        processes = list(self._processes.values())
+        for process in processes:
+            process.stop()
+        for process in processes:
+            process.waitForStopped(timeout)
+
+
+# Supervisor that nodes launch their commands under; None runs no processes
+_supervisor = None
+
+
+def current_supervisor():
+    """Get the installed supervisor, or None if nodes don't run processes"""
+    return _supervisor
+
+
+def install_supervisor(supervisor):
+    """
+    Make nodes run their commands under supervisor from now on (None to
+    stop launching processes). The editor installs one at startup; tests
+    and headless tools run nodes without processes unless they install one.
+    """
+    global _supervisor
+    _supervisor = supervisor
@@ -17,6 +17,24 @@ from tests.test_scene import TestNodeScene
 from tests.test_view import TestNodeView
 from tests.test_specific_nodes import TestSpecificNodes
 from tests.test_run_stop_button import TestRunStopButton
+from tests.test_port_index import TestPortIndex
+from tests.test_node_rendering import TestNodeRendering
+from tests.test_content_bounds import TestContentBounds
+from tests.test_graph_io import TestGraphIO
+from tests.test_node_registry import TestNodeRegistry
+from tests.test_search_index import TestSearchIndex
+from tests.test_graph_model import TestGraphModel
+from tests.test_launcher import TestLauncher
+from tests.test_supervisor import TestSupervisor
+from tests.test_lifecycle import TestLifecycle
+from tests.test_launch_export import TestLaunchExport
+from tests.test_message_types import TestMessageTypes
+from tests.test_validation import TestValidation
+from tests.test_undo import TestUndo
+from tests.test_subgraph import TestSubgraph
+from tests.test_perf_hud import TestPerformanceHud
+from tests.test_instrumentation import TestInstrumentation
+from tests.test_layout import TestLayeredLayout, TestSceneLayout
 
 def run_tests():
     """Run all tests and return the result"""
@@ -31,6 +49,25 @@ def run_tests():
     test_suite.addTest(unittest.makeSuite(TestNodeView))
     test_suite.addTest(unittest.makeSuite(TestSpecificNodes))
     test_suite.addTest(unittest.makeSuite(TestRunStopButton))
+    test_suite.addTest(unittest.makeSuite(TestPortIndex))
+    test_suite.addTest(unittest.makeSuite(TestNodeRendering))
+    test_suite.addTest(unittest.makeSuite(TestContentBounds))
+    test_suite.addTest(unittest.makeSuite(TestGraphIO))
+    test_suite.addTest(unittest.makeSuite(TestNodeRegistry))
+    test_suite.addTest(unittest.makeSuite(TestSearchIndex))
+    test_suite.addTest(unittest.makeSuite(TestGraphModel))
+    test_suite.addTest(unittest.makeSuite(TestLauncher))
+    test_suite.addTest(unittest.makeSuite(TestSupervisor))
+    test_suite.addTest(unittest.makeSuite(TestLifecycle))
+    test_suite.addTest(unittest.makeSuite(TestLaunchExport))
+    test_suite.addTest(unittest.makeSuite(TestMessageTypes))
+    test_suite.addTest(unittest.makeSuite(TestValidation))
+    test_suite.addTest(unittest.makeSuite(TestUndo))
+    test_suite.addTest(unittest.makeSuite(TestSubgraph))
+    test_suite.addTest(unittest.makeSuite(TestPerformanceHud))
+    test_suite.addTest(unittest.makeSuite(TestInstrumentation))
+    test_suite.addTest(unittest.makeSuite(TestLayeredLayout))
+    test_suite.addTest(unittest.makeSuite(TestSceneLayout))
     
     # Run tests
     test_runner = unittest.TextTestRunner(verbosity=2)
@@ -1,15 +1,29 @@
 import unittest
 from PySide6.QtWidgets import QApplication, QGraphicsScene
-from PySide6.QtCore import QPointF
+from PySide6.QtCore import QPointF, QTimer
 import sys
 
 from packages.base.node import BaseNode, Port
+from packages.robot_control import TwistMuxNode
 
 # Create QApplication instance for the tests
 app = QApplication.instance()
 if not app:
     app = QApplication(sys.argv)
 
+class StatefulNode(TwistMuxNode):
+    """Node whose __init__ creates mutable state of its own"""
+    def __init__(self):
+        super().__init__()
+        self.history = []
+        self.settings = {"rate": 10}
+        self.timer = QTimer()
+        self.add_input_port("feedback")
+
+class PlainMuxNode(TwistMuxNode):
+    """Subclass without an __init__ of its own"""
+    restart_policy = "never"
+
 class TestBaseNode(unittest.TestCase):
     """Test cases for the BaseNode class"""
     
@@ -77,6 +91,78 @@ class TestBaseNode(unittest.TestCase):
         no_port = self.node.port_at_position(QPointF(self.node.width / 2, self.node.height / 2))
         self.assertIsNone(no_port)
         
+    def test_shape(self):
+        """Test that the node shape covers the body and ports but not the padding"""
+        input_port = self.node.add_input_port("test_input")
+        shape = self.node.shape()
+        
+        self.assertTrue(shape.contains(QPointF(self.node.width / 2, self.node.height / 2)))
+        self.assertTrue(shape.contains(input_port.relative_pos - QPointF(5, 0)))
+        self.assertFalse(shape.contains(self.node.boundingRect().topLeft()))
+        
+        # The shape grows with the node
+        for i in range(5):
+            self.node.add_input_port(f"input_{i}")
+        self.assertTrue(self.node.shape().contains(QPointF(self.node.width / 2, self.node.height - 2)))
+        
+    def test_clone(self):
+        """Test that clones copy appearance and ports but not state"""
+        self.node.add_input_port("test_input")
+        self.node.add_output_port("test_output")
+        self.node.setPos(50, 60)
+        self.node.toggle_run_state()
+        
+        clone = self.node.clone()
+        self.assertIsInstance(clone, BaseNode)
+        self.assertEqual(clone.title, self.node.title)
+        self.assertEqual(clone.height, self.node.height)
+        self.assertEqual(clone.body_color, self.node.body_color)
+        self.assertEqual(list(clone.input_ports), ["test_input"])
+        self.assertEqual(clone.output_ports["test_output"].relative_pos,
+                         self.node.output_ports["test_output"].relative_pos)
+        
+        # Ports belong to the clone, and state is fresh
+        self.assertIs(clone.input_ports["test_input"].node, clone)
+        self.assertEqual(len(clone.input_ports["test_input"].connections), 0)
+        self.assertFalse(clone.is_running)
+        self.assertEqual(clone.pos(), QPointF(0, 0))
+        self.assertIsNone(clone.scene())
+
+        # A clone can be placed as it is made, and still reports later moves
+        placed = self.node.clone((30, 40))
+        self.assertEqual(placed.pos(), QPointF(30, 40))
+        self.assertEqual((placed.model.x, placed.model.y), (30, 40))
+        self.assertEqual(placed.flags(), self.node.flags())
+        placed.setPos(70, 80)
+        self.assertEqual((placed.model.x, placed.model.y), (70, 80))
+
+    def test_clone_mutable_state(self):
+        """Test that nodes of classes with their own mutable state never share it"""
+        self.assertFalse(StatefulNode.clones_from_prototype())
+        self.assertTrue(PlainMuxNode.clones_from_prototype())
+        self.assertTrue(TwistMuxNode.clones_from_prototype())
+
+        first = StatefulNode.create()
+        second = StatefulNode.create((10, 20))
+        first.history.append("started")
+        first.settings["rate"] = 50
+        self.assertEqual(second.history, [])
+        self.assertEqual(second.settings, {"rate": 10})
+        self.assertIsNot(second.timer, first.timer)
+        self.assertEqual(second.pos(), QPointF(10, 20))
+
+        # Clones get their own state too, with the original's title and extra ports
+        first.title = "Renamed"
+        first.add_output_port("debug")
+        clone = first.clone()
+        self.assertEqual(clone.history, [])
+        self.assertIsNot(clone.settings, first.settings)
+        self.assertIsNot(clone.timer, first.timer)
+        self.assertEqual(clone.title, "Renamed")
+        self.assertEqual(list(clone.input_ports), list(first.input_ports))
+        self.assertEqual(list(clone.output_ports), list(first.output_ports))
+        self.assertIs(clone.output_ports["debug"].node, clone)
+
     def test_node_height_adjustment(self):
         """Test that node height adjusts based on number of ports"""
         initial_height = self.node.height
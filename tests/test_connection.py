@@ -84,6 +84,28 @@ class TestConnection(unittest.TestCase):
         # Path should have changed
         self.assertNotEqual(initial_path, connection.path())
         
+    def test_bounding_rect_and_shape(self):
+        """Test that the cached geometry covers the path and follows updates"""
+        self.target_node.setPos(400, 250)
+        connection = Connection(self.output_port, self.input_port)
+        self.scene.addItem(connection)
+        
+        # The bounding rect covers both endpoints and the whole curve
+        rect = connection.boundingRect()
+        self.assertTrue(rect.contains(self.output_port.get_scene_pos()))
+        self.assertTrue(rect.contains(self.input_port.get_scene_pos()))
+        self.assertTrue(rect.contains(connection.path().boundingRect()))
+        
+        # The shape follows the stroke, not the whole bounding rect
+        self.assertTrue(connection.shape().contains(connection.path().pointAtPercent(0.5)))
+        self.assertFalse(connection.shape().contains(rect.topRight() + QPointF(-1, 1)))
+        
+        # Geometry is refreshed when the path changes
+        self.target_node.setPos(600, 500)
+        connection.updatePath()
+        self.assertTrue(connection.boundingRect().contains(self.input_port.get_scene_pos()))
+        self.assertTrue(connection.shape().contains(self.input_port.get_scene_pos()))
+        
     def test_disconnect_from_ports(self):
         """Test disconnecting a connection from its ports"""
         # Create connection
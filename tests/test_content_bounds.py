@@ -0,0 +1,106 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QRectF
+import sys
+
+from content_bounds import ContentBounds
+from scene import NodeScene
+from view import NodeView
+from packages.navigation import Nav2Node
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class TestContentBounds(unittest.TestCase):
+    """Test cases for the ContentBounds tracker and its scene/view integration"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.bounds = ContentBounds()
+        self.a = object()
+        self.b = object()
+
+    def test_empty(self):
+        """Test that empty bounds give an empty rect"""
+        self.assertTrue(self.bounds.rect().isEmpty())
+
+    def test_grow(self):
+        """Test that bounds grow to include every item"""
+        self.bounds.update(self.a, QRectF(0, 0, 10, 10))
+        self.bounds.update(self.b, QRectF(50, 50, 10, 10))
+        self.assertEqual(self.bounds.rect(), QRectF(0, 0, 60, 60))
+
+    def test_shrink_when_edge_item_moves_inward(self):
+        """Test that bounds shrink when the item defining an edge moves inward"""
+        self.bounds.update(self.a, QRectF(0, 0, 10, 10))
+        self.bounds.update(self.b, QRectF(50, 50, 10, 10))
+
+        self.bounds.update(self.b, QRectF(20, 20, 10, 10))
+        self.assertEqual(self.bounds.rect(), QRectF(0, 0, 30, 30))
+
+    def test_shrink_on_remove(self):
+        """Test that removing an edge item shrinks the bounds"""
+        self.bounds.update(self.a, QRectF(0, 0, 10, 10))
+        self.bounds.update(self.b, QRectF(50, 50, 10, 10))
+
+        self.bounds.remove(self.b)
+        self.assertEqual(self.bounds.rect(), QRectF(0, 0, 10, 10))
+
+        self.bounds.remove(self.a)
+        self.assertTrue(self.bounds.rect().isEmpty())
+
+    def test_scene_tracks_nodes(self):
+        """Test that NodeScene keeps the content bounds in sync with its nodes"""
+        scene = NodeScene()
+        node = Nav2Node()
+        node.setPos(100, 100)
+        scene.addItem(node)
+        self.assertEqual(scene.contentRect(), node.sceneBoundingRect())
+
+        node.setPos(300, 300)
+        self.assertEqual(scene.contentRect(), node.sceneBoundingRect())
+
+        scene.removeItem(node)
+        self.assertTrue(scene.contentRect().isEmpty())
+
+    def test_bounds_signal_is_coalesced(self):
+        """Test that many moves within a frame emit contentBoundsChanged once"""
+        scene = NodeScene()
+        node = Nav2Node()
+        scene.addItem(node)
+        app.processEvents()
+
+        emitted = []
+        scene.contentBoundsChanged.connect(emitted.append)
+        for i in range(10):
+            node.setPos(i * 50, 0)
+        app.processEvents()
+
+        self.assertEqual(len(emitted), 1)
+        self.assertEqual(emitted[0], node.sceneBoundingRect())
+
+    def test_view_scene_rect_hysteresis(self):
+        """Test that the view only resizes the scene rect when the padding margin is crossed"""
+        scene = NodeScene()
+        view = NodeView(scene)
+        node = Nav2Node()
+        scene.addItem(node)
+        app.processEvents()
+        initial = scene.sceneRect()
+        self.assertTrue(initial.contains(node.sceneBoundingRect()))
+
+        # Small moves stay within the padding
+        node.setPos(view.scene_padding / 2, 0)
+        app.processEvents()
+        self.assertEqual(scene.sceneRect(), initial)
+
+        # Moving past the padding grows the scene rect
+        node.setPos(1000, 1000)
+        app.processEvents()
+        self.assertTrue(scene.sceneRect().contains(node.sceneBoundingRect()))
+        self.assertNotEqual(scene.sceneRect(), initial)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+import io
+import os
+import sys
+import tempfile
+
+from scene import NodeScene
+from connection import Connection
+import graph_io
+from graph_io import GraphFormatError
+from packages.base.node import BaseNode
+from packages.teleoperation import KeyboardTeleopNode, JoystickTeleopNode
+from packages.navigation import Nav2Node, SlamToolboxNode
+from packages.robot_control import ROS2ControllersNode, TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+NODE_CLASSES = [
+    KeyboardTeleopNode, JoystickTeleopNode,
+    Nav2Node, SlamToolboxNode,
+    ROS2ControllersNode, TwistMuxNode,
+]
+
+class TestGraphIO(unittest.TestCase):
+    """Test cases for saving and loading graphs"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tempdir.name, name)
+
+    def build_sample(self):
+        """Add one node of every class plus a generic node, and wire some of them"""
+        nodes = []
+        for i, node_class in enumerate(NODE_CLASSES):
+            node = node_class()
+            node.setPos(i * 250, i * 40)
+            self.scene.addItem(node)
+            nodes.append(node)
+
+        generic = BaseNode(title="Custom")
+        generic.add_input_port("in_a")
+        generic.add_output_port("out_a")
+        generic.setPos(-300, 500)
+        self.scene.addItem(generic)
+        nodes.append(generic)
+
+        keyboard, joystick, nav2, slam, controllers, mux = nodes[:6]
+        for start_port, end_port in (
+            (keyboard.output_ports["cmd_vel"], mux.input_ports["cmd_vel1"]),
+            (joystick.output_ports["cmd_vel"], mux.input_ports["cmd_vel2"]),
+            (nav2.output_ports["cmd_vel"], mux.input_ports["cmd_vel3"]),
+            (mux.output_ports["cmd_vel"], controllers.input_ports["cmd_vel"]),
+            (generic.output_ports["out_a"], nav2.input_ports["goal_pose"]),
+        ):
+            connection = Connection(start_port, end_port)
+            self.scene.addItem(connection)
+            self.scene.connections.append(connection)
+
+        nav2.toggle_run_state()
+        return nodes
+
+    def describe(self, scene):
+        """Summarize a scene's nodes and connections in a comparable form"""
+        nodes = sorted(
+            (type(item).__name__, item.title, item.pos().x(), item.pos().y(), item.is_running,
+             tuple(item.input_ports), tuple(item.output_ports))
+            for item in scene.items() if isinstance(item, BaseNode)
+        )
+        connections = sorted(
+            ((c.start_port.node.title, c.start_port.name), (c.end_port.node.title, c.end_port.name))
+            for c in scene.items() if isinstance(c, Connection)
+        )
+        return nodes, connections
+
+    def round_trip(self, filename):
+        self.build_sample()
+        graph_io.save_graph(self.scene, self.path(filename))
+
+        loaded = NodeScene()
+        nodes, connections = graph_io.load_graph(loaded, self.path(filename))
+
+        self.assertEqual(len(nodes), len(NODE_CLASSES) + 1)
+        self.assertEqual(len(connections), 5)
+        self.assertEqual(self.describe(loaded), self.describe(self.scene))
+        return loaded
+
+    def test_binary_round_trip(self):
+        """Test that every node class survives a binary save/load"""
+        self.round_trip("graph.rgraph")
+
+    def test_jsonl_round_trip(self):
+        """Test that every node class survives a JSON lines save/load"""
+        self.round_trip("graph.jsonl")
+
+    def test_loaded_scene_is_usable(self):
+        """Test that loaded nodes are indexed and their connections tracked"""
+        loaded = self.round_trip("graph.rgraph")
+        self.assertEqual(len(loaded.connections), 5)
+
+        mux = next(item for item in loaded.items() if isinstance(item, TwistMuxNode))
+        port = mux.input_ports["cmd_vel1"]
+        self.assertEqual(loaded.findPortAt(port.get_scene_pos()), port)
+        self.assertEqual(len(port.connections), 1)
+
+    def test_strings_are_interned(self):
+        """Test that repeated node types and port names are stored once in binary files"""
+        for i in range(20):
+            node = Nav2Node()
+            node.setPos(i * 250, 0)
+            self.scene.addItem(node)
+
+        stream = io.BytesIO()
+        graph_io.write_binary(graph_io.iter_scene_records(self.scene), stream)
+        data = stream.getvalue()
+        self.assertEqual(data.count(b"Nav2Node"), 1)
+        self.assertEqual(data.count(b"goal_pose"), 1)
+
+    def test_format_errors(self):
+        """Test that malformed files raise GraphFormatError"""
+        with self.assertRaises(GraphFormatError):
+            list(graph_io.read_binary(io.BytesIO(b"nope")))
+        with self.assertRaises(GraphFormatError):
+            list(graph_io.read_jsonl(io.StringIO('{"format": "something-else"}\n')))
+
+        records = [graph_io.NodeData("NoSuchNode", "x", 0, 0, False, [], [])]
+        with self.assertRaises(GraphFormatError):
+            graph_io.build_scene(NodeScene(), records)
+
+    def test_corrupt_binary(self):
+        """Test that truncated or corrupt binary files raise GraphFormatError"""
+        self.build_sample()
+        stream = io.BytesIO()
+        graph_io.write_binary(graph_io.iter_scene_records(self.scene), stream)
+        data = stream.getvalue()
+
+        for size in range(0, len(data), 7):
+            with self.assertRaises(GraphFormatError):
+                list(graph_io.read_binary(io.BytesIO(data[:size])))
+
+        # A node referring to a string that was never defined
+        header = graph_io._HEADER.pack(graph_io.BINARY_MAGIC, graph_io.FORMAT_VERSION)
+        node = b'N' + graph_io._NODE.pack(5, 6, 0.0, 0.0, 0, 0, 0)
+        with self.assertRaises(GraphFormatError):
+            list(graph_io.read_binary(io.BytesIO(header + node + b'E')))
+
+        # A string that isn't valid UTF-8
+        string = b'S' + graph_io._STRING_LENGTH.pack(2) + b'\xff\xfe'
+        with self.assertRaises(GraphFormatError):
+            list(graph_io.read_binary(io.BytesIO(header + string + b'E')))
+
+    def test_corrupt_jsonl(self):
+        """Test that JSON lines records with missing or wrong fields raise GraphFormatError"""
+        header = '{"format": "ros-node-graph", "version": 1}\n'
+        for line in ('{"connection": [0, "out", 1]}', '{"connection": [0, "out", -1, "in"]}',
+                     '{"node": "Nav2Node", "x": 0, "y": 0}', '{"node": "Nav2Node", "title": "", "x": "a", "y": 0}',
+                     '[1, 2]', '{"other": 1}'):
+            with self.assertRaises(GraphFormatError, msg=line):
+                list(graph_io.read_jsonl(io.StringIO(header + line + '\n')))
+        with self.assertRaises(GraphFormatError):
+            list(graph_io.read_jsonl(io.StringIO('[]\n')))
+
+    def test_long_strings(self):
+        """Test that strings longer than 64 KiB are saved and loaded"""
+        title = "t" * 70000
+        records = [graph_io.NodeData("Nav2Node", title, 0.0, 0.0, False, [], [])]
+        stream = io.BytesIO()
+        graph_io.write_binary(records, stream)
+        stream.seek(0)
+        (loaded,) = graph_io.read_binary(stream)
+        self.assertEqual(loaded.title, title)
+
+    def test_batched_loading(self):
+        """Test that small batch sizes produce the same scene"""
+        self.build_sample()
+        stream = io.BytesIO()
+        graph_io.write_binary(graph_io.iter_scene_records(self.scene), stream)
+        stream.seek(0)
+
+        loaded = NodeScene()
+        graph_io.build_scene(loaded, graph_io.read_binary(stream), batch_size=2)
+        self.assertEqual(self.describe(loaded), self.describe(self.scene))
+
+if __name__ == '__main__':
+    unittest.main()
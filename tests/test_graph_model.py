@@ -0,0 +1,187 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+import os
+import subprocess
+import sys
+import tempfile
+
+from graph_model import ConnectionSet, GraphModel, NodeModel
+from scene import NodeScene
+from connection import Connection
+import graph_io
+from packages.navigation import Nav2Node
+from packages.robot_control import TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestGraphModel(unittest.TestCase):
+    """Test cases for the headless graph model and its scene integration"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.model = GraphModel()
+        self.a = self.model.create_node("Nav2Node", "A", outputs=["cmd_vel"])
+        self.b = self.model.create_node("TwistMuxNode", "B", inputs=["cmd_vel1"], outputs=["cmd_vel"])
+
+    def test_nodes_and_edges(self):
+        """Test adding nodes and connecting their ports"""
+        edge = self.model.connect(self.a.outputs["cmd_vel"], self.b.inputs["cmd_vel1"])
+        self.assertEqual(list(self.model.nodes.values()), [self.a, self.b])
+        self.assertEqual(list(self.model.edges.values()), [edge])
+        self.assertEqual(list(self.a.outputs["cmd_vel"].edges), [edge])
+        self.assertEqual(list(self.b.inputs["cmd_vel1"].edges), [edge])
+
+        with self.assertRaises(ValueError):
+            self.model.connect(self.b.inputs["cmd_vel1"], self.a.outputs["cmd_vel"])
+        with self.assertRaises(ValueError):
+            self.model.connect(self.a.outputs["cmd_vel"], NodeModel("X", "X").add_input("in"))
+
+    def test_remove_node_removes_edges(self):
+        """Test that removing a node removes its edges"""
+        self.model.connect(self.a.outputs["cmd_vel"], self.b.inputs["cmd_vel1"])
+        self.model.remove_node(self.b)
+        self.assertEqual(list(self.model.nodes.values()), [self.a])
+        self.assertEqual(self.model.edges, {})
+        self.assertEqual(list(self.a.outputs["cmd_vel"].edges), [])
+        self.assertEqual(self.a.downstream, {})
+        self.assertIsNone(self.b.graph)
+
+    def test_adjacency_queries(self):
+        """Test edges between nodes and upstream/downstream walks"""
+        c = self.model.create_node("Nav2Node", "C", inputs=["in1", "in2"])
+        first = self.model.connect(self.a.outputs["cmd_vel"], self.b.inputs["cmd_vel1"])
+        second = self.model.connect(self.b.outputs["cmd_vel"], c.inputs["in1"])
+        third = self.model.connect(self.b.outputs["cmd_vel"], c.inputs["in2"])
+
+        self.assertEqual(self.model.edges_between(self.b, c), [second, third])
+        self.assertEqual(self.model.edges_between(c, self.b), [])
+        self.assertEqual(self.model.upstream_nodes(c), [self.b, self.a])
+        self.assertEqual(self.model.downstream_nodes(self.a), [self.b, c])
+        self.assertEqual(set(self.model.node_edges(self.b)), {first, second, third})
+
+        # The node adjacency entry goes once its last edge does
+        self.model.remove_edge(second)
+        self.assertEqual(self.model.edges_between(self.b, c), [third])
+        self.model.remove_edge(third)
+        self.assertNotIn(c, self.b.downstream)
+        self.assertEqual(self.model.upstream_nodes(c), [])
+
+    def test_fan_in(self):
+        """Test that many edges into one port can be added and removed in any order"""
+        sources = [self.model.create_node("Nav2Node", str(k), outputs=["out"]) for k in range(200)]
+        edges = [self.model.connect(source.outputs["out"], self.b.inputs["cmd_vel1"]) for source in sources]
+        self.assertEqual(len(self.b.inputs["cmd_vel1"].edges), 200)
+        for edge in edges[::2]:
+            self.model.remove_edge(edge)
+        self.assertEqual(list(self.b.inputs["cmd_vel1"].edges), edges[1::2])
+        self.assertEqual(len(self.b.upstream), 100)
+
+    def test_connection_set(self):
+        """Test the ordered set used for connections and edges"""
+        items = ConnectionSet(["a", "b"])
+        items.append("c")
+        items.append("a")
+        self.assertEqual(list(items), ["a", "b", "c"])
+        items.remove("b")
+        items.discard("b")
+        self.assertNotIn("b", items)
+        self.assertEqual(list(items.copy()), ["a", "c"])
+        with self.assertRaises(KeyError):
+            items.remove("b")
+
+    def test_scene_items_are_views(self):
+        """Test that node and connection items keep their state in the scene's model"""
+        scene = NodeScene()
+        nav2 = Nav2Node()
+        mux = TwistMuxNode()
+        scene.addItem(nav2)
+        scene.addItem(mux)
+        self.assertEqual(list(scene.model.nodes.values()), [nav2.model, mux.model])
+        self.assertEqual(list(nav2.model.outputs), list(nav2.output_ports))
+
+        nav2.setPos(120, 40)
+        nav2.title = "Planner"
+        nav2.toggle_run_state()
+        self.assertEqual((nav2.model.x, nav2.model.y), (120, 40))
+        self.assertEqual(nav2.model.title, "Planner")
+        self.assertTrue(nav2.model.is_running)
+
+        connection = Connection(nav2.output_ports["cmd_vel"], mux.input_ports["cmd_vel1"])
+        scene.addItem(connection)
+        edge = connection.model
+        self.assertIs(edge.source, nav2.output_ports["cmd_vel"].model)
+        self.assertIs(edge.target, mux.input_ports["cmd_vel1"].model)
+
+        # Removing a node drops its edges; adding it back restores them
+        scene.removeItem(mux)
+        self.assertEqual(scene.model.edges, {})
+        scene.addItem(mux)
+        self.assertEqual(len(scene.model.edges), 1)
+        self.assertEqual(scene.upstreamNodes(mux), [nav2])
+        self.assertEqual(scene.downstreamNodes(nav2), [mux])
+        self.assertIs(scene.nodeForModel(nav2.model), nav2)
+
+        connection.disconnectFromPorts()
+        self.assertEqual(scene.model.edges, {})
+        self.assertNotIn(connection, scene.connections)
+
+    def test_pending_connections_are_not_edges(self):
+        """Test that a connection only becomes an edge once it has an end port"""
+        scene = NodeScene()
+        nav2 = Nav2Node()
+        mux = TwistMuxNode()
+        scene.addItem(nav2)
+        scene.addItem(mux)
+
+        scene.startConnection(nav2.output_ports["cmd_vel"])
+        self.assertEqual(scene.model.edges, {})
+        scene.current_connection.setEndPort(mux.input_ports["cmd_vel2"])
+        self.assertEqual(len(scene.model.edges), 1)
+
+    def test_clones_have_their_own_model(self):
+        """Test that cloned nodes get a fresh model with the same ports"""
+        original = Nav2Node()
+        clone = original.clone()
+        self.assertIsNot(clone.model, original.model)
+        self.assertEqual(list(clone.model.inputs), list(original.model.inputs))
+        self.assertIs(clone.input_ports["scan"].model, clone.model.inputs["scan"])
+        self.assertIs(clone.model.inputs["scan"].node, clone.model)
+
+    def test_headless_round_trip(self):
+        """Test saving and loading a GraphModel without a scene"""
+        self.model.connect(self.a.outputs["cmd_vel"], self.b.inputs["cmd_vel1"])
+        with tempfile.TemporaryDirectory() as directory:
+            for filename in ("graph.rgraph", "graph.jsonl"):
+                path = os.path.join(directory, filename)
+                graph_io.save_model(self.model, path)
+                loaded = graph_io.load_model(path)
+                self.assertEqual([node.title for node in loaded.nodes.values()], ["A", "B"])
+                (edge,) = loaded.edges.values()
+                self.assertEqual((edge.source.node.title, edge.source.name), ("A", "cmd_vel"))
+                self.assertEqual((edge.target.node.title, edge.target.name), ("B", "cmd_vel1"))
+
+    def test_load_model_needs_no_application(self):
+        """Test that a graph file can be loaded without a QApplication or the editor's scene and view modules"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.rgraph")
+            graph_io.save_model(self.model, path)
+            script = (
+                "import sys, graph_io\n"
+                "from PySide6.QtCore import QCoreApplication\n"
+                f"model = graph_io.load_model({path!r})\n"
+                "assert len(model.nodes) == 2\n"
+                "assert QCoreApplication.instance() is None\n"
+                "loaded = {'scene', 'view', 'numpy', 'PySide6.QtWidgets'} & set(sys.modules)\n"
+                "assert not loaded, loaded\n"
+            )
+            result = subprocess.run([sys.executable, '-c', script], cwd=REPO_DIR,
+                                    capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+import json
+import os
+import sys
+import tempfile
+
+import instrumentation
+from scene import NodeScene
+from view import NodeView
+from connection import Connection
+from node_menu import NodeSearchMenu
+from packages.teleoperation import KeyboardTeleopNode
+from packages.robot_control import TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for the hot-path counters"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        instrumentation.reset()
+        self.scene = NodeScene()
+        self.keyboard = KeyboardTeleopNode()
+        self.mux = TwistMuxNode()
+        self.mux.setPos(300, 0)
+        self.scene.addItem(self.keyboard)
+        self.scene.addItem(self.mux)
+        self.connection = Connection(self.keyboard.output_ports["cmd_vel"],
+                                     self.mux.input_ports["cmd_vel1"])
+        self.scene.addItem(self.connection)
+
+    def tearDown(self):
+        while instrumentation.is_enabled():
+            instrumentation.disable()
+        instrumentation.reset()
+
+    def exercise(self):
+        """Call each hot path once, the way the editor does"""
+        self.scene.findPortAt(self.mux.input_ports["cmd_vel1"].get_scene_pos())
+        self.connection.updatePath()
+        self.mux.updateConnections()
+        NodeView(self.scene).updateSceneRect()
+        menu = NodeSearchMenu()
+        menu.add_node_action("Packages/Robot Control", "Twist Mux", TwistMuxNode, submenu=True)
+        menu.search_bar.setText("mux")
+
+    def test_disabled_costs_nothing(self):
+        """Test that the original methods are in place and nothing is counted while disabled"""
+        find_port = NodeScene.__dict__['findPortAt']
+        instrumentation.enable()
+        self.assertIsNot(NodeScene.__dict__['findPortAt'], find_port)
+        instrumentation.disable()
+        self.assertIs(NodeScene.__dict__['findPortAt'], find_port)
+
+        self.exercise()
+        snapshot = instrumentation.snapshot()
+        self.assertFalse(snapshot["enabled"])
+        self.assertTrue(all(counter["calls"] == 0 for counter in snapshot["counters"].values()))
+
+    def test_counts_hot_paths(self):
+        """Test that every hot path is counted and its calls land in the histogram"""
+        instrumentation.enable()
+        self.exercise()
+        counters = instrumentation.snapshot()["counters"]
+        for name in ("NodeScene.findPortAt", "Connection.updatePath", "BaseNode.updateConnections",
+                     "NodeView.updateSceneRect", "NodeSearchMenu.filter_nodes"):
+            self.assertGreaterEqual(counters[name]["calls"], 1, name)
+        self.assertEqual(counters["NodeSearchMenu.filter_nodes"]["calls"], 1)
+        for counter in counters.values():
+            self.assertEqual(sum(counter["histogram"]), counter["calls"])
+            self.assertEqual(len(counter["histogram"]), len(instrumentation.HISTOGRAM_BOUNDS_US) + 1)
+
+    def test_shared_enable(self):
+        """Test that counting continues until every user has disabled it, and the figures are kept"""
+        instrumentation.enable()
+        instrumentation.enable()
+        instrumentation.disable()
+        self.scene.findPortAt(self.keyboard.pos())
+        self.assertTrue(instrumentation.is_enabled())
+        instrumentation.disable()
+        self.scene.findPortAt(self.keyboard.pos())
+        self.assertEqual(instrumentation.counters["NodeScene.findPortAt"].calls, 1)
+
+        instrumentation.reset()
+        self.assertEqual(instrumentation.counters["NodeScene.findPortAt"].calls, 0)
+        self.assertEqual(instrumentation.recorded_seconds(), 0.0)
+
+    def test_dump(self):
+        """Test that the counters are written as JSON along with the environment"""
+        instrumentation.enable()
+        self.exercise()
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            instrumentation.dump(path)
+            with open(path) as f:
+                data = json.load(f)
+        finally:
+            os.remove(path)
+        self.assertTrue(data["enabled"])
+        self.assertIn("pyside", data["environment"])
+        self.assertEqual(data["counters"]["NodeSearchMenu.filter_nodes"]["calls"], 1)
+        self.assertGreater(data["recorded_s"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
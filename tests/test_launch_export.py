@@ -0,0 +1,160 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+import os
+import sys
+import tempfile
+
+from scene import NodeScene
+from connection import Connection
+import graph_io
+import launch_export
+from launch_export import LaunchExporter, export_launch, render_fragment
+from packages.base.node import BaseNode
+from packages.teleoperation import KeyboardTeleopNode, JoystickTeleopNode
+from packages.navigation import Nav2Node
+from packages.robot_control import ROS2ControllersNode, TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class TestLaunchExport(unittest.TestCase):
+    """Test cases for exporting graphs as ROS 2 launch files"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+        self.tempdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tempdir.name, name)
+
+    def add(self, node):
+        self.scene.addItem(node)
+        return node
+
+    def connect(self, source, output, target, input):
+        connection = Connection(source.output_ports[output], target.input_ports[input])
+        self.scene.addItem(connection)
+        return connection
+
+    def build_sample(self):
+        """Teleop and navigation feeding a mux that drives the controllers"""
+        keyboard = self.add(KeyboardTeleopNode())
+        joystick = self.add(JoystickTeleopNode())
+        nav2 = self.add(Nav2Node())
+        mux = self.add(TwistMuxNode())
+        controllers = self.add(ROS2ControllersNode())
+        self.connect(keyboard, "cmd_vel", mux, "cmd_vel1")
+        self.connect(joystick, "cmd_vel", mux, "cmd_vel2")
+        self.connect(nav2, "cmd_vel", mux, "cmd_vel3")
+        self.connect(mux, "cmd_vel", controllers, "cmd_vel")
+        return keyboard, joystick, nav2, mux, controllers
+
+    def test_launch_file(self):
+        """Test that nodes become launch actions and connections become remappings"""
+        keyboard, joystick, nav2, mux, controllers = self.build_sample()
+        text = LaunchExporter().export(self.scene)
+        compile(text, "launch.py", "exec")
+
+        keyboard_name = launch_export.node_name(keyboard.model)
+        mux_name = launch_export.node_name(mux.model)
+        self.assertIn("package='teleop_twist_keyboard'", text)
+        self.assertIn(f"name={keyboard_name!r}", text)
+        self.assertIn(f"('cmd_vel', '/{keyboard_name}/cmd_vel')", text)
+        self.assertIn(f"SetRemap(src='cmd_vel1', dst='/{keyboard_name}/cmd_vel')", text)
+        self.assertIn("[FindPackageShare('nav2_bringup'), 'launch', 'navigation_launch.py']", text)
+        self.assertIn(f"('cmd_vel', '/{mux_name}/cmd_vel')", text)
+        # Nav2's unconnected ports keep their names
+        self.assertNotIn("src='scan'", text)
+
+    def test_shared_topics(self):
+        """Test that ports joined through a shared input publish and subscribe on one topic"""
+        keyboard = self.add(KeyboardTeleopNode())
+        nav2 = self.add(Nav2Node())
+        mux = self.add(TwistMuxNode())
+        self.connect(keyboard, "cmd_vel", mux, "cmd_vel1")
+        self.connect(nav2, "cmd_vel", mux, "cmd_vel1")
+        self.connect(nav2, "cmd_vel", mux, "cmd_vel2")
+
+        topics = launch_export.port_topics(self.scene.model)
+        topic = f"/{launch_export.node_name(keyboard.model)}/cmd_vel"
+        self.assertEqual(topics[nav2.output_ports["cmd_vel"].model], topic)
+        self.assertEqual(topics[mux.input_ports["cmd_vel2"].model], topic)
+        self.assertNotIn(mux.output_ports["cmd_vel"].model, topics)
+
+    def test_fragments(self):
+        """Test the launch action of each kind of command"""
+        self.assertIn("# plain_1: no command", render_fragment("plain_1", None, ()))
+        fragment = render_fragment("driver_2", ("/opt/driver", "--fast"), (("scan", "/lidar_1/scan"),))
+        self.assertIn("ExecuteProcess(cmd=['/opt/driver', '--fast', '--ros-args', '-r', 'scan:=/lidar_1/scan']", fragment)
+        fragment = render_fragment("nav_3", ("ros2", "launch", "nav2_bringup", "navigation_launch.py",
+                                             "use_sim_time:=true"), ())
+        self.assertIn("launch_arguments=[('use_sim_time', 'true')]", fragment)
+        compile("[\n" + fragment + "]", "fragment.py", "eval")
+
+        node = self.add(BaseNode(title="3D Lidar!"))
+        self.assertEqual(launch_export.node_name(node.model), f"node_3d_lidar_{node.model.id}")
+        self.assertIn(f"# node_3d_lidar_{node.model.id}: no command", LaunchExporter().export(self.scene))
+
+    def test_incremental_export(self):
+        """Test that only the nodes whose output changed are rendered again"""
+        keyboard, joystick, nav2, mux, controllers = self.build_sample()
+        exporter = LaunchExporter()
+        exporter.export(self.scene)
+        self.assertEqual(exporter.rendered, 5)
+
+        exporter.export(self.scene)
+        self.assertEqual((exporter.rendered, exporter.reused), (0, 5))
+
+        # Moving nodes doesn't change the launch file
+        nav2.setPos(400, 400)
+        exporter.export(self.scene)
+        self.assertEqual(exporter.rendered, 0)
+
+        # A new connection touches its two ends
+        planner = self.add(BaseNode(title="Planner"))
+        planner.add_input_port("path")
+        self.connect(nav2, "path", planner, "path")
+        exporter.export(self.scene)
+        self.assertEqual(exporter.rendered, 2)
+
+        # Renaming a node renames the topics it publishes, so its subscribers change too
+        mux.title = "Mux"
+        text = exporter.export(self.scene)
+        self.assertEqual(exporter.rendered, 2)
+        self.assertEqual(text, LaunchExporter().export(self.scene))
+
+    def test_cached_export(self):
+        """Test that a later process reuses the previous launch file through the cache"""
+        keyboard, joystick, nav2, mux, controllers = self.build_sample()
+        graph_path, output, cache = self.path("graph.rgraph"), self.path("launch.py"), self.path("cache.json")
+        graph_io.save_graph(self.scene, graph_path)
+
+        exporter = export_launch(graph_path, output, cache)
+        self.assertEqual(exporter.rendered, 5)
+        # Unchanged graph: nothing to do
+        self.assertIsNone(export_launch(graph_path, output, cache))
+
+        keyboard.title = "Keys"
+        graph_io.save_graph(self.scene, graph_path)
+        exporter = export_launch(graph_path, output, cache)
+        self.assertEqual((exporter.rendered, exporter.reused), (2, 3))
+        with open(output, encoding='utf-8') as stream:
+            text = stream.read()
+        self.assertEqual(text, LaunchExporter().export(graph_io.load_model(graph_path)))
+
+        # A launch file edited by hand is regenerated in full
+        with open(output, 'a', encoding='utf-8') as stream:
+            stream.write("# edited\n")
+        exporter = export_launch(graph_path, output, cache)
+        self.assertEqual(exporter.rendered, 5)
+        with open(output, encoding='utf-8') as stream:
+            self.assertEqual(stream.read(), text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QEventLoop, QTimer
+import contextlib
+import io
+import sys
+import time
+
+from scene import NodeScene
+from connection import Connection
+from graph_model import GraphModel
+import launcher
+from launcher import GraphLauncher, BulkOperation
+from packages.base.node import BaseNode
+from packages.teleoperation import KeyboardTeleopNode
+from packages.navigation import Nav2Node, SlamToolboxNode
+from packages.robot_control import TwistMuxNode, ROS2ControllersNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class SlowNode(BaseNode):
+    """Node that only reports ready some time after starting"""
+    def __init__(self, delay=0.05):
+        super().__init__(title="Slow")
+        self.delay = delay
+        self.started_at = None
+        self.add_input_port("in")
+        self.add_output_port("out")
+
+    def on_start(self):
+        self.started_at = time.perf_counter()
+
+    def is_ready(self):
+        return self.is_running and time.perf_counter() - self.started_at >= self.delay
+
+class FailingNode(BaseNode):
+    """Node whose startup raises"""
+    def __init__(self):
+        super().__init__(title="Failing")
+        self.add_output_port("out")
+
+    def on_start(self):
+        raise RuntimeError("no such executable")
+
+class TestLauncher(unittest.TestCase):
+    """Test cases for dependency-ordered graph launches"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+
+    def add(self, node):
+        self.scene.addItem(node)
+        return node
+
+    def connect(self, source, source_port, target, target_port):
+        self.scene.addItem(Connection(source.output_ports[source_port], target.input_ports[target_port]))
+
+    def bulk(self, nodes, operation, concurrency=4, timeout=5.0, check=None):
+        """Run a BulkOperation and return its report; check() is called right after it starts"""
+        bulk = BulkOperation(nodes, operation, concurrency=concurrency, timeout=timeout)
+        loop = QEventLoop()
+        reports = []
+        bulk.finished.connect(reports.append)
+        bulk.finished.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        with contextlib.redirect_stdout(io.StringIO()):
+            bulk.start()
+            if check:
+                check()
+            if bulk.isRunning():
+                loop.exec()
+        self.assertEqual(len(reports), 1)
+        return reports[0]
+
+    def launch(self, timeout=5.0):
+        """Run a GraphLauncher on the scene and return its report"""
+        launcher = GraphLauncher(self.scene, timeout=timeout)
+        loop = QEventLoop()
+        reports = []
+        launcher.finished.connect(reports.append)
+        launcher.finished.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        # Node classes announce their startup on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            launcher.start()
+            if launcher.isRunning():
+                loop.exec()
+        self.assertEqual(len(reports), 1)
+        return reports[0]
+
+    def test_topological_layers(self):
+        """Test that nodes are layered after all of their upstream nodes"""
+        model = GraphModel()
+        a = model.create_node("A", "a", outputs=["out"])
+        b = model.create_node("B", "b", inputs=["in"], outputs=["out"])
+        c = model.create_node("C", "c", inputs=["in1", "in2"])
+        d = model.create_node("D", "d")
+        model.connect(a.outputs["out"], b.inputs["in"])
+        model.connect(a.outputs["out"], c.inputs["in1"])
+        model.connect(b.outputs["out"], c.inputs["in2"])
+        layers, cyclic = model.topological_layers()
+        self.assertEqual(layers, [[a, d], [b], [c]])
+        self.assertEqual(cyclic, [])
+
+    def test_cycles_are_reported(self):
+        """Test that nodes on or after a cycle are left out of the layers"""
+        model = GraphModel()
+        a = model.create_node("A", "a", outputs=["out"])
+        b = model.create_node("B", "b", inputs=["in"], outputs=["out"])
+        c = model.create_node("C", "c", inputs=["in1", "in2"], outputs=["out"])
+        d = model.create_node("D", "d", inputs=["in"])
+        model.connect(a.outputs["out"], b.inputs["in"])
+        model.connect(b.outputs["out"], c.inputs["in1"])
+        model.connect(c.outputs["out"], b.inputs["in"])
+        model.connect(c.outputs["out"], d.inputs["in"])
+        layers, cyclic = model.topological_layers()
+        self.assertEqual(layers, [[a]])
+        self.assertEqual(set(cyclic), {b, c, d})
+
+    def test_launch_order(self):
+        """Test that sources start in the first layer and consumers after them"""
+        keyboard = self.add(KeyboardTeleopNode())
+        nav2 = self.add(Nav2Node())
+        slam = self.add(SlamToolboxNode())
+        mux = self.add(TwistMuxNode())
+        controllers = self.add(ROS2ControllersNode())
+        self.connect(keyboard, "cmd_vel", mux, "cmd_vel1")
+        self.connect(nav2, "cmd_vel", mux, "cmd_vel2")
+        self.connect(mux, "cmd_vel", controllers, "cmd_vel")
+
+        report = self.launch()
+        self.assertTrue(report.ok)
+        self.assertEqual(report.layer_count, 3)
+        layers = {result.node: result.layer for result in report.results}
+        self.assertEqual(layers, {keyboard: 0, nav2: 0, slam: 0, mux: 1, controllers: 2})
+        self.assertTrue(all(node.is_running for node in layers))
+        self.assertTrue(all(result.latency >= 0 for result in report.results))
+        self.assertIn("Started 5 of 5 nodes in 3 layers", report.summary())
+
+    def test_waits_for_readiness(self):
+        """Test that a layer only starts once the previous one is ready"""
+        slow = self.add(SlowNode(delay=0.2))
+        other = self.add(SlowNode(delay=0.2))
+        consumer = self.add(SlowNode(delay=0))
+        self.connect(slow, "out", consumer, "in")
+
+        report = self.launch()
+        self.assertTrue(report.ok)
+        latencies = {result.node: result.latency for result in report.results}
+        self.assertGreaterEqual(latencies[slow], 0.2)
+        self.assertGreaterEqual(latencies[other], 0.2)
+        # The first layer's nodes started together, so the launch took one delay, not two
+        self.assertLess(report.duration, 0.35)
+        self.assertGreaterEqual(consumer.started_at - slow.started_at, 0.2)
+
+    def test_failure_skips_downstream(self):
+        """Test that nodes downstream of a failed layer aren't started"""
+        failing = self.add(FailingNode())
+        consumer = self.add(SlowNode(delay=0))
+        slow = self.add(SlowNode(delay=1.0))
+        self.connect(failing, "out", consumer, "in")
+
+        report = self.launch(timeout=0.05)
+        self.assertFalse(report.ok)
+        errors = {result.node: result.error for result in report.failures()}
+        self.assertEqual(errors[failing], "no such executable")
+        self.assertIn("not ready", errors[slow])
+        self.assertEqual(report.skipped, [consumer])
+        self.assertFalse(consumer.is_running)
+        self.assertFalse(failing.is_running)
+        self.assertIn("not started", report.format())
+
+    def test_bulk_concurrency_limit(self):
+        """Test that a bulk start works on at most `concurrency` nodes at a time"""
+        nodes = [self.add(SlowNode(delay=0.1)) for _ in range(6)]
+        report = self.bulk(nodes, launcher.START, concurrency=2,
+                           check=lambda: self.assertEqual(sum(node.is_running for node in nodes), 2))
+        self.assertTrue(report.ok)
+        self.assertEqual(len(report.results), 6)
+        self.assertTrue(all(node.is_running for node in nodes))
+        # Three rounds of two
+        self.assertGreaterEqual(report.duration, 0.3)
+        self.assertIn("Started 6 of 6 nodes", report.summary())
+
+    def test_bulk_restart(self):
+        """Test that restarting stops each node, then starts it again"""
+        nodes = [self.add(SlowNode(delay=0)) for _ in range(3)]
+        for node in nodes:
+            node.start()
+        first_start = [node.started_at for node in nodes]
+        report = self.bulk(nodes, launcher.RESTART)
+        self.assertTrue(report.ok)
+        self.assertTrue(all(node.is_running for node in nodes))
+        self.assertTrue(all(node.started_at > started for node, started in zip(nodes, first_start)))
+
+        report = self.bulk(nodes, launcher.STOP)
+        self.assertTrue(report.ok)
+        self.assertFalse(any(node.is_running for node in nodes))
+
+    def test_bulk_timeouts_and_failures(self):
+        """Test that slow and failing nodes are reported in one summary without holding up the rest"""
+        slow = self.add(SlowNode(delay=5.0))
+        failing = self.add(FailingNode())
+        fine = self.add(SlowNode(delay=0))
+        report = self.bulk([slow, failing, fine], launcher.START, concurrency=1, timeout=0.1)
+        self.assertFalse(report.ok)
+        errors = {result.node: result.error for result in report.results}
+        self.assertIn("timed out", errors[slow])
+        self.assertEqual(errors[failing], "no such executable")
+        self.assertIsNone(errors[fine])
+        self.assertIn("Started 1 of 3 nodes", report.summary())
+        self.assertIn("Failing: no such executable", report.summary())
+
+    def test_selection_and_categories(self):
+        """Test picking the nodes a bulk operation applies to"""
+        keyboard = self.add(KeyboardTeleopNode())
+        nav2 = self.add(Nav2Node())
+        slam = self.add(SlamToolboxNode())
+        mux = self.add(TwistMuxNode())
+        self.connect(nav2, "cmd_vel", mux, "cmd_vel1")
+        self.connect(keyboard, "cmd_vel", mux, "cmd_vel2")
+
+        mux.setSelected(True)
+        nav2.setSelected(True)
+        self.assertEqual(self.scene.selectedNodes(), [nav2, mux])
+        self.assertEqual(self.scene.nodesInCategory("Packages/Navigation & Mapping"), [nav2, slam])
+        self.assertEqual(len(self.scene.nodesInCategory("Packages")), 4)
+        self.assertEqual(self.scene.nodesInCategory("Packages/Nav"), [])
+        self.assertEqual(self.scene.inDependencyOrder([mux, keyboard, nav2]), [keyboard, nav2, mux])
+
+if __name__ == '__main__':
+    unittest.main()
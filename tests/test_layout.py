@@ -0,0 +1,150 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+import asyncio
+import sys
+
+import numpy as np
+
+import lifecycle
+from layout import layered_layout
+from scene import NodeScene
+from view import NodeView
+from connection import Connection
+from packages.teleoperation import KeyboardTeleopNode
+from packages.robot_control import TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+def overlaps(x, y, widths, heights):
+    """Check whether any two boxes overlap"""
+    for i in range(len(x)):
+        for j in range(i + 1, len(x)):
+            if (x[i] < x[j] + widths[j] and x[j] < x[i] + widths[i] and
+                    y[i] < y[j] + heights[j] and y[j] < y[i] + heights[i]):
+                return True
+    return False
+
+class TestLayeredLayout(unittest.TestCase):
+    """Test cases for the layout passes"""
+
+    def test_columns_follow_edges(self):
+        """Test that every node is right of the nodes feeding it"""
+        sources = [0, 1, 2, 0, 4]
+        targets = [1, 2, 3, 3, 3]
+        x, y = layered_layout(5, sources, targets, [100] * 5, [50] * 5)
+        for source, target in zip(sources, targets):
+            self.assertLess(x[source], x[target])
+        self.assertEqual((x.min(), y.min()), (0.0, 0.0))
+        # Node 4 only feeds node 3, so it sits in the column just before it
+        self.assertEqual(x[4], x[2])
+
+    def test_cycles(self):
+        """Test that cycles and self loops still give a layout without overlaps"""
+        sources = [0, 1, 2, 2, 3]
+        targets = [1, 2, 0, 3, 3]
+        widths, heights = [80, 120, 100, 90], [40, 60, 50, 70]
+        x, y = layered_layout(4, sources, targets, widths, heights)
+        self.assertTrue(np.all(np.isfinite(x)) and np.all(np.isfinite(y)))
+        self.assertFalse(overlaps(x, y, widths, heights))
+        self.assertLess(x[0], x[1])
+        self.assertLess(x[1], x[2])
+
+    def test_crossings_removed(self):
+        """Test that nodes are reordered to uncross the edges between two columns"""
+        x, y = layered_layout(4, [0, 1], [3, 2], [100] * 4, [50] * 4)
+        self.assertEqual(y[0] < y[1], y[3] < y[2])
+
+    def test_large_graph(self):
+        """Test that a random graph is laid out without overlaps, keeping each column apart"""
+        rng = np.random.default_rng(1)
+        num_nodes = 300
+        sources = rng.integers(0, num_nodes, 600)
+        targets = rng.integers(0, num_nodes, 600)
+        widths = rng.uniform(100, 200, num_nodes)
+        heights = rng.uniform(60, 150, num_nodes)
+        x, y = layered_layout(num_nodes, sources, targets, widths, heights)
+        self.assertFalse(overlaps(x, y, widths, heights))
+        lefts = np.unique(x - (widths.max() - widths) / 2.0)
+        self.assertGreater(lefts.size, 1)
+
+    def test_empty(self):
+        """Test that an empty graph gives empty positions"""
+        x, y = layered_layout(0, [], [], [], [])
+        self.assertEqual((x.size, y.size), (0, 0))
+
+class TestSceneLayout(unittest.TestCase):
+    """Test cases for laying out the nodes of a scene"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+        self.keyboard = KeyboardTeleopNode()
+        self.mux = TwistMuxNode()
+        self.keyboard.setPos(500, 300)
+        self.mux.setPos(100, 100)
+        self.scene.addItem(self.keyboard)
+        self.scene.addItem(self.mux)
+        self.connection = Connection(self.keyboard.output_ports["cmd_vel"],
+                                     self.mux.input_ports["cmd_vel1"])
+        self.scene.addItem(self.connection)
+        self.scene.undo_stack.clear()
+
+    def run_until(self, predicate):
+        """Run the Qt-driven asyncio loop until predicate() is true"""
+        async def poll():
+            while not predicate():
+                await asyncio.sleep(0.001)
+        lifecycle.run_until_complete(poll())
+
+    def wait(self, task):
+        """Run the event loop until the layout is applied"""
+        self.run_until(lambda: task.done() and self.scene._layout_command is None)
+        task.result()
+
+    def test_layout_is_one_undo_step(self):
+        """Test that the layout keeps the top left corner and is undone in one step"""
+        self.wait(self.scene.layoutNodes(animate=False))
+        self.assertLess(self.keyboard.x(), self.mux.x())
+        self.assertEqual(min(self.keyboard.x(), self.mux.x()), 100)
+        self.assertEqual(min(self.keyboard.y(), self.mux.y()), 100)
+        self.assertEqual(self.scene.undo_stack.count(), 1)
+
+        self.scene.undo_stack.undo()
+        self.assertEqual((self.keyboard.x(), self.keyboard.y()), (500, 300))
+        self.assertEqual((self.mux.x(), self.mux.y()), (100, 100))
+
+    def test_animated_layout(self):
+        """Test that the animation ends on the final layout and connections follow the nodes"""
+        view = NodeView(self.scene)
+        self.addCleanup(view.close)
+        self.wait(self.scene.layoutNodes())
+        command = self.scene.undo_stack.command(0)
+        positions = [[node.x(), node.y()] for node in command.nodes]
+        self.assertEqual(positions, command.new_positions.tolist())
+        self.scene.flushConnectionUpdates()
+        self.assertEqual(self.connection.path().pointAtPercent(0),
+                         self.keyboard.output_ports["cmd_vel"].get_scene_pos())
+
+    def test_new_layout_finishes_animation(self):
+        """Test that starting a layout during an animation finishes the running one first"""
+        view = NodeView(self.scene)
+        self.addCleanup(view.close)
+        first = self.scene.layoutNodes()
+        self.run_until(lambda: self.scene._layout_command is not None)
+        self.wait(self.scene.layoutNodes([self.mux]))
+        self.assertTrue(first.done())
+        self.assertEqual(self.scene.undo_stack.count(), 2)
+
+    def test_deleted_nodes_skipped(self):
+        """Test that nodes removed while the layout is computed are left out"""
+        task = self.scene.layoutNodes(animate=False)
+        self.scene.removeItem(self.mux)
+        self.wait(task)
+        self.assertEqual(self.scene.undo_stack.command(0).nodes, (self.keyboard,))
+        self.assertEqual((self.keyboard.x(), self.keyboard.y()), (500, 300))
+
+if __name__ == '__main__':
+    unittest.main()
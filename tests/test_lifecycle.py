@@ -0,0 +1,167 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtWidgets import QStyleOptionGraphicsItem
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import lifecycle
+from lifecycle import STOPPED, STARTING, RUNNING, STOPPING
+from scene import NodeScene
+from launcher import GraphLauncher
+from packages.base.node import BaseNode
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+def wait_until(predicate, timeout=5.0):
+    """Run the Qt-driven asyncio loop until predicate() is true or the timeout passes"""
+    async def poll():
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(0.005)
+        return True
+    return lifecycle.run_until_complete(poll())
+
+class AsyncNode(BaseNode):
+    """Node whose startup and shutdown take a while"""
+    def __init__(self, delay=0.05, fail=False):
+        super().__init__(title="Async")
+        self.delay = delay
+        self.fail = fail
+        self.events = []
+        self.add_output_port("out")
+
+    async def async_on_start(self):
+        self.events.append('starting')
+        # Several concurrent waits, as a real bring-up might do
+        await asyncio.gather(asyncio.sleep(self.delay), asyncio.sleep(self.delay / 2))
+        if self.fail:
+            raise RuntimeError("driver not found")
+        self.events.append('started')
+
+    async def async_on_stop(self):
+        await asyncio.sleep(self.delay)
+        self.events.append('stopped')
+
+class TestLifecycle(unittest.TestCase):
+    """Test cases for asynchronous node start and stop"""
+
+    def test_plain_nodes_start_synchronously(self):
+        """Test that nodes without async hooks are running as soon as they are toggled"""
+        node = BaseNode()
+        node.toggle_run_state()
+        self.assertEqual(node.run_state, RUNNING)
+        node.toggle_run_state()
+        self.assertEqual(node.run_state, STOPPED)
+
+    def test_starting_and_stopping_states(self):
+        """Test that a node shows as starting/stopping while its hooks run"""
+        node = AsyncNode()
+        node.toggle_run_state()
+        self.assertTrue(node.is_running)
+        self.assertEqual(node.run_state, STARTING)
+        self.assertFalse(node.is_ready())
+        self.assertTrue(wait_until(lambda: node.run_state == RUNNING))
+        self.assertTrue(node.is_ready())
+        self.assertEqual(node.events, ['starting', 'started'])
+
+        node.toggle_run_state()
+        self.assertFalse(node.is_running)
+        self.assertEqual(node.run_state, STOPPING)
+        self.assertTrue(wait_until(lambda: node.run_state == STOPPED))
+        self.assertEqual(node.events[-1], 'stopped')
+
+    def test_failed_start(self):
+        """Test that a node whose async startup raises ends up stopped"""
+        node = AsyncNode(fail=True)
+        node.start()
+        self.assertTrue(wait_until(lambda: node.run_state == STOPPED))
+        self.assertFalse(node.is_running)
+        self.assertEqual(node.run_error(), "driver not found")
+
+    def test_stop_while_starting(self):
+        """Test that stopping a starting node abandons its startup"""
+        node = AsyncNode(delay=0.5)
+        node.start()
+        self.assertTrue(wait_until(lambda: node.events == ['starting']))
+        startup = node._lifecycle_task
+        node.stop()
+        self.assertEqual(node.run_state, STOPPING)
+        self.assertTrue(wait_until(lambda: node.run_state == STOPPED))
+        # The startup was cancelled inside asyncio.gather() and finished
+        self.assertTrue(wait_until(startup.done))
+        self.assertTrue(startup.cancelled())
+        lifecycle.run_until_complete(asyncio.sleep(0.02))
+        self.assertNotIn('started', node.events)
+
+    def test_many_nodes_start_concurrently(self):
+        """Test that the startups of many nodes overlap"""
+        nodes = [AsyncNode(delay=0.2) for _ in range(50)]
+        started = time.monotonic()
+        for node in nodes:
+            node.start()
+        self.assertTrue(wait_until(lambda: all(node.is_ready() for node in nodes)))
+        self.assertLess(time.monotonic() - started, 0.2 * 5)
+
+    def test_button_shows_pending_states(self):
+        """Test that the run/stop button can be painted in every state"""
+        node = AsyncNode()
+        image = QImage(200, 150, QImage.Format_ARGB32)
+        for toggle in (False, True, True):
+            if toggle:
+                node.toggle_run_state()
+            painter = QPainter(image)
+            node.paint(painter, QStyleOptionGraphicsItem(), None)
+            painter.end()
+        self.assertEqual(node.run_state, STOPPING)
+        self.assertTrue(wait_until(lambda: node.run_state == STOPPED))
+
+    def test_launcher_waits_for_async_start(self):
+        """Test that a graph launch waits for async startups to finish"""
+        scene = NodeScene()
+        node = AsyncNode(delay=0.1)
+        scene.addItem(node)
+        launcher = GraphLauncher(scene)
+        reports = []
+        launcher.finished.connect(reports.append)
+        launcher.start()
+        self.assertTrue(wait_until(lambda: reports))
+        (result,) = reports[0].results
+        self.assertGreaterEqual(result.latency, 0.1)
+
+        failing = AsyncNode(fail=True)
+        scene.addItem(failing)
+        node.stop()
+        self.assertTrue(wait_until(lambda: node.run_state == STOPPED))
+        launcher.start()
+        self.assertTrue(wait_until(lambda: len(reports) == 2))
+        self.assertEqual([result.error for result in reports[1].failures()], ["driver not found"])
+
+    def test_event_loop_needs_application(self):
+        """Test that the event loop isn't created before the application, which would then fail"""
+        script = (
+            "import lifecycle\n"
+            "from PySide6.QtCore import QCoreApplication\n"
+            "try:\n"
+            "    lifecycle.event_loop()\n"
+            "except RuntimeError:\n"
+            "    pass\n"
+            "else:\n"
+            "    raise AssertionError('no error')\n"
+            "assert QCoreApplication.instance() is None\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script], cwd=REPO_DIR, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
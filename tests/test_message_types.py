@@ -0,0 +1,123 @@
+import unittest
+from PySide6.QtWidgets import QApplication, QGraphicsSceneMouseEvent, QStyleOptionGraphicsItem
+from PySide6.QtCore import QEvent
+from PySide6.QtGui import QImage, QPainter
+import sys
+
+import message_types
+from scene import NodeScene
+from connection import Connection
+from packages.base.node import BaseNode
+from packages.teleoperation import KeyboardTeleopNode
+from packages.navigation import Nav2Node, SlamToolboxNode
+from packages.robot_control import TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class TestMessageTypes(unittest.TestCase):
+    """Test cases for typed ports and the compatibility matrix"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+
+    def add(self, node, x=0, y=0):
+        node.setPos(x, y)
+        self.scene.addItem(node)
+        return node
+
+    def release_at(self, port):
+        """Drop the connection being dragged on a port"""
+        event = QGraphicsSceneMouseEvent(QEvent.GraphicsSceneMouseRelease)
+        event.setScenePos(port.get_scene_pos())
+        self.scene.mouseReleaseEvent(event)
+
+    def test_compatibility(self):
+        """Test the default compatibility rules"""
+        twist = message_types.type_id(message_types.TWIST)
+        scan = message_types.type_id(message_types.LASER_SCAN)
+        any_type = message_types.type_id(message_types.ANY)
+        self.assertEqual(message_types.type_id(message_types.TWIST), twist)
+        self.assertEqual(message_types.type_name(twist), message_types.TWIST)
+        self.assertTrue(message_types.compatible(twist, twist))
+        self.assertFalse(message_types.compatible(twist, scan))
+        self.assertTrue(message_types.compatible(twist, any_type))
+        self.assertTrue(message_types.compatible(any_type, scan))
+
+    def test_new_and_allowed_types(self):
+        """Test that types registered later and declared compatibilities get matrix entries"""
+        stamped = message_types.type_id('test_msgs/TwistStamped')
+        unstamped = message_types.type_id('test_msgs/Twist')
+        self.assertTrue(message_types.compatible(stamped, stamped))
+        self.assertFalse(message_types.compatible(stamped, unstamped))
+        message_types.allow('test_msgs/TwistStamped', 'test_msgs/Twist')
+        self.assertTrue(message_types.compatible(stamped, unstamped))
+        self.assertFalse(message_types.compatible(unstamped, stamped))
+        # Types registered after the declaration keep it
+        message_types.type_id('test_msgs/Other')
+        self.assertTrue(message_types.compatible(stamped, unstamped))
+
+    def test_node_port_types(self):
+        """Test that node ports carry their message types through clones and models"""
+        nav2 = Nav2Node()
+        self.assertEqual(nav2.input_ports["scan"].msg_type, message_types.LASER_SCAN)
+        self.assertEqual(nav2.output_ports["cmd_vel"].msg_type, message_types.TWIST)
+        clone = nav2.clone()
+        self.assertEqual(clone.input_ports["scan"].msg_type, message_types.LASER_SCAN)
+        self.assertEqual(nav2.model.copy().inputs["odom"].msg_type, message_types.ODOMETRY)
+        self.assertEqual(BaseNode().add_input_port("in").msg_type, message_types.ANY)
+
+    def test_candidates(self):
+        """Test that a drag from an output only offers compatible inputs on other nodes"""
+        keyboard = self.add(KeyboardTeleopNode())
+        nav2 = self.add(Nav2Node(), 300)
+        mux = self.add(TwistMuxNode(), 600)
+        generic = self.add(BaseNode(title="Generic"), 900)
+        generic.add_input_port("in")
+
+        self.scene.startConnection(nav2.output_ports["cmd_vel"])
+        expected = {mux.input_ports["cmd_vel1"], mux.input_ports["cmd_vel2"],
+                    mux.input_ports["cmd_vel3"], generic.input_ports["in"]}
+        self.assertEqual(self.scene.connection_candidates, expected)
+        self.assertEqual(set(mux.candidate_ports), set(mux.input_ports.values()))
+        self.assertFalse(nav2.candidate_ports)
+        self.assertFalse(keyboard.candidate_ports)
+
+        # Highlighted ports can be painted
+        image = QImage(300, 200, QImage.Format_ARGB32)
+        painter = QPainter(image)
+        mux.paint(painter, QStyleOptionGraphicsItem(), None)
+        painter.end()
+
+        self.release_at(mux.input_ports["cmd_vel2"])
+        self.assertEqual(len(self.scene.connections), 1)
+        self.assertFalse(self.scene.connection_candidates)
+        self.assertFalse(mux.candidate_ports)
+
+    def test_incompatible_drop_is_rejected(self):
+        """Test that dropping a connection on an input of another type doesn't connect them"""
+        keyboard = self.add(KeyboardTeleopNode())
+        slam = self.add(SlamToolboxNode(), 300)
+        self.assertFalse(self.scene.canConnect(keyboard.output_ports["cmd_vel"], slam.input_ports["scan"]))
+
+        self.scene.startConnection(keyboard.output_ports["cmd_vel"])
+        self.assertEqual(self.scene.connection_candidates, set())
+        self.release_at(slam.input_ports["scan"])
+        self.assertEqual(len(self.scene.connections), 0)
+        self.assertEqual(self.scene.model.edges, {})
+        self.assertFalse([item for item in self.scene.items() if isinstance(item, Connection)])
+
+    def test_can_connect(self):
+        """Test the rules checked for a pair of ports"""
+        nav2 = self.add(Nav2Node())
+        mux = self.add(TwistMuxNode(), 300)
+        self.assertTrue(self.scene.canConnect(nav2.output_ports["cmd_vel"], mux.input_ports["cmd_vel1"]))
+        self.assertFalse(self.scene.canConnect(nav2.output_ports["path"], mux.input_ports["cmd_vel1"]))
+        self.assertFalse(self.scene.canConnect(mux.input_ports["cmd_vel1"], nav2.output_ports["cmd_vel"]))
+        self.assertFalse(self.scene.canConnect(mux.output_ports["cmd_vel"], mux.input_ports["cmd_vel1"]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from node_registry import NodeRegistry, NodeType, default_registry
+from packages.base.node import BaseNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestNodeRegistry(unittest.TestCase):
+    """Test cases for node type discovery and lazy loading"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.registry = default_registry()
+
+    def test_builtin_types_discovered(self):
+        """Test that every packaged node type is found from the manifests"""
+        self.assertEqual(
+            {node_type.type_name for node_type in self.registry},
+            {'BaseNode', 'KeyboardTeleopNode', 'JoystickTeleopNode', 'Nav2Node',
+             'SlamToolboxNode', 'ROS2ControllersNode', 'TwistMuxNode'},
+        )
+        categories = self.registry.categories()
+        self.assertEqual(
+            [node_type.name for node_type in categories["Packages/Teleoperation"]],
+            ["Keyboard Teleop", "Joystick Teleop"],
+        )
+
+        # BaseNode can be loaded from files but isn't offered in the menu
+        self.assertIn('BaseNode', self.registry)
+        self.assertNotIn(None, categories)
+
+    def test_manifests_match_classes(self):
+        """Test that manifest metadata matches the node each class creates"""
+        for node_type in self.registry:
+            if node_type.category is None:
+                continue
+            node = node_type.create()
+            self.assertIsInstance(node, BaseNode)
+            self.assertEqual(node.title, node_type.name)
+            self.assertEqual(tuple(node.input_ports), node_type.inputs)
+            self.assertEqual(tuple(node.output_ports), node_type.outputs)
+
+    def test_discovery_does_not_import_nodes(self):
+        """Test that discovering and listing node types imports no node modules"""
+        script = (
+            "import sys\n"
+            "from node_registry import NodeRegistry\n"
+            "registry = NodeRegistry()\n"
+            "registry.discover()\n"
+            "assert len(registry) == 6, len(registry)\n"
+            "assert registry.categories()\n"
+            "loaded = [m for m in sys.modules if m.startswith('packages.') and m.endswith('_node')]\n"
+            "assert not loaded, loaded\n"
+            "assert not any(t.is_loaded for t in registry)\n"
+            "registry.create('Nav2Node')\n"
+            "assert 'packages.navigation.nav2_node' in sys.modules\n"
+            "assert 'packages.navigation.slam_toolbox_node' not in sys.modules\n"
+        )
+        env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+        result = subprocess.run([sys.executable, '-c', script], cwd=REPO_DIR, env=env,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_load_manifest(self):
+        """Test registering node types from a manifest file"""
+        registry = NodeRegistry()
+        added = []
+        registry.add_listener(added.append)
+
+        with tempfile.TemporaryDirectory() as packages_dir:
+            os.mkdir(os.path.join(packages_dir, 'extra'))
+            with open(os.path.join(packages_dir, 'extra', 'manifest.json'), 'w') as stream:
+                json.dump({'category': 'Extra', 'nodes': [
+                    {'type': 'BaseNode', 'name': 'Plain', 'module': 'packages.base.node',
+                     'outputs': ['out']},
+                ]}, stream)
+            registry.discover(packages_dir)
+
+        node_type = registry.get('BaseNode')
+        self.assertEqual(added, [node_type])
+        self.assertEqual(node_type.category, 'Extra')
+        self.assertEqual(node_type.outputs, ('out',))
+        self.assertIs(node_type.load_class(), BaseNode)
+
+        with self.assertRaises(KeyError):
+            registry.create('Missing')
+
+    def test_register_class(self):
+        """Test registering an already imported class"""
+        registry = NodeRegistry()
+        node_type = registry.register_class(BaseNode, name="Plain", category="Functions")
+        self.assertIsInstance(node_type, NodeType)
+        self.assertTrue(node_type.is_loaded)
+        self.assertEqual(registry.categories(), {"Functions": [node_type]})
+
+if __name__ == '__main__':
+    unittest.main()
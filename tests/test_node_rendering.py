@@ -0,0 +1,144 @@
+import unittest
+from PySide6.QtWidgets import QApplication, QGraphicsScene
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QImage, QPainter, QColor
+import sys
+
+from packages.base import node as node_module
+from packages.base.node import BaseNode, LOD_LOW_THRESHOLD, LOD_MEDIUM_THRESHOLD
+from packages.navigation import Nav2Node, SlamToolboxNode
+from packages.teleoperation import KeyboardTeleopNode
+from connection import Connection
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class TestNodeRendering(unittest.TestCase):
+    """Test cases for node painting and the shared chrome cache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        BaseNode.clear_chrome_cache()
+        self.scene = QGraphicsScene()
+
+    def render(self, scale=1.0):
+        """Render the whole scene into an image at the given zoom level"""
+        rect = self.scene.itemsBoundingRect()
+        image = QImage(int(rect.width() * scale) + 1, int(rect.height() * scale) + 1,
+                       QImage.Format_ARGB32_Premultiplied)
+        image.fill(QColor(0, 0, 0))
+        painter = QPainter(image)
+        self.scene.render(painter, QRectF(image.rect()), rect)
+        painter.end()
+        return image
+
+    def test_chrome_shared_between_identical_nodes(self):
+        """Test that nodes that look the same share one cached pixmap"""
+        for i in range(3):
+            node = Nav2Node()
+            node.setPos(i * 250, 0)
+            self.scene.addItem(node)
+
+        self.render()
+        self.assertEqual(len(node_module._chrome_cache), 1)
+
+    def test_chrome_keyed_by_class_and_selection(self):
+        """Test that different classes and selection states get their own entries"""
+        nav = Nav2Node()
+        slam = SlamToolboxNode()
+        slam.setPos(250, 0)
+        self.scene.addItem(nav)
+        self.scene.addItem(slam)
+
+        self.render()
+        self.assertEqual(len(node_module._chrome_cache), 2)
+
+        nav.setSelected(True)
+        self.render()
+        self.assertEqual(len(node_module._chrome_cache), 3)
+
+    def test_hover_and_run_state_reuse_chrome(self):
+        """Test that hover and run state changes don't invalidate the cached chrome"""
+        node = Nav2Node()
+        self.scene.addItem(node)
+        self.render()
+        cached = dict(node_module._chrome_cache)
+
+        node.port_under_mouse = node.input_ports["scan"]
+        node.toggle_run_state()
+        self.render()
+
+        self.assertEqual(node_module._chrome_cache, cached)
+
+    def test_chrome_keyed_by_zoom_bucket(self):
+        """Test that rendering at a different zoom bucket builds a new pixmap"""
+        self.scene.addItem(Nav2Node())
+
+        self.render(scale=1.0)
+        self.render(scale=1.1)  # Rounds to the same power-of-two bucket
+        self.assertEqual(len(node_module._chrome_cache), 1)
+
+        self.render(scale=0.5)
+        self.assertEqual(len(node_module._chrome_cache), 2)
+
+    def test_cached_rendering_matches_direct_rendering(self):
+        """Test that the cached chrome draws something node-colored where the node is"""
+        node = Nav2Node()
+        self.scene.addItem(node)
+        image = self.render()
+
+        # Sample the middle of the node body (bounding rect starts 10px before the node)
+        center = image.pixelColor(10 + int(node.width / 2), 10 + int(node.height / 2))
+        self.assertEqual(center.name(), node.body_color.name())
+
+    def test_low_detail_draws_flat_rectangles(self):
+        """Test that nodes are drawn as flat rectangles when zoomed far out"""
+        node = Nav2Node()
+        self.scene.addItem(node)
+        image = self.render(scale=LOD_LOW_THRESHOLD / 2)
+
+        # No chrome is rendered, the header is filled with the body color
+        self.assertEqual(len(node_module._chrome_cache), 0)
+        scale = LOD_LOW_THRESHOLD / 2
+        header = image.pixelColor(int((10 + node.width / 2) * scale), int((10 + 5) * scale))
+        self.assertEqual(header.name(), node.body_color.name())
+
+    def test_medium_detail_skips_port_labels(self):
+        """Test that port labels are left out of the chrome at medium zoom"""
+        self.scene.addItem(Nav2Node())
+        self.render(scale=(LOD_LOW_THRESHOLD + LOD_MEDIUM_THRESHOLD) / 2)
+
+        keys = list(node_module._chrome_cache)
+        self.assertEqual(len(keys), 1)
+        self.assertFalse(keys[0][3])  # The labels flag
+
+        self.render(scale=1.0)
+        self.assertTrue(any(key[3] for key in node_module._chrome_cache))
+
+    def test_low_detail_draws_straight_connections(self):
+        """Test that connections are drawn as straight lines when zoomed far out"""
+        source = KeyboardTeleopNode()
+        target = Nav2Node()
+        target.setPos(2000, 2000)
+        self.scene.addItem(source)
+        self.scene.addItem(target)
+        connection = Connection(source.output_ports["cmd_vel"], target.input_ports["scan"])
+        self.scene.addItem(connection)
+
+        scale = LOD_LOW_THRESHOLD / 2
+        image = self.render(scale=scale)
+
+        # A point a quarter of the way along the straight line is painted,
+        # while the curve would still be hugging the start port's row there
+        start = source.output_ports["cmd_vel"].get_scene_pos()
+        end = target.input_ports["scan"].get_scene_pos()
+        quarter = start + (end - start) * 0.25
+        origin = self.scene.itemsBoundingRect().topLeft()
+        pixel = image.pixelColor(int((quarter.x() - origin.x()) * scale),
+                                 int((quarter.y() - origin.y()) * scale))
+        self.assertNotEqual(pixel.name(), "#000000")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+import sys
+
+from scene import NodeScene
+from view import NodeView
+from connection import Connection
+import instrumentation
+from packages.base.node import BaseNode
+from packages.teleoperation import KeyboardTeleopNode
+from packages.robot_control import TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class TestPerformanceHud(unittest.TestCase):
+    """Test cases for the performance overlay of NodeView"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+        self.keyboard = KeyboardTeleopNode()
+        self.mux = TwistMuxNode()
+        self.mux.setPos(300, 0)
+        self.scene.addItem(self.keyboard)
+        self.scene.addItem(self.mux)
+        self.scene.addItem(Connection(self.keyboard.output_ports["cmd_vel"],
+                                      self.mux.input_ports["cmd_vel1"]))
+        self.scene.flushConnectionUpdates()
+        self.views = []
+
+    def tearDown(self):
+        for view in self.views:
+            view.setHudVisible(False)
+            view.close()
+
+    def show_view(self):
+        view = NodeView(self.scene)
+        view.resize(800, 600)
+        view.show()
+        view.centerOn(self.mux)
+        self.views.append(view)
+        app.processEvents()
+        return view
+
+    def test_paint_timed_only_while_shown(self):
+        """Test that paint methods are wrapped while any HUD is shown and put back afterwards"""
+        paint = BaseNode.__dict__['paint']
+        first = self.show_view()
+        second = self.show_view()
+        first.setHudVisible(True)
+        second.setHudVisible(True)
+        self.assertIsNot(BaseNode.__dict__['paint'], paint)
+
+        first.setHudVisible(False)
+        self.assertIsNot(BaseNode.__dict__['paint'], paint)
+        second.setHudVisible(False)
+        self.assertIs(BaseNode.__dict__['paint'], paint)
+        self.assertFalse(instrumentation.is_enabled())
+
+    def test_frame_statistics(self):
+        """Test that a frame records its time and the items painted by type"""
+        view = self.show_view()
+        view.setHudVisible(True)
+        view.viewport().repaint()
+        hud = view.hud
+        self.assertEqual(len(hud.frame_times), 1)
+        self.assertEqual(hud.paint_times[BaseNode][1], 2)
+        self.assertEqual(hud.paint_times[Connection][1], 1)
+
+        hud.refresh()
+        self.assertEqual(hud.visible_counts, {BaseNode: 2, Connection: 1})
+        self.assertEqual(hud.total_counts, {BaseNode: 2, Connection: 1})
+        self.assertEqual(len(hud.lines()), 4)
+
+    def test_overview_statistics(self):
+        """Test that the batched overview painting is counted per item type"""
+        view = self.show_view()
+        view.setHudVisible(True)
+        view.scale(view.minScale, view.minScale)
+        app.processEvents()
+        view.viewport().repaint()
+        self.assertEqual(view.hud.paint_times[BaseNode][1], 2)
+        self.assertEqual(view.hud.paint_times[Connection][1], 1)
+
+    def test_scene_signal_rates(self):
+        """Test that scene signals are counted between refreshes"""
+        view = self.show_view()
+        view.setHudVisible(True)
+        self.mux.moveBy(10, 0)
+        app.processEvents()
+        view.hud.refresh()
+        self.assertGreater(view.hud.signal_rates["changed"], 0)
+        self.assertIn("contentBoundsChanged", view.hud.signal_rates)
+
+if __name__ == '__main__':
+    unittest.main()
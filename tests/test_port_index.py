@@ -0,0 +1,97 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QPointF
+import sys
+
+from scene import NodeScene
+from port_index import PortIndex
+from packages.base.node import BaseNode, PORT_HIT_RADIUS
+from packages.navigation import Nav2Node
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class TestPortIndex(unittest.TestCase):
+    """Test cases for the PortIndex class and its scene integration"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+        self.node = Nav2Node()
+        self.node.setPos(100, 100)
+        self.scene.addItem(self.node)
+
+    def test_ports_indexed_on_add(self):
+        """Test that all ports are indexed when a node is added to the scene"""
+        num_ports = len(self.node.input_ports) + len(self.node.output_ports)
+        self.assertEqual(len(self.scene.port_index), num_ports)
+        for port in self.node.input_ports.values():
+            self.assertIn(port, self.scene.port_index)
+
+    def test_hit_radius(self):
+        """Test that ports are found within the hit radius and not beyond it"""
+        port = self.node.output_ports["cmd_vel"]
+        center = port.get_scene_pos()
+
+        inside = center + QPointF(PORT_HIT_RADIUS * 0.7, PORT_HIT_RADIUS * 0.7)
+        self.assertEqual(self.scene.findPortAt(inside), port)
+
+        outside = center + QPointF(PORT_HIT_RADIUS + 1, 0)
+        self.assertIsNone(self.scene.findPortAt(outside))
+
+    def test_index_follows_node_moves(self):
+        """Test that the index is updated when a node moves"""
+        port = self.node.input_ports["scan"]
+        old_pos = port.get_scene_pos()
+
+        self.node.setPos(1000, -500)
+
+        self.assertIsNone(self.scene.findPortAt(old_pos))
+        self.assertEqual(self.scene.findPortAt(port.get_scene_pos()), port)
+
+    def test_index_follows_new_ports(self):
+        """Test that ports added after the node joined the scene are indexed"""
+        node = BaseNode(title="Late Ports")
+        node.setPos(400, 400)
+        self.scene.addItem(node)
+
+        port = node.add_input_port("late")
+        self.assertEqual(self.scene.findPortAt(port.get_scene_pos()), port)
+
+    def test_removed_nodes_are_unindexed(self):
+        """Test that removing a node from the scene drops its ports"""
+        port_pos = self.node.input_ports["scan"].get_scene_pos()
+        self.scene.removeItem(self.node)
+
+        self.assertEqual(len(self.scene.port_index), 0)
+        self.assertIsNone(self.scene.findPortAt(port_pos))
+
+    def test_closest_port_wins(self):
+        """Test that the closest port is returned when several are in range"""
+        index = PortIndex(hit_radius=10)
+        a = object()
+        b = object()
+        index.insert(a, QPointF(0, 0))
+        index.insert(b, QPointF(8, 0))
+
+        self.assertIs(index.port_at(QPointF(1, 0)), a)
+        self.assertIs(index.port_at(QPointF(7, 0)), b)
+
+        index.remove(a)
+        self.assertIs(index.port_at(QPointF(1, 0)), b)
+
+    def test_covered_ports_out_of_reach(self):
+        """Test that a port under another node can't be hit until its node is on top"""
+        port = self.node.output_ports["cmd_vel"]
+        cover = Nav2Node()
+        cover.setPos(150, 100)
+        self.scene.addItem(cover)
+        self.assertIsNone(self.scene.findPortAt(port.get_scene_pos()))
+
+        self.node.setZValue(cover.zValue() + 1)
+        self.assertIs(self.scene.findPortAt(port.get_scene_pos()), port)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,8 @@ from packages.base.node import BaseNode, Port
 from packages.teleoperation import KeyboardTeleopNode
 from packages.navigation import Nav2Node
 from connection import Connection
+from node_menu import NodeSearchMenu
+from node_registry import NodeRegistry, default_registry
 
 # Create QApplication instance for the tests
 app = QApplication.instance()
@@ -116,6 +118,61 @@ class TestNodeScene(unittest.TestCase):
         self.assertIn(connection, output_port.connections)
         self.assertIn(connection, input_port.connections)
         
+    def test_connection_updates_are_batched(self):
+        """Test that moving both endpoints rebuilds a connection's path once per frame"""
+        source_node = KeyboardTeleopNode()
+        target_node = Nav2Node()
+        target_node.setPos(300, 100)
+        self.scene.addItem(source_node)
+        self.scene.addItem(target_node)
+        
+        connection = Connection(source_node.output_ports["cmd_vel"], target_node.input_ports["scan"])
+        self.scene.addItem(connection)
+        initial_path = connection.path()
+        
+        # Count path rebuilds
+        rebuilds = []
+        original_update_path = connection.updatePath
+        def counting_update_path():
+            rebuilds.append(1)
+            original_update_path()
+        connection.updatePath = counting_update_path
+        
+        # Move both ends several times within one frame
+        for step in range(5):
+            source_node.setPos(step * 10, 0)
+            target_node.setPos(300 + step * 10, 200)
+        
+        # Nothing has been rebuilt yet
+        self.assertEqual(len(rebuilds), 0)
+        self.assertEqual(connection.path(), initial_path)
+        
+        # Flushing rebuilds the path exactly once
+        self.scene.flushConnectionUpdates()
+        self.assertEqual(len(rebuilds), 1)
+        self.assertNotEqual(connection.path(), initial_path)
+        
+        # A second flush with nothing dirty does no work
+        self.scene.flushConnectionUpdates()
+        self.assertEqual(len(rebuilds), 1)
+        
+    def test_connection_updates_flush_on_next_frame(self):
+        """Test that stale connection paths are rebuilt by the event loop"""
+        source_node = KeyboardTeleopNode()
+        target_node = Nav2Node()
+        target_node.setPos(300, 100)
+        self.scene.addItem(source_node)
+        self.scene.addItem(target_node)
+        
+        connection = Connection(source_node.output_ports["cmd_vel"], target_node.input_ports["scan"])
+        self.scene.addItem(connection)
+        initial_path = connection.path()
+        
+        target_node.setPos(500, 300)
+        app.processEvents()
+        
+        self.assertNotEqual(connection.path(), initial_path)
+        
     def test_context_menu(self):
         """Test that the context menu creates nodes correctly"""
         # This is harder to test directly since it involves QMenu execution
@@ -129,6 +186,35 @@ class TestNodeScene(unittest.TestCase):
         
         # Check that node is in the scene
         self.assertIn(node, self.scene.items())
+
+    def test_node_palette_is_reused(self):
+        """Test that the node menu is built once and maps actions to node types"""
+        palette = self.scene.nodePalette()
+        self.assertIs(self.scene.nodePalette(), palette)
+
+        action = palette.all_node_actions["Keyboard Teleop"]['action']
+        self.assertEqual(action.data(), default_registry().get('KeyboardTeleopNode'))
+
+        node = self.scene.triggerPaletteAction(action, QPointF(100, 100))
+        self.assertIsInstance(node, KeyboardTeleopNode)
+        self.assertEqual(node.pos(), QPointF(100, 100))
+        self.assertIn(node, self.scene.items())
+
+    def test_node_palette_updates_incrementally(self):
+        """Test that node types registered later are added to an existing palette"""
+        registry = NodeRegistry()
+        palette = NodeSearchMenu()
+        palette.populate(registry)
+        self.assertEqual(palette.all_node_actions, {})
+
+        node_type = registry.register_class(BaseNode, name="Plain", category="Packages/Extra")
+        action = palette.all_node_actions["Plain"]['action']
+        self.assertIs(action.data(), node_type)
+        self.assertIn("Packages/Extra", palette.submenus)
+
+        # Hidden node types stay out of the menu
+        registry.register_class(Nav2Node, name="Hidden")
+        self.assertNotIn("Hidden", palette.all_node_actions)
         
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,110 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+import sys
+
+from search_index import SearchIndex
+from node_menu import NodeSearchMenu
+from node_registry import default_registry
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class TestSearchIndex(unittest.TestCase):
+    """Test cases for the node palette search index"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.index = SearchIndex()
+        for entry in self.entries():
+            self.index.add(*entry)
+
+    def entries(self):
+        """(key, name, category, ports, description) of some node types"""
+        return [
+            ("nav2", "Nav2", "Packages/Navigation & Mapping",
+             ["scan", "odom", "goal_pose", "cmd_vel", "path"], "Path planning"),
+            ("slam", "SLAM Toolbox", "Packages/Navigation & Mapping", ["scan", "odom", "map", "tf"], "Mapping"),
+            ("mux", "Twist Mux", "Packages/Robot Control",
+             ["cmd_vel1", "cmd_vel2", "cmd_vel3", "cmd_vel"], "Multiplexer"),
+            ("keyboard", "Keyboard Teleop", "Packages/Teleoperation", ["cmd_vel"], "Drive with the keyboard"),
+        ]
+
+    def test_substring_match(self):
+        """Test that name substrings match, prefixes first"""
+        self.assertEqual(self.index.search("nav2"), ["nav2"])
+        self.assertEqual(self.index.search("tool"), ["slam"])
+        self.assertEqual(self.index.search("TELEOP"), ["keyboard"])
+
+    def test_word_prefix_match(self):
+        """Test that terms made of word prefixes match (e.g. initials)"""
+        self.assertEqual(self.index.search("tm"), ["mux"])
+        self.assertEqual(self.index.search("twmu"), ["mux"])
+        self.assertEqual(self.index.search("slto"), ["slam"])
+
+    def test_field_match(self):
+        """Test that categories, ports and descriptions match after names"""
+        self.assertEqual(self.index.search("robot"), ["mux"])
+        self.assertEqual(self.index.search("goal"), ["nav2"])
+        self.assertEqual(self.index.search("cmdvel"), ["nav2", "mux", "keyboard"])
+        # Nav2's name ranks above SLAM Toolbox's category
+        self.assertEqual(self.index.search("nav"), ["nav2", "slam"])
+
+    def test_long_terms(self):
+        """Test that terms longer than the precomputed ones match the same ways when searched directly"""
+        self.assertEqual(self.index.search("keyboard tele"), ["keyboard"])
+        self.assertEqual(self.index.search("twimux"), ["mux"])
+        self.assertEqual(self.index.search("cmd_vel1"), ["mux"])
+        self.assertEqual(self.index.search("twist_mux"), [])
+        self.assertEqual(SearchIndex().search("twist"), [])
+
+    def test_single_character_ignores_fields(self):
+        """Test that one character only matches names"""
+        self.assertEqual(set(self.index.search("x")), {"slam", "mux"})
+
+    def test_all_terms_must_match(self):
+        """Test that every term of the query has to match"""
+        self.assertEqual(self.index.search("nav goal"), ["nav2"])
+        self.assertEqual(self.index.search("slam mux"), [])
+
+    def test_limit(self):
+        """Test that the limit keeps the best matches"""
+        self.assertEqual(len(self.index.search("o")), 2)
+        self.assertEqual(self.index.search("o", limit=1), self.index.search("o")[:1])
+
+    def test_incremental_matches_fresh(self):
+        """Test that typing a query one character at a time gives the same results as searching it directly"""
+        queries = ["cmd vel", "slam toolbox", "odometry", "twist mux", "keyb teleop"]
+        for query in queries:
+            for length in range(1, len(query) + 1):
+                typed = self.index.search(query[:length])
+                fresh = SearchIndex()
+                for entry in self.entries():
+                    fresh.add(*entry)
+                self.assertEqual(typed, fresh.search(query[:length]), query[:length])
+
+    def test_menu_lists_ranked_results(self):
+        """Test that searching the menu lists the matches in reusable result actions"""
+        menu = NodeSearchMenu()
+        menu.populate(default_registry())
+        tree_actions = [action for action in menu.actions() if action not in menu.search_actions]
+
+        menu.search_bar.setText("twist")
+        self.assertTrue(menu.searching)
+        self.assertFalse(any(action.isVisible() for action in tree_actions))
+        visible = [action for action in menu.result_actions if action.isVisible()]
+        self.assertEqual(len(visible), 1)
+        self.assertTrue(visible[0].text().startswith("Twist Mux"))
+        self.assertIs(visible[0].data(), default_registry().get('TwistMuxNode'))
+
+        menu.search_bar.setText("zzz")
+        self.assertTrue(menu.no_results_action.isVisible())
+
+        menu.search_bar.clear()
+        self.assertFalse(menu.searching)
+        self.assertTrue(all(action.isVisible() for action in tree_actions))
+        self.assertFalse(any(action.isVisible() for action in menu.result_actions))
+
+if __name__ == '__main__':
+    unittest.main()
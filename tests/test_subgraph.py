@@ -0,0 +1,125 @@
+import unittest
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QPointF
+import sys
+
+import message_types
+from scene import NodeScene
+from connection import Connection
+from subgraph import PASTE_OFFSET, Subgraph
+from packages.base.node import BaseNode
+from packages.teleoperation import KeyboardTeleopNode
+from packages.navigation import Nav2Node
+from packages.robot_control import ROS2ControllersNode, TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+class CountingNode(BaseNode):
+    """Node that counts how many times its __init__ runs"""
+    inits = 0
+    clone_from_prototype = True
+
+    def __init__(self):
+        super().__init__(title="Counting")
+        type(self).inits += 1
+        self.add_input_port("in", message_types.TWIST)
+        self.add_output_port("out", message_types.TWIST)
+
+class TestSubgraph(unittest.TestCase):
+    """Test cases for copying, pasting and duplicating nodes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+
+    def add(self, node, x=0, y=0):
+        node.setPos(x, y)
+        self.scene.addItem(node)
+        return node
+
+    def connect(self, source, output, target, input):
+        connection = Connection(source.output_ports[output], target.input_ports[input])
+        self.scene.addItem(connection)
+        return connection
+
+    def build_sample(self):
+        """Keyboard and Nav2 feeding a mux that drives the controllers"""
+        keyboard = self.add(KeyboardTeleopNode())
+        nav2 = self.add(Nav2Node(), 0, 300)
+        mux = self.add(TwistMuxNode(), 300)
+        controllers = self.add(ROS2ControllersNode(), 600)
+        self.connect(keyboard, "cmd_vel", mux, "cmd_vel1")
+        self.connect(nav2, "cmd_vel", mux, "cmd_vel2")
+        self.connect(mux, "cmd_vel", controllers, "cmd_vel")
+        return keyboard, nav2, mux, controllers
+
+    def test_paste_keeps_internal_connections(self):
+        """Test that pasted nodes look like the copied ones and keep only the connections among them"""
+        keyboard, nav2, mux, controllers = self.build_sample()
+        nav2.title = "Planner"
+        subgraph = self.scene.copyNodes([nav2, mux, controllers])
+        self.assertEqual(len(subgraph), 3)
+        self.assertEqual(len(subgraph.connections), 2)
+
+        pasted = self.scene.pasteSubgraph(subgraph)
+        self.assertEqual([type(node) for node in pasted], [Nav2Node, TwistMuxNode, ROS2ControllersNode])
+        new_nav2, new_mux, new_controllers = pasted
+        self.assertEqual(new_nav2.title, "Planner")
+        self.assertEqual(new_nav2.pos(), QPointF(PASTE_OFFSET[0], 300 + PASTE_OFFSET[1]))
+        self.assertEqual(new_nav2.input_ports["scan"].msg_type, message_types.LASER_SCAN)
+        self.assertEqual(self.scene.downstreamNodes(new_nav2), [new_mux, new_controllers])
+        self.assertEqual(self.scene.upstreamNodes(new_mux), [new_nav2])
+        self.assertEqual(len(self.scene.model.edges), 5)
+        self.assertEqual(self.scene.selectedNodes(), pasted)
+
+        # Paths are built once the nodes are in place
+        self.scene.flushConnectionUpdates()
+        (connection,) = new_mux.output_ports["cmd_vel"].connections
+        self.assertEqual(connection.path().pointAtPercent(0), new_mux.output_ports["cmd_vel"].get_scene_pos())
+
+    def test_copy_is_detached(self):
+        """Test that editing or deleting the copied nodes doesn't change what is pasted"""
+        keyboard, nav2, mux, controllers = self.build_sample()
+        subgraph = self.scene.copyNodes([keyboard, mux])
+        keyboard.title = "Renamed"
+        self.scene.deleteNodes([keyboard, mux])
+
+        first = self.scene.pasteSubgraph(subgraph, 0, 0)
+        second = self.scene.pasteSubgraph(subgraph, 0, 500)
+        self.assertEqual(first[0].title, "Keyboard Teleop")
+        self.assertIsNot(first[0], second[0])
+        self.assertEqual(self.scene.downstreamNodes(second[0]), [second[1]])
+        self.assertEqual(len(self.scene.model.edges), 2)
+
+    def test_duplicate_is_one_edit(self):
+        """Test that duplicating nodes is undone and redone in one step"""
+        keyboard, nav2, mux, controllers = self.build_sample()
+        copies = self.scene.duplicateNodes([keyboard, nav2, mux])
+        self.assertEqual(len(self.scene.nodes()), 7)
+        self.assertEqual(len(self.scene.connections), 5)
+        self.assertEqual(self.scene.undo_stack.undoText(), "Add 3 nodes")
+
+        self.scene.undo_stack.undo()
+        self.assertEqual(len(self.scene.nodes()), 4)
+        self.assertEqual(len(self.scene.model.edges), 3)
+        self.scene.undo_stack.redo()
+        self.assertEqual(self.scene.downstreamNodes(copies[0]), [copies[2]])
+        self.assertEqual(len(self.scene.model.edges), 5)
+
+    def test_instances_are_cloned(self):
+        """Test that pasted nodes come from cloning, not from running the class's __init__ again"""
+        node = self.add(CountingNode())
+        other = self.add(CountingNode(), 300)
+        self.connect(node, "out", other, "in")
+        inits = CountingNode.inits
+        subgraph = Subgraph([node, other])
+        for offset in range(3):
+            subgraph.instantiate(0, 200 * (offset + 1))
+        self.scene.duplicateNodes([node, other])
+        self.assertEqual(CountingNode.inits, inits)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,277 @@
+import unittest
+from unittest import mock
+from PySide6.QtWidgets import QApplication
+from PySide6.QtTest import QTest
+import os
+import sys
+import tempfile
+import time
+
+import graph_io
+import lifecycle
+import supervisor
+from supervisor import Supervisor, install_supervisor
+from scene import NodeScene
+from connection import Connection
+from launcher import GraphLauncher
+from packages.base.node import BaseNode
+from packages.navigation import Nav2Node
+from packages.robot_control import TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+# Stand-ins for ROS executables
+SERVE = "print('ready'); import time; time.sleep(60)"
+CRASH = "print('boom'); raise SystemExit(3)"
+EXIT = "pass"
+IGNORE_SIGTERM = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print('ready'); time.sleep(60)"
+
+def script(code):
+    """Command running a snippet of Python with unbuffered output"""
+    return [sys.executable, '-u', '-c', code]
+
+def wait_until(predicate, timeout=5.0):
+    """Process events until predicate() is true or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        QTest.qWait(10)
+    return True
+
+class ScriptNode(BaseNode):
+    """Node running a stand-in script"""
+    def __init__(self, code, restart_policy=supervisor.RESTART_ON_FAILURE):
+        super().__init__(title="Script")
+        self.command = script(code)
+        self.restart_policy = restart_policy
+        self.add_input_port("in")
+        self.add_output_port("out")
+
+class TestSupervisor(unittest.TestCase):
+    """Test cases for supervised node processes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.supervisor = Supervisor()
+        install_supervisor(self.supervisor)
+
+    def tearDown(self):
+        """Stop any processes the test left running"""
+        install_supervisor(None)
+        self.supervisor.shutdown(timeout=1.0)
+
+    def test_start_and_stop(self):
+        """Test that the run state follows the process and output is captured"""
+        node = ScriptNode(SERVE)
+        node.toggle_run_state()
+        process = node.process()
+        self.assertEqual(process.state, supervisor.STARTING)
+        self.assertTrue(node.is_running)
+        self.assertFalse(node.is_ready())
+
+        self.assertTrue(wait_until(lambda: list(process.output) == ['ready']))
+        self.assertEqual(process.state, supervisor.RUNNING)
+        self.assertTrue(node.is_ready())
+
+        node.toggle_run_state()
+        self.assertFalse(node.is_running)
+        self.assertTrue(wait_until(lambda: process.state == supervisor.STOPPED))
+        self.assertFalse(node.is_running)
+
+    def test_nodes_without_supervisor_run_no_process(self):
+        """Test that nodes only launch their command when a supervisor is installed"""
+        install_supervisor(None)
+        node = ScriptNode(SERVE)
+        node.toggle_run_state()
+        self.assertTrue(node.is_running)
+        self.assertIsNone(node.process())
+        self.assertIsNone(self.supervisor.process(node))
+
+    @mock.patch.object(supervisor, 'RESTART_BACKOFF_INITIAL', 0.01)
+    def test_restart_with_backoff(self):
+        """Test that a crashing process is restarted until it is given up on"""
+        node = ScriptNode(CRASH)
+        states = []
+        node.toggle_run_state()
+        node.process().stateChanged.connect(states.append)
+
+        process = node.process()
+        self.assertTrue(wait_until(lambda: process.state == supervisor.FAILED))
+        self.assertEqual(process.restart_count, supervisor.MAX_RESTARTS)
+        self.assertEqual(states.count(supervisor.BACKOFF), supervisor.MAX_RESTARTS)
+        self.assertEqual(process.exit_code, 3)
+        self.assertEqual(process.error, "exited with code 3")
+        self.assertEqual(list(process.output), ['boom'] * (supervisor.MAX_RESTARTS + 1))
+        # The button shows the node as stopped once it is given up on
+        self.assertFalse(node.is_running)
+
+    def test_restart_policies(self):
+        """Test that clean exits are only restarted with RESTART_ALWAYS"""
+        node = ScriptNode(EXIT, supervisor.RESTART_ON_FAILURE)
+        node.start()
+        self.assertTrue(wait_until(lambda: node.process().state == supervisor.STOPPED))
+        self.assertFalse(node.is_running)
+
+        node = ScriptNode(CRASH, supervisor.RESTART_NEVER)
+        node.start()
+        self.assertTrue(wait_until(lambda: node.process().state == supervisor.FAILED))
+        self.assertEqual(node.process().restart_count, 0)
+
+        node = ScriptNode(EXIT, supervisor.RESTART_ALWAYS)
+        node.start()
+        self.assertTrue(wait_until(lambda: node.process().state == supervisor.BACKOFF))
+        self.assertTrue(node.is_running)
+        node.stop()
+        self.assertEqual(node.process().state, supervisor.STOPPED)
+
+    def test_stop_escalates_to_kill(self):
+        """Test that a process ignoring SIGTERM is killed after the grace period"""
+        node = ScriptNode(IGNORE_SIGTERM)
+        node.start()
+        process = node.process()
+        self.assertTrue(wait_until(lambda: list(process.output) == ['ready']))
+        process.grace_period = 0.2
+
+        stopped_at = time.monotonic()
+        node.stop()
+        self.assertTrue(wait_until(lambda: process.state == supervisor.STOPPED))
+        self.assertGreaterEqual(time.monotonic() - stopped_at, 0.2)
+
+    def test_missing_executable(self):
+        """Test that a command that can't be run fails without restarting"""
+        node = ScriptNode(SERVE)
+        node.command = ["/nonexistent/ros2", "launch"]
+        node.start()
+        process = node.process()
+        self.assertTrue(wait_until(lambda: process.state == supervisor.FAILED))
+        self.assertEqual(process.restart_count, 0)
+        self.assertTrue(process.error)
+        self.assertFalse(node.is_running)
+
+    def test_deleted_node_is_stopped(self):
+        """Test that deleting a running node stops its process, and undoing the delete restarts it"""
+        scene = NodeScene()
+        node = ScriptNode(SERVE)
+        scene.addItem(node)
+        node.start()
+        process = node.process()
+        self.assertTrue(wait_until(lambda: process.state == supervisor.RUNNING))
+
+        scene.deleteNodes([node])
+        self.assertEqual(process.state, supervisor.STOPPING)
+        self.assertFalse(node.is_running)
+        self.assertTrue(wait_until(lambda: process.state == supervisor.STOPPED))
+        # The supervisor lets go of the process once it has exited
+        self.assertIsNone(self.supervisor.process(node))
+
+        scene.undo_stack.undo()
+        self.assertTrue(node.is_running)
+        self.assertIsNot(node.process(), process)
+        self.assertTrue(wait_until(lambda: node.process().state == supervisor.RUNNING))
+
+        # Deleting it again before it finished stopping still drops it
+        scene.undo_stack.redo()
+        scene.undo_stack.undo()
+        scene.undo_stack.redo()
+        self.assertTrue(wait_until(lambda: self.supervisor.process(node) is None))
+
+    def test_flag_without_process(self):
+        """Test that a node flagged running with no process shows as stopped and starts for real"""
+        scene = NodeScene()
+        node = ScriptNode(SERVE)
+        scene.addItem(node)
+        node.is_running = True
+        self.assertEqual(node.run_state, lifecycle.STOPPED)
+        self.assertFalse(node.is_started())
+
+        scene.setRunState([node], True)
+        self.assertIsNotNone(node.process())
+        self.assertTrue(wait_until(lambda: node.run_state == lifecycle.RUNNING))
+        scene.undo_stack.undo()
+        self.assertTrue(wait_until(lambda: node.process().state == supervisor.STOPPED))
+        self.assertEqual(node.run_state, lifecycle.STOPPED)
+
+        # Nodes without a command still run without a process
+        plain = BaseNode(title="Plain")
+        plain.start()
+        self.assertIsNone(plain.process())
+        self.assertEqual(plain.run_state, lifecycle.RUNNING)
+
+    def test_stopped_node_released(self):
+        """Test that releasing a node whose process already exited drops it right away"""
+        node = ScriptNode(CRASH, supervisor.RESTART_NEVER)
+        node.start()
+        self.assertTrue(wait_until(lambda: node.process().state == supervisor.FAILED))
+        node.release()
+        self.assertIsNone(node.process())
+
+    def test_launch_with_stand_ins(self):
+        """Test launching a graph whose ROS commands are replaced with stand-in scripts"""
+        self.supervisor.commands = {'Nav2Node': script(SERVE), 'TwistMuxNode': script(SERVE)}
+        scene = NodeScene()
+        nav2 = Nav2Node()
+        mux = TwistMuxNode()
+        scene.addItem(nav2)
+        scene.addItem(mux)
+        scene.addItem(Connection(nav2.output_ports["cmd_vel"], mux.input_ports["cmd_vel1"]))
+
+        launcher = GraphLauncher(scene, timeout=5.0)
+        reports = []
+        launcher.finished.connect(reports.append)
+        launcher.start()
+        self.assertTrue(wait_until(lambda: reports))
+        report = reports[0]
+        self.assertTrue(report.ok, report.format())
+        self.assertEqual([result.node for result in report.results], [nav2, mux])
+        self.assertEqual(self.supervisor.process(mux).state, supervisor.RUNNING)
+
+    def test_launch_loaded_running_graph(self):
+        """Test that nodes saved while running come back with their processes, and Run Graph counts them"""
+        self.supervisor.commands = {'Nav2Node': script(SERVE)}
+        scene = NodeScene()
+        nav2 = Nav2Node()
+        scene.addItem(nav2)
+        nav2.start()
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        path = os.path.join(tempdir.name, "graph.rgraph")
+        graph_io.save_graph(scene, path)
+        nav2.release()
+        self.assertTrue(wait_until(lambda: self.supervisor.process(nav2) is None))
+
+        loaded = NodeScene()
+        (node,), _ = graph_io.load_graph(loaded, path)
+        self.assertTrue(node.is_running)
+        self.assertIsNotNone(node.process())
+
+        launcher = GraphLauncher(loaded, timeout=5.0)
+        reports = []
+        launcher.finished.connect(reports.append)
+        launcher.start()
+        self.assertTrue(wait_until(lambda: reports))
+        self.assertTrue(reports[0].ok, reports[0].format())
+        self.assertTrue(reports[0].format().startswith("Started 1 of 1 nodes"))
+        self.assertEqual(node.process().state, supervisor.RUNNING)
+
+    def test_launch_reports_process_failure(self):
+        """Test that a node whose process dies while starting fails the launch"""
+        self.supervisor.commands = {'Nav2Node': ["/nonexistent/ros2"]}
+        scene = NodeScene()
+        nav2 = Nav2Node()
+        scene.addItem(nav2)
+
+        launcher = GraphLauncher(scene, timeout=5.0)
+        reports = []
+        launcher.finished.connect(reports.append)
+        launcher.start()
+        self.assertTrue(wait_until(lambda: reports))
+        (failure,) = reports[0].failures()
+        self.assertIs(failure.node, nav2)
+        self.assertEqual(failure.error, self.supervisor.process(nav2).error)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import unittest
+from PySide6.QtWidgets import QApplication, QGraphicsSceneMouseEvent
+from PySide6.QtCore import QEvent, QPointF, Qt
+import sys
+import tracemalloc
+
+import undo
+from scene import NodeScene
+from connection import Connection
+from packages.base.node import BaseNode
+from packages.teleoperation import KeyboardTeleopNode
+from packages.robot_control import ROS2ControllersNode, TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+def mouse_event(kind, pos):
+    event = QGraphicsSceneMouseEvent(kind)
+    event.setPos(pos)
+    event.setButton(Qt.LeftButton)
+    event.setButtons(Qt.LeftButton)
+    return event
+
+class TestUndo(unittest.TestCase):
+    """Test cases for undo and redo of editor edits"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+        self.stack = self.scene.undo_stack
+
+    def add(self, node, x=0, y=0):
+        node.setPos(x, y)
+        self.scene.addItem(node)
+        return node
+
+    def connect(self, source, output, target, input):
+        connection = Connection(source.output_ports[output], target.input_ports[input])
+        self.scene.addItem(connection)
+        return connection
+
+    def drag(self, node, offsets):
+        """Press on the middle of node's body, move the mouse to each offset from there in turn and release"""
+        grab = QPointF(node.width / 2, node.header_height + 5)
+        start = node.mapToScene(grab)
+        node.mousePressEvent(mouse_event(QEvent.GraphicsSceneMousePress, grab))
+        for dx, dy in offsets:
+            # Mouse events give positions relative to where the node is now
+            node.mouseMoveEvent(mouse_event(QEvent.GraphicsSceneMouseMove,
+                                            node.mapFromScene(start + QPointF(dx, dy))))
+        node.mouseReleaseEvent(mouse_event(QEvent.GraphicsSceneMouseRelease, grab))
+
+    def test_add_and_delete_nodes(self):
+        """Test that deleting nodes takes their connections with them, and undo brings both back"""
+        keyboard = self.add(KeyboardTeleopNode())
+        mux = self.add(TwistMuxNode(), 300)
+        controllers = self.add(ROS2ControllersNode(), 600)
+        self.connect(keyboard, "cmd_vel", mux, "cmd_vel1")
+        self.connect(mux, "cmd_vel", controllers, "cmd_vel")
+
+        self.scene.deleteNodes([mux])
+        self.assertIsNone(mux.scene())
+        self.assertEqual(len(self.scene.connections), 0)
+        self.assertFalse(keyboard.output_ports["cmd_vel"].connections)
+
+        self.stack.undo()
+        self.assertIs(mux.scene(), self.scene)
+        self.assertEqual(len(self.scene.connections), 2)
+        self.assertEqual(self.scene.downstreamNodes(keyboard), [mux, controllers])
+
+        self.stack.redo()
+        self.assertEqual(len(self.scene.model.edges), 0)
+
+        added = KeyboardTeleopNode()
+        self.scene.addNodes([added])
+        self.assertIs(added.scene(), self.scene)
+        self.stack.undo()
+        self.assertIsNone(added.scene())
+        self.assertEqual(self.stack.undoText(), "Delete node")
+
+    def test_connections(self):
+        """Test that connections made by dragging, and removed, can be undone"""
+        keyboard = self.add(KeyboardTeleopNode())
+        mux = self.add(TwistMuxNode(), 300)
+        self.scene.startConnection(keyboard.output_ports["cmd_vel"])
+        release = QGraphicsSceneMouseEvent(QEvent.GraphicsSceneMouseRelease)
+        release.setScenePos(mux.input_ports["cmd_vel2"].get_scene_pos())
+        self.scene.mouseReleaseEvent(release)
+        (connection,) = self.scene.connections
+        self.assertEqual(self.stack.count(), 1)
+
+        self.stack.undo()
+        self.assertEqual(len(self.scene.connections), 0)
+        self.assertIsNone(connection.scene())
+        self.stack.redo()
+        self.assertEqual(list(self.scene.connections), [connection])
+        self.assertEqual(self.scene.downstreamNodes(keyboard), [mux])
+
+        self.scene.removeConnection(connection)
+        self.assertEqual(len(self.scene.model.edges), 0)
+        self.stack.undo()
+        self.assertIs(connection.end_port, mux.input_ports["cmd_vel2"])
+        self.assertEqual(len(self.scene.model.edges), 1)
+
+    def test_drag_moves_selection_as_one_edit(self):
+        """Test that a drag moves the selected nodes together and is undone in one step"""
+        first = self.add(KeyboardTeleopNode(), 0, 0)
+        second = self.add(KeyboardTeleopNode(), 0, 200)
+        other = self.add(KeyboardTeleopNode(), 400, 0)
+        first.setSelected(True)
+        second.setSelected(True)
+
+        self.drag(first, [(5, 0), (10, 5), (30, 20)])
+        self.assertEqual(first.pos(), QPointF(30, 20))
+        self.assertEqual(second.pos(), QPointF(30, 220))
+        self.assertEqual(other.pos(), QPointF(400, 0))
+        self.assertEqual(self.stack.count(), 1)
+
+        # A second drag is a separate edit
+        self.drag(first, [(10, 0)])
+        self.assertEqual(self.stack.count(), 2)
+        self.stack.undo()
+        self.stack.undo()
+        self.assertEqual(first.pos(), QPointF(0, 0))
+        self.assertEqual(second.pos(), QPointF(0, 200))
+        self.assertEqual(first.model.x, 0)
+        self.stack.redo()
+        self.assertEqual(second.pos(), QPointF(30, 220))
+
+    def test_long_drag_memory(self):
+        """Test that a long drag of many nodes keeps one small command"""
+        nodes = tuple(self.add(BaseNode(), i * 200, 0) for i in range(500))
+        for step in range(10):
+            self.scene.moveNodes(nodes, 1, 0)
+        command = self.stack.command(0)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for step in range(30):
+                self.scene.moveNodes(nodes, 1 if step % 2 else -1, 0.5)
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        growth = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+        # Well under what a new command object per step would take
+        self.assertLess(growth, 4096)
+        self.assertEqual(self.stack.count(), 1)
+        self.assertIs(self.stack.command(0), command)
+
+        self.stack.undo()
+        self.assertEqual(nodes[3].pos(), QPointF(600, 0))
+        self.assertEqual(nodes[3].model.y, 0)
+
+    def test_history_limit(self):
+        """Test that the oldest edits are dropped once the history is full"""
+        node = self.add(BaseNode())
+        for step in range(undo.UNDO_LIMIT + 10):
+            self.scene.moveNodes((node,), 1, 0)
+        self.assertEqual(self.stack.count(), undo.UNDO_LIMIT)
+        while self.stack.canUndo():
+            self.stack.undo()
+        self.assertEqual(node.pos(), QPointF(10, 0))
+
+    def test_run_state(self):
+        """Test that the run/stop button can be undone"""
+        node = self.add(KeyboardTeleopNode())
+        button = node.get_button_rect().center()
+        node.mousePressEvent(mouse_event(QEvent.GraphicsSceneMousePress, button))
+        self.assertTrue(node.is_running)
+        self.stack.undo()
+        self.assertFalse(node.is_running)
+        self.stack.redo()
+        self.assertTrue(node.is_running)
+
+        # Nodes already in the requested state aren't recorded
+        self.scene.setRunState([node], True)
+        self.assertEqual(self.stack.count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import unittest
+from PySide6.QtWidgets import QApplication, QStyleOptionGraphicsItem
+from PySide6.QtGui import QImage, QPainter, QTransform
+import random
+import sys
+
+import validation
+from validation import GraphValidator
+from graph_model import GraphModel
+from scene import NodeScene
+from connection import Connection
+from packages.base.node import BaseNode
+from packages.teleoperation import KeyboardTeleopNode, JoystickTeleopNode
+from packages.navigation import Nav2Node
+from packages.robot_control import ROS2ControllersNode, TwistMuxNode
+
+# Create QApplication instance for the tests
+app = QApplication.instance()
+if not app:
+    app = QApplication(sys.argv)
+
+def kinds(issues):
+    return sorted(issue.kind for issue in issues)
+
+class TestValidation(unittest.TestCase):
+    """Test cases for incremental graph validation"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.scene = NodeScene()
+
+    def add(self, node):
+        self.scene.addItem(node)
+        return node
+
+    def connect(self, source, output, target, input):
+        connection = Connection(source.output_ports[output], target.input_ports[input])
+        self.scene.addItem(connection)
+        return connection
+
+    def chain(self, model, count):
+        """Nodes a -> b -> c ... with one input and one output each"""
+        nodes = [model.create_node("BaseNode", f"n{i}", inputs=["in"], outputs=["out"]) for i in range(count)]
+        for source, target in zip(nodes, nodes[1:]):
+            model.connect(source.outputs["out"], target.inputs["in"])
+        return nodes
+
+    def test_required_inputs_and_orphans(self):
+        """Test that badges follow required inputs and orphans as nodes are wired up"""
+        nav2 = self.add(Nav2Node())
+        self.scene.flushValidation()
+        self.assertEqual(kinds(nav2.validation_issues), [validation.ORPHAN, validation.REQUIRED_INPUT,
+                                                         validation.REQUIRED_INPUT])
+        self.assertIn("Required input scan is not connected", nav2.toolTip())
+
+        scanner = self.add(BaseNode(title="Lidar"))
+        scanner.add_output_port("scan")
+        self.connect(scanner, "scan", nav2, "scan")
+        self.scene.flushValidation()
+        self.assertEqual(kinds(nav2.validation_issues), [validation.REQUIRED_INPUT])
+        self.assertEqual(scanner.validation_issues, ())
+        self.assertEqual(nav2.toolTip(), "Required input odom is not connected")
+
+    def test_duplicate_publishers(self):
+        """Test that every publisher on a shared topic and its subscriber are flagged"""
+        keyboard = self.add(KeyboardTeleopNode())
+        joystick = self.add(JoystickTeleopNode())
+        controllers = self.add(ROS2ControllersNode())
+        self.connect(keyboard, "cmd_vel", controllers, "cmd_vel")
+        self.scene.flushValidation()
+        self.assertEqual(keyboard.validation_issues, ())
+
+        second = self.connect(joystick, "cmd_vel", controllers, "cmd_vel")
+        self.scene.flushValidation()
+        self.assertEqual(kinds(keyboard.validation_issues), [validation.DUPLICATE_PUBLISHERS])
+        self.assertIn(validation.DUPLICATE_PUBLISHERS, kinds(joystick.validation_issues))
+        self.assertIn("cmd_vel has 2 publishers", controllers.toolTip())
+
+        self.scene.removeItem(second)
+        self.scene.flushValidation()
+        self.assertEqual(keyboard.validation_issues, ())
+        self.assertNotIn(validation.DUPLICATE_PUBLISHERS, kinds(controllers.validation_issues))
+
+    def test_cycles(self):
+        """Test that nodes on a cycle are flagged, but not the nodes downstream of it"""
+        model = GraphModel()
+        a, b, c, d = self.chain(model, 4)
+        validator = GraphValidator(model)
+        validator.flush()
+
+        back = model.connect(c.outputs["out"], a.inputs["in"])
+        validator.edge_added(back)
+        self.assertEqual(validator.flush(), {a, b, c})
+        for node in (a, b, c):
+            self.assertEqual(kinds(validator.issues_for(node)), [validation.CYCLE])
+        self.assertEqual(validator.issues_for(d), ())
+        self.assertEqual(validator.issues_for(a)[0].message, "On a dependency cycle")
+
+        # Cutting the cycle in the middle clears it
+        (middle,) = model.edges_between(b, c)
+        model.remove_edge(middle)
+        validator.edge_removed(middle)
+        validator.flush()
+        for node in (a, b, c, d):
+            self.assertNotIn(validation.CYCLE, kinds(validator.issues_for(node)))
+
+        # A self-loop is a cycle of one
+        loop = model.connect(d.outputs["out"], d.inputs["in"])
+        validator.edge_added(loop)
+        validator.flush()
+        self.assertEqual(validator.issues_for(d)[-1].message, "Feeds its own input")
+
+    def test_edits_touch_only_their_neighbourhood(self):
+        """Test that an edit re-checks a few nodes, not the whole graph"""
+        model = GraphModel()
+        nodes = self.chain(model, 2000)
+        validator = GraphValidator(model)
+        validator.flush()
+        self.assertEqual(validator.checked, 2000)
+
+        extra = model.create_node("BaseNode", "extra", inputs=["in"], outputs=["out"])
+        validator.node_added(extra)
+        self.assertEqual(validator.flush(), {extra})
+        self.assertEqual(kinds(validator.issues_for(extra)), [validation.ORPHAN])
+        self.assertEqual(validator.checked, 1)
+
+        edge = model.connect(nodes[500].outputs["out"], extra.inputs["in"])
+        validator.edge_added(edge)
+        self.assertEqual(validator.flush(), {extra})
+        self.assertEqual(validator.issues_for(extra), ())
+        self.assertLessEqual(validator.checked, 2)
+
+        model.remove_node(extra)
+        validator.edge_removed(edge)
+        validator.node_removed(extra)
+        validator.flush()
+        self.assertNotIn(extra, validator.issues)
+        self.assertLessEqual(validator.checked, 2)
+
+    def test_incremental_matches_full_scan(self):
+        """Test that random edits validated incrementally give the same issues as a full scan"""
+        rng = random.Random(7)
+        model = GraphModel()
+        validator = GraphValidator(model)
+        nodes = []
+        for step in range(600):
+            action = rng.random()
+            if action < 0.3 or len(nodes) < 3:
+                node = model.create_node("BaseNode", f"n{step}", inputs=["a", "b"], outputs=["x", "y"])
+                node.inputs["a"].required = rng.random() < 0.3
+                nodes.append(node)
+                validator.node_added(node)
+            elif action < 0.75:
+                source, target = rng.choice(nodes), rng.choice(nodes)
+                edge = model.connect(rng.choice(list(source.outputs.values())),
+                                     rng.choice(list(target.inputs.values())))
+                validator.edge_added(edge)
+            elif action < 0.95 and model.edges:
+                edge = rng.choice(list(model.edges.values()))
+                model.remove_edge(edge)
+                validator.edge_removed(edge)
+            else:
+                node = nodes.pop(rng.randrange(len(nodes)))
+                edges = model.node_edges(node)
+                model.remove_node(node)
+                for edge in edges:
+                    validator.edge_removed(edge)
+                validator.node_removed(node)
+            if rng.random() < 0.5:
+                validator.flush()
+
+            if step % 50 == 49:
+                validator.flush()
+                full = GraphValidator(model)
+                full.flush()
+                self.assertEqual(validator.issues, full.issues, f"after step {step}")
+
+    def test_loading_scans_once(self):
+        """Test that a large batch of edits is validated with one full scan"""
+        for i in range(50):
+            self.add(KeyboardTeleopNode())
+        self.scene.flushValidation()
+        self.assertEqual(self.scene.validator.checked, 50)
+        self.assertEqual(len(self.scene.validator.issues), 50)
+
+    def test_badge_painting(self):
+        """Test that nodes with issues can be painted at every level of detail"""
+        nav2 = self.add(Nav2Node())
+        self.scene.flushValidation()
+        image = QImage(300, 200, QImage.Format_ARGB32)
+        for scale in (1.0, 0.2):
+            painter = QPainter(image)
+            painter.setWorldTransform(QTransform.fromScale(scale, scale))
+            nav2.paint(painter, QStyleOptionGraphicsItem(), None)
+            painter.end()
+
+        clone = nav2.clone()
+        self.assertEqual(clone.validation_issues, ())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,10 @@
 import unittest
-from PySide6.QtWidgets import QApplication, QGraphicsView
+from PySide6.QtWidgets import QApplication, QGraphicsView, QGraphicsScene, QGraphicsRectItem
 from PySide6.QtCore import QPointF, Qt, QEvent
 from PySide6.QtGui import QMouseEvent
 import sys
 
+import validation
 from scene import NodeScene
 from view import NodeView
 from packages.teleoperation import KeyboardTeleopNode
@@ -93,6 +94,124 @@ class TestNodeView(unittest.TestCase):
         # Process the event
         self.view.mouseReleaseEvent(release_event)
         
+    def test_performance_mode(self):
+        """Test switching between full and partial viewport updates"""
+        # Full viewport updates by default
+        self.assertEqual(self.view.viewportUpdateMode(), QGraphicsView.FullViewportUpdate)
+        
+        self.view.setPerformanceMode(True)
+        self.assertTrue(self.view.performance_mode)
+        self.assertEqual(self.view.viewportUpdateMode(), QGraphicsView.SmartViewportUpdate)
+        self.assertEqual(self.view.cacheMode(), QGraphicsView.CacheBackground)
+        
+        self.view.setPerformanceMode(False)
+        self.assertFalse(self.view.performance_mode)
+        self.assertEqual(self.view.viewportUpdateMode(), QGraphicsView.FullViewportUpdate)
+        
+    def test_overview_painting(self):
+        """Test that zooming far out paints from the batched overview"""
+        node = KeyboardTeleopNode()
+        node.setPos(100, 100)
+        self.scene.addItem(node)
+        
+        self.view.resize(400, 300)
+        self.view.show()
+        self.view.scale(self.view.minScale, self.view.minScale)
+        app.processEvents()
+        self.view.viewport().repaint()
+        
+        # A run holding the node's rectangle, then one for its badge corner
+        runs, num_nodes, num_lines = self.view._overview
+        self.assertEqual((len(runs), num_nodes, num_lines), (2, 1, 0))
+        self.assertEqual(runs[0][1], node.body_color)
+        self.assertEqual(runs[0][2][0].topLeft(), QPointF(100, 100))
+        
+        # Scene changes invalidate the overview
+        node.setPos(200, 200)
+        app.processEvents()
+        self.assertIsNone(self.view._overview)
+        self.view.close()
+        
+    def show_overview(self):
+        self.view.resize(400, 300)
+        self.view.show()
+        self.view.scale(self.view.minScale, self.view.minScale)
+        self.view.centerOn(0, 0)
+        app.processEvents()
+        self.view.viewport().repaint()
+
+    def test_overview_badges(self):
+        """Test that a node with validation issues shows its badge corner at overview zoom"""
+        node = KeyboardTeleopNode()
+        node.setPos(100, 100)
+        self.scene.addItem(node)
+        app.processEvents()
+        node.set_validation_issues([validation.Issue(validation.REQUIRED_INPUT, validation.ERROR, "Missing")])
+        self.show_overview()
+
+        badge_run = self.view._overview[0][-1]
+        self.assertEqual(badge_run[1], node.badge_color)
+        size = node.header_height
+        corner = self.view.mapFromScene(QPointF(100 + node.width - size / 2, 100 + size / 2))
+        image = self.view.viewport().grab().toImage()
+        self.assertEqual(image.pixelColor(corner).rgb(), node.badge_color.rgb())
+        self.view.close()
+
+    def test_overview_skips_hidden_items(self):
+        """Test that hidden nodes are left out of the overview"""
+        node = KeyboardTeleopNode()
+        self.scene.addItem(node)
+        node.hide()
+        self.show_overview()
+        self.assertEqual(self.view._overview[0], [])
+        self.view.close()
+
+    def test_overview_keeps_stacking_order(self):
+        """Test that the overview draws overlapping nodes and badges in the items' stacking order"""
+        lower = KeyboardTeleopNode()
+        lower.setPos(100, 100)
+        self.scene.addItem(lower)
+        app.processEvents()
+        lower.set_validation_issues([validation.Issue(validation.REQUIRED_INPUT, validation.ERROR, "Missing")])
+        upper = KeyboardTeleopNode()
+        upper.setPos(100 + lower.width / 2, 100)
+        self.scene.addItem(upper)
+        upper.setSelected(True)
+        self.show_overview()
+
+        # Each node's rectangle and badge corner, bottom node first
+        self.assertEqual([len(shapes) for _, _, shapes in self.view._overview[0]], [1, 1, 1, 1])
+        size = lower.header_height
+        corner = self.view.mapFromScene(QPointF(100 + lower.width - size / 2, 100 + size / 2))
+        image = self.view.viewport().grab().toImage()
+        self.assertEqual(image.pixelColor(corner).rgb(), upper.selected_color.rgb())
+
+        upper.setZValue(lower.zValue() - 1)
+        app.processEvents()
+        self.view.viewport().repaint()
+        image = self.view.viewport().grab().toImage()
+        self.assertEqual(image.pixelColor(corner).rgb(), lower.badge_color.rgb())
+        self.view.close()
+
+    def test_overview_falls_back_to_items(self):
+        """Test that items the overview can't draw make the view paint the items themselves"""
+        self.scene.addItem(KeyboardTeleopNode())
+        self.scene.addItem(QGraphicsRectItem(0, 0, 50, 50))
+        self.show_overview()
+        self.assertIs(self.view._overview, False)
+        self.view.close()
+
+    def test_plain_scene_rect_follows_items(self):
+        """Test that the scene rect follows the items of a scene without content bounds tracking"""
+        scene = QGraphicsScene()
+        view = NodeView(scene)
+        item = QGraphicsRectItem(0, 0, 50, 50)
+        item.setPos(5000, 5000)
+        scene.addItem(item)
+        app.processEvents()
+        self.assertTrue(scene.sceneRect().contains(item.sceneBoundingRect()))
+        view.close()
+
     def test_item_interaction(self):
         """Test interaction with items in the view"""
         # Add a node to the scene
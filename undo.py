@@ -0,0 +1,235 @@
+"""
+Undoable edits of a NodeScene.
+
+Each command stores what changed rather than a snapshot of the graph: the
+items it added or removed (kept alive while the command is in the history)
+and, for moves, one offset shared by every moved node. The steps of a drag
+extend the command already on top of the stack, so a drag of any length
+is one command. The stack keeps at most UNDO_LIMIT commands and
+drops the oldest first.
+"""
+from PySide6.QtGui import QUndoCommand, QUndoStack
+
+# Commands kept in the history before the oldest are dropped
+UNDO_LIMIT = 500
+
+
+def create_undo_stack(parent=None):
+    """Create an undo stack with the history limit applied"""
+    stack = QUndoStack(parent)
+    stack.setUndoLimit(UNDO_LIMIT)
+    return stack
+
+
+def _describe(verb, count, noun):
+    return f"{verb} {noun}" if count == 1 else f"{verb} {count} {noun}s"
+
+
+def _attach(scene, connection, start_port, end_port):
+    """Put a removed (or newly created) connection between its ports and into the scene"""
+    if connection.start_port is start_port and connection.end_port is end_port:
+        if connection.scene() is not scene:
+            scene.addItem(connection)
+            # Created before its nodes were in the scene: the path is rebuilt on the next frame
+            scene.scheduleConnectionUpdate(connection)
+        return
+    connection.connectToPorts(start_port, end_port)
+    if connection.scene() is not scene:
+        scene.addItem(connection)
+
+
+def _running(nodes):
+    """The nodes that are running; removing a node from its scene stops it"""
+    return tuple(node for node in nodes if node.is_started())
+
+
+def _detach(scene, connection):
+    """Take a connection off its ports and out of the scene"""
+    connection.disconnectFromPorts()
+    if connection.scene() is scene:
+        scene.removeItem(connection)
+
+
+class AddNodesCommand(QUndoCommand):
+    """Add nodes to a scene, along with connections among them"""
+
+    def __init__(self, scene, nodes, connections=()):
+        super().__init__(_describe("Add", len(nodes), "node"))
+        self.scene = scene
+        self.nodes = tuple(nodes)
+        # Connection -> (start port, end port), to put them back on redo
+        self.connections = {connection: (connection.start_port, connection.end_port)
+                            for connection in connections}
+        # Nodes started after being added, restarted on redo
+        self.running = ()
+
+    def redo(self):
+        with self.scene.batchUpdates():
+            for node in self.nodes:
+                if node.scene() is not self.scene:
+                    self.scene.addItem(node)
+            for connection, (start_port, end_port) in self.connections.items():
+                _attach(self.scene, connection, start_port, end_port)
+        for node in self.running:
+            node.start()
+
+    def undo(self):
+        self.running = _running(self.nodes)
+        with self.scene.batchUpdates():
+            for connection in self.connections:
+                _detach(self.scene, connection)
+            for node in self.nodes:
+                if node.scene() is self.scene:
+                    self.scene.removeItem(node)
+
+
+class RemoveNodesCommand(QUndoCommand):
+    """Remove nodes from a scene, along with their connections"""
+
+    def __init__(self, scene, nodes):
+        super().__init__(_describe("Delete", len(nodes), "node"))
+        self.scene = scene
+        self.nodes = tuple(nodes)
+        # Connection -> (start port, end port), to put them back on undo
+        self.connections = {}
+        for node in self.nodes:
+            for port in list(node.input_ports.values()) + list(node.output_ports.values()):
+                for connection in port.connections:
+                    self.connections[connection] = (connection.start_port, connection.end_port)
+        # Nodes that were running when deleted, restarted on undo
+        self.running = ()
+
+    def redo(self):
+        self.running = _running(self.nodes)
+        with self.scene.batchUpdates():
+            for connection in self.connections:
+                _detach(self.scene, connection)
+            for node in self.nodes:
+                if node.scene() is self.scene:
+                    self.scene.removeItem(node)
+
+    def undo(self):
+        with self.scene.batchUpdates():
+            for node in self.nodes:
+                if node.scene() is not self.scene:
+                    self.scene.addItem(node)
+            for connection, (start_port, end_port) in self.connections.items():
+                _attach(self.scene, connection, start_port, end_port)
+        for node in self.running:
+            node.start()
+
+
+class MoveNodesCommand(QUndoCommand):
+    """Move nodes by the same offset"""
+
+    def __init__(self, nodes, dx, dy):
+        super().__init__(_describe("Move", len(nodes), "node"))
+        self.nodes = nodes
+        self.dx = dx
+        self.dy = dy
+
+    def extend(self, dx, dy):
+        """Move the nodes further, as part of this command"""
+        self.dx += dx
+        self.dy += dy
+        for node in self.nodes:
+            node.moveBy(dx, dy)
+
+    def redo(self):
+        for node in self.nodes:
+            node.moveBy(self.dx, self.dy)
+
+    def undo(self):
+        for node in self.nodes:
+            node.moveBy(-self.dx, -self.dy)
+
+
+def push_move(stack, nodes, dx, dy):
+    """
+    Move nodes by (dx, dy) as an undoable command.
+
+    A move of the very same nodes tuple as the command on top of the stack
+    extends that command, so callers pass one tuple for every step of a
+    drag. This is done here rather than through QUndoCommand.mergeWith:
+    PySide keeps the Python side of every merged command alive, which
+    would grow memory with each step.
+    """
+    top = stack.command(stack.index() - 1)
+    if isinstance(top, MoveNodesCommand) and top.nodes is nodes:
+        top.extend(dx, dy)
+    else:
+        stack.push(MoveNodesCommand(nodes, dx, dy))
+
+
+class LayoutNodesCommand(QUndoCommand):
+    """Move nodes to new positions, e.g. from the automatic layout"""
+
+    def __init__(self, scene, nodes, old_positions, new_positions):
+        super().__init__(_describe("Lay out", len(nodes), "node"))
+        self.scene = scene
+        self.nodes = tuple(nodes)
+        # (x, y) of each node before and after, as n x 2 arrays
+        self.old_positions = old_positions
+        self.new_positions = new_positions
+
+    def redo(self):
+        self.scene.setNodePositions(self.nodes, self.new_positions)
+
+    def undo(self):
+        self.scene.setNodePositions(self.nodes, self.old_positions)
+
+
+class AddConnectionCommand(QUndoCommand):
+    """Add a connection between two ports; pushing one for a connection already in the scene keeps it"""
+
+    def __init__(self, scene, connection):
+        super().__init__("Connect " + connection.start_port.name)
+        self.scene = scene
+        self.connection = connection
+        self.ports = (connection.start_port, connection.end_port)
+
+    def redo(self):
+        if self.connection.scene() is not self.scene or self.connection.start_port is None:
+            _attach(self.scene, self.connection, *self.ports)
+
+    def undo(self):
+        _detach(self.scene, self.connection)
+
+
+class RemoveConnectionCommand(QUndoCommand):
+    """Remove a connection from its ports and the scene"""
+
+    def __init__(self, scene, connection):
+        super().__init__("Disconnect " + connection.start_port.name)
+        self.scene = scene
+        self.connection = connection
+        self.ports = (connection.start_port, connection.end_port)
+
+    def redo(self):
+        _detach(self.scene, self.connection)
+
+    def undo(self):
+        _attach(self.scene, self.connection, *self.ports)
+
+
+class SetRunStateCommand(QUndoCommand):
+    """Start or stop nodes; undo puts back the ones it changed"""
+
+    def __init__(self, nodes, running):
+        nodes = tuple(node for node in nodes if node.is_started() != running)
+        super().__init__(_describe("Run" if running else "Stop", len(nodes), "node"))
+        self.nodes = nodes
+        self.running = running
+
+    def _apply(self, running):
+        for node in self.nodes:
+            if running:
+                node.start()
+            else:
+                node.stop()
+
+    def redo(self):
+        self._apply(self.running)
+
+    def undo(self):
+        self._apply(not self.running)
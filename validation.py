@@ -0,0 +1,342 @@
+"""
+Incremental validation of node graphs.
+
+GraphValidator checks every node of a GraphModel for:
+
+* required inputs that aren't connected (error)
+* topics with more than one publisher: an input fed by several outputs,
+  reported on the input's node and on each publisher (warning)
+* dependency cycles, which Run Graph can't order: nodes in a strongly
+  connected component, not the nodes merely downstream of one (warning)
+* orphans: nodes without any connection (info)
+
+Edits are reported to it as they happen (node_added, edge_added, ...) and
+only mark the nodes they can affect: the two ends of an edge and, when the
+number of publishers on a topic crosses one, the other publishers. flush()
+then re-checks just those nodes.
+
+For cycles, every node has a topological rank (the nodes of a cycle share
+one) such that edges go from lower to higher ranks. An added edge that
+already goes up the ranks can't close a cycle, which is most edits;
+otherwise only the nodes ranked between its ends are searched and
+re-ranked (Pearce and Kelly's dynamic topological order). A removed edge
+can only split the cycle it was on. Creating or splitting a cycle, and
+large batches of edits (loading a file, say), fall back to a full scan.
+"""
+
+# Issue severities, most severe last
+INFO = 'info'
+WARNING = 'warning'
+ERROR = 'error'
+SEVERITY_RANK = {INFO: 0, WARNING: 1, ERROR: 2}
+
+# Issue kinds
+REQUIRED_INPUT = 'required_input'
+DUPLICATE_PUBLISHERS = 'duplicate_publishers'
+CYCLE = 'cycle'
+ORPHAN = 'orphan'
+
+# Batches of edits touching more than this fraction of the graph's nodes are
+# validated with a full scan instead
+FULL_SCAN_FRACTION = 0.25
+
+
+class Issue:
+    """A problem found on a node"""
+    __slots__ = ('kind', 'severity', 'message')
+
+    def __init__(self, kind, severity, message):
+        self.kind = kind
+        self.severity = severity
+        self.message = message
+
+    def __repr__(self):
+        return f"Issue({self.kind!r}, {self.severity!r}, {self.message!r})"
+
+    def __eq__(self, other):
+        return (isinstance(other, Issue) and self.kind == other.kind
+                and self.severity == other.severity and self.message == other.message)
+
+    def __hash__(self):
+        return hash((self.kind, self.severity, self.message))
+
+
+def worst_severity(issues):
+    """The most severe severity among issues, or None if there are none"""
+    return max((issue.severity for issue in issues), key=SEVERITY_RANK.__getitem__, default=None)
+
+
+class GraphValidator:
+    """Keeps the issues of every node of a GraphModel up to date as the graph is edited"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        # Node -> list of issues, for the nodes that have any
+        self.issues = {}
+        # Node -> set of the nodes on a cycle with it (shared by all of them)
+        self._cycles = {}
+        # Node -> topological rank; nodes on a cycle share one
+        self._rank = {}
+        self._next_rank = 0
+
+        # Edits since the last flush
+        self._dirty = set()
+        self._added_edges = []
+        self._removed_edges = []
+        self._removed_nodes = []
+        # The first flush scans everything
+        self._full_scan = True
+
+        # Nodes checked by the last flush
+        self.checked = 0
+
+    def node_added(self, node):
+        """Call after adding a node to the graph"""
+        self._dirty.add(node)
+        self._rank[node] = self._next_rank
+        self._next_rank += 1
+
+    def node_removed(self, node):
+        """Call after removing a node (and so its edges) from the graph"""
+        self._dirty.discard(node)
+        self._removed_nodes.append(node)
+
+    def edge_added(self, edge):
+        """Call after connecting an edge"""
+        self._added_edges.append((edge.source.node, edge.target.node))
+        self._edge_changed(edge)
+
+    def edge_removed(self, edge):
+        """Call after removing an edge; its ports are still set"""
+        self._removed_edges.append((edge.source.node, edge.target.node))
+        self._edge_changed(edge)
+
+    def _edge_changed(self, edge):
+        self._dirty.add(edge.source.node)
+        self._dirty.add(edge.target.node)
+        # The other publishers on the topic only change state when the number
+        # of publishers goes between one and two
+        sources = {other.source for other in edge.target.edges}
+        if len(sources) <= 2:
+            for source in sources:
+                self._dirty.add(source.node)
+
+    def invalidate(self):
+        """Validate the whole graph on the next flush"""
+        self._full_scan = True
+
+    def issues_for(self, node):
+        """Get the issues of a node (empty if it has none or hasn't been validated yet)"""
+        return self.issues.get(node, ())
+
+    def flush(self):
+        """Validate what the edits since the last flush affected; returns the nodes whose issues changed"""
+        pending = len(self._dirty) + len(self._added_edges) + len(self._removed_edges)
+        if (self._full_scan or pending > FULL_SCAN_FRACTION * len(self.graph.nodes)
+                or not self._update_cycles()):
+            return self._scan()
+
+        changed = set()
+        for node in self._removed_nodes:
+            if node.graph is not self.graph:
+                if self.issues.pop(node, None):
+                    changed.add(node)
+                self._rank.pop(node, None)
+                self._cycles.pop(node, None)
+
+        dirty = self._dirty
+        self._clear_edits()
+        self.checked = 0
+        for node in dirty:
+            if node.graph is self.graph and self._update(node):
+                changed.add(node)
+        return changed
+
+    def _clear_edits(self):
+        self._dirty = set()
+        self._added_edges = []
+        self._removed_edges = []
+        self._removed_nodes = []
+
+    def _scan(self):
+        """Validate every node from scratch"""
+        self._rank_all()
+        changed = {node for node in self.issues if node.graph is not self.graph}
+        for node in changed:
+            del self.issues[node]
+        self.checked = 0
+        for node in self.graph.nodes.values():
+            if self._update(node):
+                changed.add(node)
+        self._clear_edits()
+        self._full_scan = False
+        return changed
+
+    def _rank_all(self):
+        """Find every cycle and rank every node from scratch"""
+        self._cycles = {}
+        self._rank = {}
+        # Tarjan's algorithm yields components downstream first
+        components = list(_strongly_connected(self.graph.nodes.values()))
+        for rank, component in enumerate(reversed(components)):
+            for node in component:
+                self._rank[node] = rank
+            if len(component) > 1 or component[0] in component[0].downstream:
+                members = set(component)
+                for node in component:
+                    self._cycles[node] = members
+        self._next_rank = len(components)
+
+    def _update_cycles(self):
+        """
+        Update cycles and ranks for the edges added and removed since the
+        last flush; returns False if a cycle was created or split, which
+        needs a full scan.
+        """
+        for source, target in self._removed_edges:
+            cycle = self._cycles.get(source)
+            if cycle is None or cycle is not self._cycles.get(target) or target in source.downstream:
+                continue
+            # The edge was on a cycle: see whether its nodes still form one
+            if len(cycle) == 1:
+                del self._cycles[source]
+                continue
+            members = [node for node in cycle if node.graph is self.graph]
+            if len(members) != len(cycle) or len(next(_strongly_connected(members[:1], cycle))) != len(cycle):
+                return False
+
+        # Only one edge going down the ranks can be fixed up at a time: the
+        # search assumes all the other edges go up
+        violating = []
+        for source, target in self._added_edges:
+            if target not in source.downstream:
+                # Removed again before the flush
+                continue
+            if source is target:
+                self._cycles.setdefault(source, {source})
+            elif self._rank[source] >= self._rank[target] and (
+                    source not in self._cycles or self._cycles[source] is not self._cycles.get(target)):
+                violating.append((source, target))
+        if len(violating) > 1:
+            return False
+        for source, target in violating:
+            if not self._reorder(source, target):
+                return False
+        return True
+
+    def _reorder(self, source, target):
+        """
+        Fix up the ranks for an edge source -> target going down the ranks;
+        returns False if it closes a cycle.
+        """
+        upper = self._rank[source]
+        lower = self._rank[target]
+        # Nodes reachable from target without going above source's rank
+        forward = _ranked_reach(target, 'downstream', self._rank, lambda rank: rank <= upper)
+        if source in forward:
+            return False
+        # Nodes leading to source without going below target's rank
+        backward = _ranked_reach(source, 'upstream', self._rank, lambda rank: rank >= lower)
+        # Move the nodes leading to source before the ones reachable from target,
+        # reusing the ranks they had between them
+        ranks = sorted({self._rank[node] for node in forward} | {self._rank[node] for node in backward})
+        new_ranks = {}
+        for nodes in (backward, forward):
+            for rank in sorted({self._rank[node] for node in nodes}):
+                new_ranks[rank] = ranks[len(new_ranks)]
+        for node in list(backward) + list(forward):
+            self._rank[node] = new_ranks[self._rank[node]]
+        return True
+
+    def _update(self, node):
+        """Re-check one node; returns whether its issues changed"""
+        self.checked += 1
+        issues = self.check_node(node)
+        if issues:
+            if self.issues.get(node) == issues:
+                return False
+            self.issues[node] = issues
+            return True
+        return self.issues.pop(node, None) is not None
+
+    def check_node(self, node):
+        """Get the issues of one node given the current graph"""
+        issues = []
+        for port in node.inputs.values():
+            if port.required and not port.edges:
+                issues.append(Issue(REQUIRED_INPUT, ERROR, f"Required input {port.name} is not connected"))
+            if len(port.edges) > 1:
+                publishers = len({edge.source for edge in port.edges})
+                if publishers > 1:
+                    issues.append(Issue(DUPLICATE_PUBLISHERS, WARNING,
+                                        f"{port.name} has {publishers} publishers"))
+        for port in node.outputs.values():
+            if any(other.source is not port for edge in port.edges for other in edge.target.edges):
+                issues.append(Issue(DUPLICATE_PUBLISHERS, WARNING,
+                                    f"{port.name} shares its topic with other publishers"))
+        # The message doesn't count the other nodes, so that cycles merging
+        # don't change the issues of all their nodes
+        cycle = self._cycles.get(node)
+        if cycle is not None:
+            message = "Feeds its own input" if node in node.downstream and len(cycle) == 1 else "On a dependency cycle"
+            issues.append(Issue(CYCLE, WARNING, message))
+        if not node.upstream and not node.downstream:
+            issues.append(Issue(ORPHAN, INFO, "Not connected to any other node"))
+        return issues
+
+
+def _ranked_reach(node, direction, rank, keep):
+    """node and every node reachable from it in one direction through nodes whose rank passes keep"""
+    seen = {node}
+    stack = [node]
+    while stack:
+        for neighbour in getattr(stack.pop(), direction):
+            if neighbour not in seen and keep(rank[neighbour]):
+                seen.add(neighbour)
+                stack.append(neighbour)
+    return seen
+
+
+def _strongly_connected(nodes, within=None):
+    """Tarjan's algorithm without recursion; yields each strongly connected component as a list"""
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(root.downstream))]
+        while work:
+            node, neighbours = work[-1]
+            for neighbour in neighbours:
+                if within is not None and neighbour not in within:
+                    continue
+                if neighbour not in index:
+                    index[neighbour] = lowlink[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack.add(neighbour)
+                    work.append((neighbour, iter(neighbour.downstream)))
+                    break
+                if neighbour in on_stack:
+                    lowlink[node] = min(lowlink[node], index[neighbour])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member is node:
+                            break
+                    yield component
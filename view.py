@@ -1,6 +1,12 @@
+import time
+
 from PySide6.QtWidgets import QGraphicsView
 from PySide6.QtCore import Qt, Signal, QRectF
-from PySide6.QtGui import QPainter
+from PySide6.QtGui import QPainter, QPen, QColor
+
+from packages.base.node import BaseNode, LOD_LOW_THRESHOLD
+from connection import Connection
+from perf_hud import PerformanceHud
 
 
 class NodeView(QGraphicsView):
@@ -14,14 +20,23 @@ class NodeView(QGraphicsView):
         
         # Set up the view behavior
         self.setDragMode(QGraphicsView.RubberBandDrag)
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setPerformanceMode(False)
         
         # Initialize panning variables
         self._panning = False
         self._panStart = None
         
+        # Batched drawing data for the zoomed-out overview, rebuilt on scene changes
+        self._overview = None
+
+        # Performance overlay, while it is shown
+        self.hud = None
+        
+        # Padding kept around the content in the scene rect
+        self.scene_padding = 100
+        
         # Zoom parameters
         self.zoomInFactor = 1.015  # Reduced to 1.5% per step
         self.zoomOutFactor = 1 / self.zoomInFactor
@@ -44,25 +59,87 @@ class NodeView(QGraphicsView):
         # Connect to scene changes
         if scene:
             scene.changed.connect(self.onSceneChanged)
+            if hasattr(scene, 'contentBoundsChanged'):
+                scene.contentBoundsChanged.connect(self.onContentBoundsChanged)
             
         # Center the view
         self.centerOn(0, 0)
 
+    def setPerformanceMode(self, enabled):
+        """
+        Switch between full-viewport repaints and partial updates.
+
+        In performance mode only the regions covered by changed items are
+        repainted, the background is cached, and painters are not adjusted
+        for antialiasing (items report bounding rects that already include
+        their pen width).
+        """
+        self.performance_mode = enabled
+        if enabled:
+            self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+            self.setCacheMode(QGraphicsView.CacheBackground)
+        else:
+            self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+            self.setCacheMode(QGraphicsView.CacheNone)
+        self.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing, enabled)
+        self.resetCachedContent()
+        self.viewport().update()
+
+    def setHudVisible(self, visible):
+        """Show or hide the performance overlay (frame and paint times, item counts, scene signals)"""
+        if visible == (self.hud is not None):
+            return
+        if visible:
+            self.hud = PerformanceHud(self)
+        else:
+            # Freed right away: a deferred delete may only run once the view itself is gone
+            self.hud.close()
+            self.hud.setParent(None)
+            self.hud = None
+        self.viewport().update()
+
+    def drawForeground(self, painter, rect):
+        """Draw the performance overlay over the items, when it is shown"""
+        super().drawForeground(painter, rect)
+        if self.hud is not None:
+            self.hud.draw(painter)
+
     def updateSceneRect(self):
-        """Update the scene rectangle to encompass all items plus padding"""
-        if self.scene():
-            # Get the current scene rect
-            rect = self.scene().itemsBoundingRect()
-            
-            # Add padding
-            padding = 100
-            rect.adjust(-padding, -padding, padding, padding)
+        """
+        Update the scene rectangle to encompass all nodes plus padding.
+
+        The rect only changes when the content crosses the padding margin:
+        it grows as soon as the content no longer fits, and shrinks once the
+        content has pulled back by more than the padding on some side.
+        """
+        scene = self.scene()
+        if not scene:
+            return
             
-            # Set the new scene rect
-            self.scene().setSceneRect(rect)
+        # Get the bounds of the content (tracked incrementally by NodeScene)
+        if hasattr(scene, 'contentRect'):
+            content = scene.contentRect()
+        else:
+            content = scene.itemsBoundingRect()
+        
+        # Add padding
+        padding = self.scene_padding
+        padded = content.adjusted(-padding, -padding, padding, padding)
+        current = scene.sceneRect()
+        
+        outer = content.adjusted(-2 * padding, -2 * padding, 2 * padding, 2 * padding)
+        if current.contains(content) and outer.contains(current):
+            return
             
-            # Update scrollbar visibility
-            self.updateScrollBarVisibility()
+        # Set the new scene rect
+        scene.setSceneRect(padded)
+        
+        # Update scrollbar visibility
+        self.updateScrollBarVisibility()
+
+    def onContentBoundsChanged(self, rect):
+        """Handle changes to the bounds of the nodes (at most once per frame)"""
+        self.updateSceneRect()
 
     def updateScrollBarVisibility(self):
         """Update scrollbar visibility based on content"""
@@ -85,7 +162,105 @@ class NodeView(QGraphicsView):
 
     def onSceneChanged(self, region):
         """Handle scene changes"""
-        self.updateSceneRect()
+        self._overview = None
+        # Scenes that don't report their content bounds are followed on every change
+        if not hasattr(self.scene(), 'contentBoundsChanged'):
+            self.updateSceneRect()
+
+    def _buildOverview(self):
+        """
+        Collect node rectangles, validation badge corners and connection lines
+        in scene coordinates, bottom to top, skipping hidden items. Shapes of
+        the same kind and color that follow each other in the stacking order
+        share a run, so drawing the runs in order keeps the items' z-order.
+        Returns None when the scene holds visible items the overview doesn't
+        know how to draw.
+        """
+        runs = []
+        num_nodes = num_lines = 0
+
+        def add(is_line, color, shape):
+            if runs and runs[-1][0] == is_line and runs[-1][1].rgba() == color.rgba():
+                runs[-1][2].append(shape)
+            else:
+                runs.append((is_line, color, [shape]))
+
+        for item in self.scene().items(Qt.AscendingOrder):
+            if not item.isVisible():
+                continue
+            if isinstance(item, BaseNode):
+                color = item.selected_color if item.isSelected() else item.body_color
+                pos = item.scenePos()
+                add(False, color, QRectF(pos.x(), pos.y(), item.width, item.height))
+                num_nodes += 1
+                badge_color = item.badge_color
+                if badge_color is not None:
+                    # The header corner, as BaseNode.paint draws it at this zoom
+                    size = item.header_height
+                    add(False, badge_color, QRectF(pos.x() + item.width - size, pos.y(), size, size))
+            elif isinstance(item, Connection):
+                add(True, item.pen().color(), item.line())
+                num_lines += 1
+            else:
+                return None
+        return runs, num_nodes, num_lines
+
+    def paintEvent(self, event):
+        """Paint the scene, timing the frame while the performance overlay is shown"""
+        if self.hud is None:
+            self._paintScene(event)
+            return
+        self.hud.beginFrame()
+        self._paintScene(event)
+        self.hud.endFrame()
+
+    def _paintScene(self, event):
+        """Paint the scene, batching everything into a few draw calls when zoomed far out"""
+        if self.transform().m11() >= LOD_LOW_THRESHOLD or not self.scene():
+            super().paintEvent(event)
+            return
+            
+        # At overview zoom every node is a flat rectangle and every connection a
+        # straight line (see BaseNode.paint / Connection.paint), so draw them all at
+        # once instead of calling paint() on thousands of items
+        if self._overview is None:
+            self._overview = self._buildOverview() or False
+        if not self._overview:
+            # Something only the items themselves can paint
+            super().paintEvent(event)
+            return
+        runs, num_nodes, num_lines = self._overview
+        
+        painter = QPainter(self.viewport())
+        painter.setTransform(self.viewportTransform())
+        exposed = self.mapToScene(event.rect()).boundingRect()
+        self.drawBackground(painter, exposed)
+        
+        line_time = rect_time = 0.0
+        for is_line, color, shapes in runs:
+            start = time.perf_counter()
+            if is_line:
+                painter.setPen(QPen(color, 2))
+                painter.drawLines(shapes)
+                line_time += time.perf_counter() - start
+            else:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(color)
+                painter.drawRects(shapes)
+                rect_time += time.perf_counter() - start
+        if self.hud is not None:
+            self.hud.recordBatched(Connection, line_time, num_lines)
+            self.hud.recordBatched(BaseNode, rect_time, num_nodes)
+        self.drawForeground(painter, exposed)
+        
+        # Keep the rubber band visible while selecting in the overview
+        rubber_band = self.rubberBandRect()
+        if not rubber_band.isNull():
+            painter.resetTransform()
+            painter.setPen(QPen(QColor(100, 180, 255), 1))
+            painter.setBrush(QColor(100, 180, 255, 40))
+            painter.drawRect(rubber_band)
+        painter.end()
 
     def resizeEvent(self, event):
         """Handle resize events"""